@@ -0,0 +1,428 @@
+# Фигуры физического мира без холста: круг, квадрат и треугольник.
+#
+# Раньше Circle, Square и Triangle в main.py и считали физику, и рисовали
+# себя на холсте tkinter: конструктор требовал canvas, а move сразу вызывал
+# canvas.coords, поэтому симуляцию нельзя было запустить без окна. Теперь
+# здесь лежит вся физика фигур — ручки строк мира (world.py), попадание
+# точки в фигуру и столкновения (on_collision), — а tkinter не импортируется
+# вовсе. Окно (main.py) наследует от этих классов фигуры, которые ещё и
+# рисуют себя на холсте; без окна фигуры считает PhysicsEngine (engine.py).
+
+import math
+# Импортируем декоратор dataclass для автоматического создания классов с данными
+from dataclasses import dataclass
+
+from world import CIRCLE, SQUARE, TRIANGLE, np
+
+
+# Создаем класс Vector для удобной работы с векторами (направленными отрезками)
+# Векторы нужны для представления скорости, ускорения и других физических величин с направлением
+@dataclass
+class Vector:
+    """Вектор для работы с физическими величинами - имеет направление и длину (модуль)"""
+    # Координата X вектора (горизонтальная составляющая)
+    x: float = 0.0
+    # Координата Y вектора (вертикальная составляющая)
+    y: float = 0.0
+    
+    # Метод сложения двух векторов: результат - новый вектор с суммой координат
+    # Например: (2, 3) + (1, 4) = (3, 7)
+    def __add__(self, other):
+        return Vector(self.x + other.x, self.y + other.y)
+    
+    # Метод вычитания векторов: результат - вектор разности координат
+    # Например: (5, 6) - (2, 1) = (3, 5)
+    def __sub__(self, other):
+        return Vector(self.x - other.x, self.y - other.y)
+    
+    # Метод умножения вектора на число (скаляр): масштабирует вектор
+    # Например: (3, 4) * 2 = (6, 8) - вектор становится в 2 раза длиннее
+    def __mul__(self, scalar):
+        return Vector(self.x * scalar, self.y * scalar)
+    
+    # Метод вычисления длины (модуля) вектора по теореме Пифагора
+    # Для вектора (3, 4) длина = sqrt(3² + 4²) = 5
+    def magnitude(self):
+        return math.hypot(self.x, self.y)
+    
+    # Метод нормализации вектора: превращает его в единичный вектор (длиной 1) 
+    # с сохранением направления. Нужен для работы с направлениями без учета длины.
+    def normalize(self):
+        # Сначала вычисляем текущую длину вектора
+        mag = self.magnitude()
+        # Если длина равна нулю (вектор нулевой), возвращаем нулевой вектор
+        if mag == 0:
+            return Vector(0, 0)
+        # Делим каждую координату на длину, получая вектор длиной 1
+        return Vector(self.x / mag, self.y / mag)
+
+
+# Свойство фигуры, которое читает и пишет её элемент в столбце name физического мира
+def world_column(name, doc):
+    """Свойство-ручка: shape.<name> — элемент world.<name>[shape.index]"""
+    # Чтение: берём элемент столбца с номером фигуры обычным числом Python
+    # (item() у массива NumPy: с его скалярами арифметика заметно медленнее)
+    if np is not None:
+        def get(self):
+            return getattr(self.world, name).item(self.index)
+    else:
+        def get(self):
+            return getattr(self.world, name)[self.index]
+    # Запись: меняем элемент столбца прямо в массиве мира
+    def set(self, value):
+        getattr(self.world, name)[self.index] = value
+    return property(get, set, doc=doc)
+
+
+# Базовый класс для всех фигур - содержит общую физику кругов, квадратов и треугольников
+class Body:
+    """
+    Базовый класс для всех фигур: лёгкая ручка строки физического мира
+    (см. world.py) без какого-либо холста
+    """
+    # Вид фигуры в физическом мире (переопределяется в подклассах)
+    kind = CIRCLE
+    
+    # Координаты, скорость, размер, масса и флаг перетаскивания хранятся в массивах мира
+    # Горизонтальная координата центра фигуры (ось X)
+    x = world_column("x", "Координата центра по горизонтали")
+    # Вертикальная координата центра фигуры (ось Y)
+    y = world_column("y", "Координата центра по вертикали")
+    # Горизонтальная составляющая скорости
+    vx = world_column("vx", "Скорость по горизонтали (пикселей за кадр)")
+    # Вертикальная составляющая скорости
+    vy = world_column("vy", "Скорость по вертикали (пикселей за кадр)")
+    # Характерный размер фигуры (диаметр для круга, сторона для квадрата)
+    size = world_column("size", "Диаметр круга или сторона квадрата и треугольника")
+    # Масса фигуры для физических расчетов (в условных единицах)
+    mass = world_column("mass", "Масса фигуры")
+    # Флаг: находится ли фигура сейчас в режиме перетаскивания мышью
+    is_dragged = world_column("dragged", "Фигуру тащат мышью - физика мира её не двигает")
+    
+    # Конструктор класса вызывается при создании любой фигуры
+    def __init__(self, world, x, y, size, mass=1.0):
+        # Физический мир, в массивах которого живут координаты и скорость фигуры
+        self.world = world
+        # Номер фигуры в массивах мира (новая фигура стоит на месте)
+        self.index = world.add(self.kind, x, y, size, mass)
+    
+    # Вектор скорости фигуры - определяет направление и скорость движения
+    @property
+    def velocity(self):
+        """Скорость фигуры новым вектором (копия: изменения вектора в мир не попадают)"""
+        return Vector(self.vx, self.vy)
+    
+    # Присваивание вектора скорости записывает обе составляющие в мир
+    @velocity.setter
+    def velocity(self, value):
+        self.vx = value.x
+        self.vy = value.y
+    
+    # Метод перемещения фигуры на заданное расстояние по осям X и Y
+    def move(self, dx, dy):
+        """Переместить фигуру на расстояние dx по горизонтали и dy по вертикали"""
+        # Увеличиваем текущую координату X на величину dx
+        self.x += dx
+        # Увеличиваем текущую координату Y на величину dy
+        self.y += dy
+    
+    # Абстрактный метод: проверка, находится ли точка (px, py) внутри фигуры
+    def contains_point(self, px, py):
+        """Проверить, находится ли точка с координатами (px, py) внутри фигуры"""
+        return False
+    
+    # Абстрактный метод: обработка столкновения с другой фигурой
+    def on_collision(self, other):
+        """Обработка столкновения с другой фигурой (логика зависит от типа фигур)"""
+        pass
+
+
+# Класс круга - наследуется от базового класса Body
+class Circle(Body):
+    """Круг - отскакивает при падении благодаря высокому коэффициенту упругости"""
+    # Вид фигуры в физическом мире
+    kind = CIRCLE
+    
+    # Переопределяем метод проверки попадания точки внутрь круга
+    def contains_point(self, px, py):
+        # Вычисляем разницу координат между точкой и центром круга
+        dx = px - self.x
+        dy = py - self.y
+        # Точка внутри круга, если расстояние до центра меньше радиуса
+        # Используем math.hypot для вычисления гипотенузы (расстояния)
+        return math.hypot(dx, dy) <= self.size/2
+    
+    # Переопределяем метод обработки столкновения для круга (упругое столкновение)
+    def on_collision(self, other):
+        """Упругое столкновение с сохранением импульса и энергии"""
+        # Центры обоих кругов читаем из мира один раз
+        x, y, other_x, other_y = self.x, self.y, other.x, other.y
+        # Вычисляем вектор между центрами двух кругов
+        dx = x - other_x
+        dy = y - other_y
+        # Вычисляем расстояние между центрами по теореме Пифагора
+        distance = math.hypot(dx, dy)
+        # Сумма радиусов - расстояние, на котором круги касаются
+        reach = self.size/2 + other.size/2
+        
+        # Проверяем, действительно ли произошло столкновение (дистанция меньше суммы радиусов)
+        # и избегаем деления на ноль (distance > 0)
+        if distance < reach and distance > 0:
+            # Нормализуем вектор направления (делаем его длиной 1)
+            nx = dx / distance
+            ny = dy / distance
+            # Массы и скорости читаем из мира один раз
+            mass, other_mass = self.mass, other.mass
+            vx, vy, other_vx, other_vy = self.vx, self.vy, other.vx, other.vy
+            
+            # Вычисляем относительную скорость двух фигур
+            dvx = vx - other_vx
+            dvy = vy - other_vy
+            
+            # Вычисляем проекцию относительной скорости на линию столкновения
+            # (1 + 0.8) - коэффициент восстановления (0.8 = 80% упругости)
+            impulse = (dvx * nx + dvy * ny) * (1 + 0.8) / (1/mass + 1/other_mass)
+            
+            # Применяем импульс к первой фигуре (закон сохранения импульса)
+            self.vx = vx - impulse * nx / mass
+            self.vy = vy - impulse * ny / mass
+            # Применяем противоположный импульс ко второй фигуре
+            other.vx = other_vx + impulse * nx / other_mass
+            other.vy = other_vy + impulse * ny / other_mass
+            
+            # Раздвигаем фигуры, чтобы избежать "залипания" при пересечении
+            overlap = reach - distance
+            if overlap > 0:
+                # Первая фигура сдвигается вдоль нормали на половину пересечения
+                self.x = x + nx * overlap * 0.5
+                self.y = y + ny * overlap * 0.5
+                # Вторая фигура сдвигается в противоположном направлении
+                other.x = other_x - nx * overlap * 0.5
+                other.y = other_y - ny * overlap * 0.5
+
+
+# Класс квадрата - наследуется от базового класса Body
+class Square(Body):
+    """Квадрат - падает без отскока благодаря низкому коэффициенту упругости"""
+    # Вид фигуры в физическом мире
+    kind = SQUARE
+    
+    # Переопределяем метод проверки попадания точки внутрь квадрата
+    def contains_point(self, px, py):
+        # Точка внутри квадрата, если её координаты находятся в пределах половины размера
+        # от центра по обеим осям
+        return (abs(px - self.x) <= self.size/2 and 
+                abs(py - self.y) <= self.size/2)
+    
+    # Переопределяем метод обработки столкновения для квадрата (неупругое столкновение)
+    def on_collision(self, other):
+        """Неупругое столкновение - минимальный отскок, быстрая потеря энергии"""
+        # Центры обеих фигур читаем из мира один раз
+        x, y, other_x, other_y = self.x, self.y, other.x, other.y
+        # Вычисляем вектор между центрами фигур
+        dx = x - other_x
+        dy = y - other_y
+        # Вычисляем расстояние между центрами
+        distance = math.hypot(dx, dy)
+        # Расстояние, на котором фигуры касаются
+        reach = self.size/2 + other.size/2
+        
+        # Проверяем факт столкновения
+        if distance < reach and distance > 0:
+            # Нормализуем вектор направления
+            nx = dx / distance
+            ny = dy / distance
+            
+            # Раздвигаем фигуры для предотвращения залипания
+            overlap = reach - distance
+            if overlap > 0:
+                self.x = x + nx * overlap * 0.5
+                self.y = y + ny * overlap * 0.5
+                other.x = other_x - nx * overlap * 0.5
+                other.y = other_y - ny * overlap * 0.5
+            
+            # Сильно гасим скорость обеих фигур (неупругое столкновение)
+            # 0.95 означает потерю 5% скорости при каждом столкновении
+            self.vx *= 0.95
+            self.vy *= 0.95
+            other.vx *= 0.95
+            other.vy *= 0.95
+
+
+# Класс треугольника - наследуется от базового класса Body
+class Triangle(Body):
+    """Треугольник - фигуры соскальзывают по его наклонным сторонам"""
+    # Вид фигуры в физическом мире
+    kind = TRIANGLE
+    
+    # Переопределяем конструктор для установки большей массы (треугольник почти неподвижен)
+    def __init__(self, world, x, y, size, mass=2.0):
+        # У треугольника больше масса (по умолчанию 2.0), чтобы он был "неподвижен"
+        # при столкновениях с легкими фигурами
+        super().__init__(world, x, y, size, mass)
+        # Список вершин треугольника (каждая вершина - кортеж (x, y))
+        self.points = self.vertices(x, y, size)
+    
+    # Вершины треугольника с центром (x, y) и стороной size
+    def vertices(self, x, y, size):
+        """Список трех вершин (x, y) равностороннего треугольника острием вверх"""
+        # Высота равностороннего треугольника
+        h = size * math.sqrt(3) / 2
+        return [
+            (x, y - h/2),
+            (x - size/2, y + h/2),
+            (x + size/2, y + h/2)
+        ]
+    
+    # Переопределяем метод проверки попадания точки внутрь треугольника
+    def contains_point(self, px, py):
+        """Проверка точки внутри треугольника через барицентрические координаты"""
+        # Вспомогательная функция для вычисления знака ориентации трех точек
+        def sign(p1, p2, p3):
+            # Возвращает положительное число, если точка p3 справа от вектора p1->p2
+            return (p1[0] - p3[0]) * (p2[1] - p3[1]) - (p2[0] - p3[0]) * (p1[1] - p3[1])
+        
+        # Мир двигает треугольник без ручки, поэтому вершины берём по текущему положению
+        self.points = self.vertices(self.x, self.y, self.size)
+        # Проверяем, находится ли точка по одну сторону от всех трех ребер треугольника
+        b1 = sign((px, py), self.points[0], self.points[1]) < 0.0
+        b2 = sign((px, py), self.points[1], self.points[2]) < 0.0
+        b3 = sign((px, py), self.points[2], self.points[0]) < 0.0
+        
+        # Точка внутри треугольника, если все три проверки дали одинаковый результат
+        return (b1 == b2) and (b2 == b3)
+    
+    # Метод определения нормали (перпендикуляра) к поверхности в точке контакта
+    def get_surface_normal(self, px, py):
+        """
+        Определить нормаль к поверхности в точке контакта.
+        Возвращает нормаль к ближайшей стороне треугольника.
+        """
+        # Инициализируем минимальное расстояние бесконечностью
+        min_dist = float('inf')
+        # Нормаль по умолчанию направлена вверх (0, -1)
+        closest_normal = Vector(0, -1)
+        
+        # Вершины по текущему положению треугольника
+        self.points = self.vertices(self.x, self.y, self.size)
+        # Проверяем все три стороны треугольника
+        for i in range(3):
+            # Берем две вершины, образующие сторону
+            p1 = self.points[i]
+            p2 = self.points[(i + 1) % 3]
+            
+            # Вычисляем вектор стороны (от p1 к p2)
+            side_vec = Vector(p2[0] - p1[0], p2[1] - p1[1])
+            # Нормаль к стороне получается поворотом вектора стороны на 90° против часовой
+            normal = Vector(-side_vec.y, side_vec.x).normalize()
+            
+            # Вектор от первой вершины стороны к проверяемой точке
+            to_point = Vector(px - p1[0], py - p1[1])
+            # Длина проекции точки на сторону (параметр положения вдоль стороны)
+            proj_length = (to_point.x * side_vec.x + to_point.y * side_vec.y) / side_vec.magnitude()
+            # Ограничиваем проекцию пределами отрезка стороны
+            proj_length = max(0, min(proj_length, side_vec.magnitude()))
+            
+            # Координаты ближайшей точки на стороне
+            closest_point = Vector(
+                p1[0] + side_vec.normalize().x * proj_length,
+                p1[1] + side_vec.normalize().y * proj_length
+            )
+            
+            # Расстояние от проверяемой точки до стороны
+            dist = math.hypot(px - closest_point.x, py - closest_point.y)
+            
+            # Если эта сторона ближе предыдущих, запоминаем её нормаль
+            if dist < min_dist:
+                min_dist = dist
+                # Проверяем направление нормали: должна быть НАРУЖУ треугольника
+                center = Vector(self.x, self.y)
+                to_center = Vector(center.x - closest_point.x, center.y - closest_point.y)
+                # Если центр треугольника находится по ту же сторону от нормали - разворачиваем её
+                if to_center.x * normal.x + to_center.y * normal.y > 0:
+                    normal = Vector(-normal.x, -normal.y)
+                closest_normal = normal
+        
+        # Возвращаем нормаль к ближайшей стороне
+        return closest_normal
+    
+    # Переопределяем метод обработки столкновения для треугольника (соскальзывание)
+    def on_collision(self, other):
+        """
+        Обработка столкновения: другие фигуры соскальзывают по сторонам треугольника.
+        Треугольник почти неподвижен благодаря большой массе.
+        """
+        # Треугольник в этом методе не двигается, а размер другой фигуры не меняется:
+        # читаем их из мира один раз
+        x, y = self.x, self.y
+        other_half = other.size/2
+        # Оптимизация: быстрая проверка пересечения ограничивающих прямоугольников
+        dx = abs(x - other.x)
+        dy = abs(y - other.y)
+        # Если фигуры слишком далеко друг от друга - столкновения нет
+        if dx > (self.size/2 + other_half) or dy > (self.size/2 + other_half):
+            return
+        
+        # Мир двигает треугольник без ручки (и без холста), поэтому вершины
+        # пересчитываем по текущему положению треугольника
+        self.points = self.vertices(x, y, self.size)
+        
+        # Вычисляем высоту треугольника для дальнейших расчетов
+        h = self.size * math.sqrt(3) / 2
+        # Проверяем все три стороны треугольника на столкновение
+        for i in range(3):
+            p1 = self.points[i]
+            p2 = self.points[(i + 1) % 3]
+            
+            # Вектор стороны треугольника
+            side_vec = Vector(p2[0] - p1[0], p2[1] - p1[1])
+            # Вектор от вершины к центру другой фигуры
+            to_point = Vector(other.x - p1[0], other.y - p1[1])
+            
+            # Нормаль к стороне (перпендикуляр), направленная наружу
+            normal = Vector(-side_vec.y, side_vec.x).normalize()
+            # Корректируем направление нормали наружу треугольника
+            center_vec = Vector(x - p1[0], y - p1[1])
+            if center_vec.x * normal.x + center_vec.y * normal.y > 0:
+                normal = Vector(-normal.x, -normal.y)
+            
+            # Расстояние от центра фигуры до линии стороны (проекция на нормаль)
+            distance = abs(to_point.x * normal.x + to_point.y * normal.y)
+            
+            # Если расстояние меньше радиуса фигуры + небольшой запас - есть столкновение
+            if distance < other_half + 2:
+                # Точка проекции центра фигуры на линию стороны
+                proj = to_point - normal * (to_point.x * normal.x + to_point.y * normal.y)
+                proj_point = Vector(p1[0] + proj.x, p1[1] + proj.y)
+                
+                # Проверяем, что проекция лежит на отрезке стороны (не за его пределами)
+                t = (proj.x * side_vec.x + proj.y * side_vec.y) / (side_vec.magnitude() ** 2)
+                if 0 <= t <= 1:
+                    # Раздвигаем фигуры чтобы избежать пересечения
+                    overlap = other_half + 2 - distance
+                    if overlap > 0:
+                        other.x += normal.x * overlap
+                        other.y += normal.y * overlap
+                    
+                    # Вычисляем касательный вектор (вдоль поверхности)
+                    tangent = Vector(-normal.y, normal.x)
+                    
+                    # Скорость вдоль касательной (сохраняется при соскальзывании)
+                    tangent_speed = other.vx * tangent.x + other.vy * tangent.y
+                    
+                    # Скорость по нормали (гасится при контакте с поверхностью)
+                    normal_speed = other.vx * normal.x + other.vy * normal.y
+                    
+                    # Новая скорость: движение вдоль поверхности + слабое отталкивание от поверхности
+                    other.velocity = tangent * tangent_speed + normal * (normal_speed * -0.3)
+                    
+                    # Добавляем эффект соскальзывания вниз по наклону
+                    # Чем больше наклон (меньше |normal.y|), тем сильнее соскальзывание
+                    if abs(normal.y) > 0.3:
+                        slide_factor = 0.2 * (1 - abs(normal.y))
+                        other.vy += slide_factor * 2
+
+
+
+# Класс фигуры каждого вида в физическом мире
+BODY_TYPES = {CIRCLE: Circle, SQUARE: Square, TRIANGLE: Triangle}
@@ -0,0 +1,84 @@
+# Широкая фаза столкновений: какие пары фигур вообще стоит проверять.
+#
+# Раньше check_collisions перебирал все пары фигур — n*(n-1)/2 вызовов
+# on_collision за кадр, и уже на полутора сотнях фигур кадр не укладывался
+# в 16 мс. Теперь фигуры раскладываются по ячейкам равномерной сетки
+# (пространственный хеш: словарь "номер ячейки -> фигуры в ней"). Сторона
+# ячейки не меньше самой большой фигуры с запасом, поэтому фигура может
+# касаться только фигур из своей и восьми соседних ячеек. Из этих пар до
+# on_collision доходят лишь те, у которых пересекаются ограничивающие
+# квадраты фигур, — остальные точно не сталкиваются.
+
+# Треугольник отталкивает фигуру, не дошедшую до его стороны на 2 пикселя
+# (см. Triangle.on_collision), поэтому квадраты фигур расширяются на столько же
+CONTACT_MARGIN = 2
+
+# Соседние ячейки, которые смотрит каждая ячейка: своя и половина соседей.
+# Вторую половину соседей смотрят они сами, так что каждая пара ячеек
+# проверяется ровно один раз
+HALF_NEIGHBOURS = ((1, -1), (1, 0), (1, 1), (0, 1))
+
+
+class SpatialGrid:
+    """
+    Равномерная сетка для поиска пар фигур, которые могут столкнуться.
+    pairs() получает центры и размеры фигур и возвращает пары номеров
+    (i, j), i < j, в том же порядке, в каком их перебирал полный перебор.
+    После вызова в checked — сколько пар соседей проверено, в candidates —
+    сколько из них отдано на точную проверку.
+    """
+
+    def __init__(self, margin=CONTACT_MARGIN):
+        self.margin = margin
+        # Сторона ячейки на последнем вызове (пиксели)
+        self.cell_size = 0.0
+        self.checked = 0
+        self.candidates = 0
+
+    def pairs(self, xs, ys, sizes):
+        """Пары (i, j) фигур, чьи ограничивающие квадраты (с запасом margin) пересекаются."""
+        count = len(xs)
+        if count < 2:
+            self.checked = self.candidates = 0
+            return []
+        margin = self.margin
+        # Самые далёкие центры касающихся фигур отстоят на max(sizes) + margin по каждой оси
+        cell = max(sizes) + 2 * margin
+        self.cell_size = cell
+        # Раскладываем фигуры по ячейкам по положению центра
+        cells = {}
+        for i in range(count):
+            key = (int(xs[i] // cell), int(ys[i] // cell))
+            bucket = cells.get(key)
+            if bucket is None:
+                cells[key] = [i]
+            else:
+                bucket.append(i)
+
+        result = []
+        checked = 0
+        for (cx, cy), bucket in cells.items():
+            # Пары внутри ячейки, затем пары с половиной соседних ячеек
+            others = [cells.get((cx + dx, cy + dy)) for dx, dy in HALF_NEIGHBOURS]
+            for position, i in enumerate(bucket):
+                x, y, half = xs[i], ys[i], sizes[i] / 2 + margin
+                for later in range(position + 1, len(bucket)):
+                    j = bucket[later]
+                    checked += 1
+                    reach = half + sizes[j] / 2
+                    if abs(x - xs[j]) <= reach and abs(y - ys[j]) <= reach:
+                        result.append((i, j) if i < j else (j, i))
+                for other in others:
+                    if other is None:
+                        continue
+                    for j in other:
+                        checked += 1
+                        reach = half + sizes[j] / 2
+                        if abs(x - xs[j]) <= reach and abs(y - ys[j]) <= reach:
+                            result.append((i, j) if i < j else (j, i))
+        # Порядок пар важен: столкновение сдвигает фигуры, и следующая пара
+        # видит уже новые координаты — поэтому идём в порядке полного перебора
+        result.sort()
+        self.checked = checked
+        self.candidates = len(result)
+        return result
@@ -0,0 +1,153 @@
+# Физика симуляции без окна: мир, фигуры и шаг физики целиком.
+#
+# Шаг физики (движение фигур, широкая фаза, столкновения) раньше был
+# методами PhysicsSimulation в main.py и брал размеры из холста, так что
+# без окна tkinter его нельзя было сделать. PhysicsEngine держит всё, что
+# нужно для шага, — мир (world.py), фигуры (bodies.py), широкую фазу и
+# размеры поля — и ничего не знает о tkinter. Окно (main.py) держит
+# движок и после шагов только переносит координаты фигур на холст, а
+# headless.py гоняет тот же движок без окна столько шагов, сколько нужно.
+#
+# В шаге нет ни случайности, ни времени: одна и та же сцена после одного
+# и того же числа шагов всегда приходит в одно и то же состояние.
+
+from contextlib import nullcontext
+
+from bodies import BODY_TYPES, Triangle
+from broadphase import SpatialGrid
+from narrowphase import SOLVER_ITERATIONS, resolve_circle_pairs
+from profiling import register_counter
+from world import CIRCLE, PhysicsWorld, np
+
+# Размеры поля по умолчанию (как у холста окна при запуске)
+WIDTH = 850
+HEIGHT = 550
+# Сила гравитации по умолчанию (ускорение вниз за один шаг физики)
+GRAVITY = 0.3
+# Счётчик замеров кадра: сколько пар фигур широкая фаза отдала на точную проверку
+PAIRS = register_counter("pairs", "пары")
+
+
+class PhysicsEngine:
+    """
+    Физика симуляции без окна: фигуры в мире world, поле width x height
+    и шаг step(). Фигуры лежат в shapes в порядке строк мира; добавлять
+    их — через spawn() (фигуры bodies.py) или add() (свои подклассы,
+    например фигуры окна с холстом). profiler — необязательный
+    FrameProfiler, в который пишутся фазы шага и число пар.
+    """
+
+    def __init__(self, width=WIDTH, height=HEIGHT, gravity=GRAVITY,
+                 iterations=SOLVER_ITERATIONS, profiler=None):
+        self.width = width
+        self.height = height
+        self.gravity = gravity
+        # Физический мир: координаты, скорости и массы всех фигур в общих массивах
+        self.world = PhysicsWorld()
+        # Все фигуры (i-я фигура - i-я строка мира)
+        self.shapes = []
+        # Широкая фаза столкновений: отбирает пары соседних фигур (см. broadphase.py)
+        self.broad_phase = SpatialGrid()
+        # Сколько пар фигур дошло до точной проверки столкновения на последнем шаге
+        self.candidate_pairs = 0
+        # Сколько раз за шаг уточнять импульсы касаний кругов (см. narrowphase.py)
+        self.solver_iterations = iterations
+        self.profiler = profiler
+        # Сколько шагов сделано с последней очистки
+        self.steps = 0
+
+    def clear(self):
+        """Удаляет все фигуры и обнуляет счётчик шагов."""
+        self.shapes.clear()
+        self.world.clear()
+        self.steps = 0
+
+    def add(self, shape):
+        """Добавляет фигуру, уже созданную в self.world, и возвращает её."""
+        self.shapes.append(shape)
+        return shape
+
+    def spawn(self, kind, x, y, size, mass=1.0):
+        """Создаёт фигуру вида kind (CIRCLE, SQUARE, TRIANGLE) без холста и возвращает её."""
+        return self.add(BODY_TYPES[kind](self.world, x, y, size, mass))
+
+    def profile_phase(self, name):
+        """Таймер фазы кадра для with, если замеры включены."""
+        return self.profiler.phase(name) if self.profiler is not None else nullcontext()
+
+    def step(self, width=None, height=None):
+        """
+        Один шаг физики: гравитация, трение, движение и стенки для всех фигур,
+        затем столкновения. width и height меняют размеры поля (окно передаёт
+        размеры холста, который могли растянуть).
+        """
+        if width is not None:
+            self.width = width
+        if height is not None:
+            self.height = height
+        # Двигаем фигуры и отражаем их от границ поля (перетаскиваемые мир не трогает)
+        with self.profile_phase("step"):
+            self.world.step(self.gravity, self.width, self.height)
+        # Проверяем и обрабатываем столкновения между фигурами
+        with self.profile_phase("collision"):
+            self.check_collisions()
+        self.steps += 1
+
+    def run(self, steps, on_step=None):
+        """Делает steps шагов подряд; после каждого вызывает on_step(engine), если задан."""
+        for _ in range(steps):
+            self.step()
+            if on_step is not None:
+                on_step(self)
+
+    def check_collisions(self):
+        """Проверить столкновения между фигурами, которые широкая фаза сочла соседними."""
+        # Широкая фаза: пары (i, j) фигур, чьи ограничивающие квадраты пересекаются
+        pairs = self.broad_phase.pairs(*self.world.lists("x", "y", "size"))
+        # Запоминаем число пар-кандидатов за шаг и отдаём его в замеры, если они включены
+        self.candidate_pairs = len(pairs)
+        if self.profiler is not None:
+            self.profiler.count(PAIRS, len(pairs))
+        # Без NumPy пары делятся на те же группы циклом по спискам
+        if np is None:
+            dragged, kind = self.world.lists("dragged", "kind")
+            free = [(i, j) for i, j in pairs if not (dragged[i] or dragged[j])]
+            circles = [(i, j) for i, j in free if kind[i] == CIRCLE and kind[j] == CIRCLE]
+            resolve_circle_pairs(
+                self.world, [i for i, _ in circles], [j for _, j in circles], self.solver_iterations
+            )
+            self.collide_pairs((i, j) for i, j in free if not (kind[i] == CIRCLE and kind[j] == CIRCLE))
+            return
+        # Пары номеров двумя массивами: первые и вторые фигуры пар
+        first, second = np.array(pairs, dtype=np.intp).reshape(-1, 2).T
+        # Пропускаем столкновения, если хотя бы одна фигура перетаскивается
+        dragged = self.world.dragged
+        free = ~(dragged[first] | dragged[second])
+        # Пары двух кругов решаются все сразу массивами
+        kind = self.world.kind
+        circles = free & (kind[first] == CIRCLE) & (kind[second] == CIRCLE)
+        resolve_circle_pairs(self.world, first[circles], second[circles], self.solver_iterations)
+        # Остальные пары (с квадратами и треугольниками) - по одной, уже после кругов,
+        # чтобы треугольники и коробки выталкивали из себя сдвинутые круги
+        rest = free & ~circles
+        self.collide_pairs(zip(first[rest].tolist(), second[rest].tolist()))
+
+    def collide_pairs(self, pairs):
+        """Обработать столкновения пар (i, j) по одной в заданном порядке."""
+        shapes = self.shapes
+        # Флаги перетаскивания списком (столкновения их не меняют)
+        dragged, = self.world.lists("dragged")
+        for i, j in pairs:
+            # Пропускаем столкновения, если хотя бы одна фигура перетаскивается
+            if dragged[i] or dragged[j]:
+                continue
+            shape1 = shapes[i]
+            shape2 = shapes[j]
+            # Другие фигуры соскальзывают с треугольников
+            if isinstance(shape1, Triangle):
+                shape1.on_collision(shape2)
+            elif isinstance(shape2, Triangle):
+                shape2.on_collision(shape1)
+            else:
+                # Обычное столкновение между кругами и/или квадратами
+                shape1.on_collision(shape2)
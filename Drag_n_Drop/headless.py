@@ -0,0 +1,114 @@
+# Прогон симуляции без окна: сцена -> N шагов физики -> итог в файл.
+#
+# Окно main.py делает не больше 60 шагов в секунду и требует дисплея,
+# поэтому проверять тысячи сценариев падения через него нельзя. Этот
+# скрипт строит ту же физику (PhysicsEngine из engine.py, фигуры из
+# bodies.py) без tkinter и делает шаги подряд так быстро, как может.
+# Шаг физики не зависит ни от времени, ни от случайности, поэтому одна
+# и та же сцена (или одно и то же --random N --seed S) всегда даёт один
+# и тот же итог — прогон можно повторить и сравнить побайтно.
+#
+#     python headless.py --random 200 --seed 7 --steps 600 --output final.json
+#     python headless.py scene.json --steps 300 --trajectory path.csv --every 10
+#     python main.py --scene final.json     # посмотреть итог в окне
+
+import argparse
+import csv
+import json
+import sys
+import time
+
+from engine import PhysicsEngine
+from narrowphase import SOLVER_ITERATIONS
+from scene import KIND_NAMES, initial_scene, load_scene, populate, random_scene, save_scene, snapshot
+
+# Сколько шагов делать по умолчанию (10 секунд симуляции при 60 шагах в секунду)
+STEPS = 600
+# Столбцы файла траекторий
+TRAJECTORY_FIELDS = ("step", "index", "kind", "x", "y", "vx", "vy")
+
+
+def trajectory_rows(engine):
+    """Строки траекторий для текущего шага движка: по строке на фигуру."""
+    columns = engine.world.lists("kind", "x", "y", "vx", "vy")
+    return [
+        (engine.steps, index, KIND_NAMES[kind], x, y, vx, vy)
+        for index, (kind, x, y, vx, vy) in enumerate(zip(*columns))
+    ]
+
+
+def simulate(scene, steps, iterations=SOLVER_ITERATIONS, every=0, rows=None):
+    """
+    Делает steps шагов физики от сцены scene и возвращает движок. Если every
+    больше нуля, строки траекторий начального состояния и каждого every-го
+    шага дописываются в список rows.
+    """
+    engine = populate(PhysicsEngine(iterations=iterations), scene)
+    if every <= 0:
+        engine.run(steps)
+        return engine
+
+    def record(engine):
+        if engine.steps % every == 0:
+            rows.extend(trajectory_rows(engine))
+
+    rows.extend(trajectory_rows(engine))
+    engine.run(steps, record)
+    return engine
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Прогон симуляции фигур без окна")
+    parser.add_argument("scene", nargs="?", metavar="SCENE",
+                        help="файл сцены JSON (по умолчанию - начальные фигуры окна)")
+    parser.add_argument("--random", type=int, metavar="N",
+                        help="вместо файла взять N случайных фигур (см. --seed)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="зерно случайной сцены: одно зерно - одна и та же сцена (по умолчанию 0)")
+    parser.add_argument("--steps", type=int, default=STEPS,
+                        help=f"сколько шагов физики сделать (по умолчанию {STEPS}, 60 шагов - секунда)")
+    parser.add_argument("--iterations", type=int, default=SOLVER_ITERATIONS, metavar="N",
+                        help=f"итераций уточнения импульсов кругов за шаг (по умолчанию {SOLVER_ITERATIONS})")
+    parser.add_argument("--output", metavar="FILE",
+                        help="куда записать итоговое состояние сценой JSON (по умолчанию - в вывод)")
+    parser.add_argument("--trajectory", metavar="FILE",
+                        help="записать траектории фигур в CSV: " + ",".join(TRAJECTORY_FIELDS))
+    parser.add_argument("--every", type=int, default=1, metavar="K",
+                        help="писать в траектории каждый K-й шаг (по умолчанию каждый)")
+    parser.add_argument("--save-scene", metavar="FILE",
+                        help="записать и начальную сцену (например, случайную - чтобы открыть её в окне)")
+    args = parser.parse_args()
+
+    if args.random is not None:
+        scene = random_scene(args.random, args.seed)
+    elif args.scene:
+        scene = load_scene(args.scene)
+    else:
+        scene = initial_scene()
+    if args.save_scene:
+        save_scene(scene, args.save_scene)
+
+    rows = []
+    started = time.perf_counter()
+    engine = simulate(scene, args.steps, args.iterations, args.every if args.trajectory else 0, rows)
+    elapsed = time.perf_counter() - started
+
+    if args.trajectory:
+        with open(args.trajectory, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(TRAJECTORY_FIELDS)
+            writer.writerows(rows)
+    final = snapshot(engine, scene.get("seed"))
+    if args.output:
+        save_scene(final, args.output)
+    else:
+        json.dump(final, sys.stdout, ensure_ascii=False, indent=1)
+        print()
+    # Скорость прогона - в поток ошибок, чтобы не мешать итогу в выводе
+    rate = engine.steps / elapsed if elapsed > 0 else float("inf")
+    print(f"{len(engine.shapes)} фигур, {engine.steps} шагов за {elapsed:.2f} с ({rate:.0f} шагов/с)",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,168 +1,69 @@
 # Импортируем стандартную библиотеку tkinter для создания графического интерфейса
+import argparse
 import tkinter as tk
-# Импортируем модуль math для математических вычислений (синусы, косинусы, квадратные корни)
-import math
-# Импортируем декоратор dataclass для автоматического создания классов с данными
-from dataclasses import dataclass
 from typing import List, Optional
 
+# Физика фигур и шаг физики без окна (окно только показывает их на холсте)
+import bodies
+from bodies import Vector
+from engine import PhysicsEngine
+from narrowphase import SOLVER_ITERATIONS
+from profiling import RENDER, CountingCanvas, FrameProfiler, ProfileOverlay
+from scene import DEFAULT_COLOR, DEFAULT_MASS, initial_scene, load_scene, populate
+from timestep import DISPLAY_FPS, MAX_SUBSTEPS, SUBSTEPS, FixedTimestep
+from world import CIRCLE, SQUARE, TRIANGLE
 
-# Создаем класс Vector для удобной работы с векторами (направленными отрезками)
-# Векторы нужны для представления скорости, ускорения и других физических величин с направлением
-@dataclass
-class Vector:
-    """Вектор для работы с физическими величинами - имеет направление и длину (модуль)"""
-    # Координата X вектора (горизонтальная составляющая)
-    x: float = 0.0
-    # Координата Y вектора (вертикальная составляющая)
-    y: float = 0.0
-    
-    # Метод сложения двух векторов: результат - новый вектор с суммой координат
-    # Например: (2, 3) + (1, 4) = (3, 7)
-    def __add__(self, other):
-        return Vector(self.x + other.x, self.y + other.y)
-    
-    # Метод вычитания векторов: результат - вектор разности координат
-    # Например: (5, 6) - (2, 1) = (3, 5)
-    def __sub__(self, other):
-        return Vector(self.x - other.x, self.y - other.y)
-    
-    # Метод умножения вектора на число (скаляр): масштабирует вектор
-    # Например: (3, 4) * 2 = (6, 8) - вектор становится в 2 раза длиннее
-    def __mul__(self, scalar):
-        return Vector(self.x * scalar, self.y * scalar)
-    
-    # Метод вычисления длины (модуля) вектора по теореме Пифагора
-    # Для вектора (3, 4) длина = sqrt(3² + 4²) = 5
-    def magnitude(self):
-        return math.hypot(self.x, self.y)
-    
-    # Метод нормализации вектора: превращает его в единичный вектор (длиной 1) 
-    # с сохранением направления. Нужен для работы с направлениями без учета длины.
-    def normalize(self):
-        # Сначала вычисляем текущую длину вектора
-        mag = self.magnitude()
-        # Если длина равна нулю (вектор нулевой), возвращаем нулевой вектор
-        if mag == 0:
-            return Vector(0, 0)
-        # Делим каждую координату на длину, получая вектор длиной 1
-        return Vector(self.x / mag, self.y / mag)
 
-
-# Базовый класс для всех фигур - содержит общую логику для кругов, квадратов и треугольников
-class Shape:
-    """Базовый класс для всех фигур - определяет общие свойства и поведение"""
-    # Конструктор класса вызывается при создании любой фигуры
-    def __init__(self, canvas, x, y, size, color, mass=1.0):
+# Фигура окна: физика из bodies.py и объект на холсте, который её показывает
+class Shape(bodies.Body):
+    """
+    Базовый класс фигур окна: ручка строки физического мира (см. bodies.py)
+    и объект на холсте tkinter, который эту строку показывает
+    """
+    # Конструктор класса вызывается при создании любой фигуры окна
+    def __init__(self, world, canvas, x, y, size, color, mass=1.0):
         # Ссылка на холст tkinter, на котором будет рисоваться фигура
         self.canvas = canvas
-        # Горизонтальная координата центра фигуры (ось X)
-        self.x = x
-        # Вертикальная координата центра фигуры (ось Y)
-        self.y = y
-        # Характерный размер фигуры (диаметр для круга, сторона для квадрата)
-        self.size = size
         # Цвет заливки фигуры в формате HEX (#RRGGBB)
         self.color = color
-        # Масса фигуры для физических расчетов (в условных единицах)
-        self.mass = mass
-        # Вектор скорости фигуры - определяет направление и скорость движения
-        self.velocity = Vector(0, 0)
-        # Флаг: находится ли фигура сейчас в режиме перетаскивания мышью
-        self.is_dragged = False
         # Идентификатор объекта на холсте tkinter (нужен для обновления позиции)
         self.shape_id = None
+        # Физическая часть фигуры: строка в мире world
+        super().__init__(world, x, y, size, mass)
         # Вызываем метод создания визуального представления фигуры на холсте
         self.create_shape()
-        
+    
     # Абстрактный метод: создание фигуры на холсте (реализуется в подклассах)
     def create_shape(self):
         """Создать визуальное представление фигуры на холсте (реализуется в подклассах)"""
         pass
     
-    # Абстрактный метод: обновление позиции фигуры на холсте после изменения координат
+    # Обновление позиции фигуры на холсте после изменения координат
     def update_position(self):
-        """Обновить позицию фигуры на холсте после изменения координат (реализуется в подклассах)"""
+        """Обновить позицию фигуры на холсте после изменения координат"""
+        # Берём центр и размер из мира и рисуем фигуру там
+        self.place(self.x, self.y, self.size)
+    
+    # Абстрактный метод: показать фигуру на холсте с центром (x, y) и размером size
+    def place(self, x, y, size):
+        """
+        Передвинуть объект фигуры на холсте (реализуется в подклассах). Координаты
+        передаются явно, чтобы после шага мира не читать их по одной через ручку
+        """
         pass
     
     # Метод перемещения фигуры на заданное расстояние по осям X и Y
     def move(self, dx, dy):
         """Переместить фигуру на расстояние dx по горизонтали и dy по вертикали"""
-        # Увеличиваем текущую координату X на величину dx
-        self.x += dx
-        # Увеличиваем текущую координату Y на величину dy
-        self.y += dy
+        # Сдвигаем фигуру в мире
+        super().move(dx, dy)
         # Обновляем визуальное отображение фигуры на новой позиции
         self.update_position()
-    
-    # Метод применения силы гравитации к фигуре (ускорение вниз)
-    def apply_gravity(self, gravity_strength):
-        """Применить силу гравитации - увеличить вертикальную скорость вниз"""
-        # Гравитация действует ТОЛЬКО если фигура не перетаскивается мышью
-        if not self.is_dragged:
-            # Увеличиваем вертикальную составляющую скорости (ось Y)
-            # Чем больше gravity_strength, тем быстрее падает фигура
-            self.velocity.y += gravity_strength
-    
-    # Метод применения трения для замедления горизонтального движения
-    def apply_friction(self, friction=0.98):
-        """Применить трение - постепенно замедлять горизонтальное движение"""
-        # Трение действует ТОЛЬКО если фигура не перетаскивается мышью
-        if not self.is_dragged:
-            # Умножаем горизонтальную скорость на коэффициент < 1
-            # Например: 0.98 означает потерю 2% скорости за каждый кадр
-            self.velocity.x *= friction
-    
-    # Абстрактный метод: проверка, находится ли точка (px, py) внутри фигуры
-    def contains_point(self, px, py):
-        """Проверить, находится ли точка с координатами (px, py) внутри фигуры"""
-        return False
-    
-    # Абстрактный метод: обработка столкновения с другой фигурой
-    def on_collision(self, other):
-        """Обработка столкновения с другой фигурой (логика зависит от типа фигур)"""
-        pass
-    
-    # Метод обработки столкновения фигуры с границами холста (пол, стены, потолок)
-    def resolve_boundary_collision(self, width, height, restitution=0.7):
-        """Обработка столкновения с границами холста с учетом упругости"""
-        # Проверяем столкновение с нижней границей (полом)
-        if self.y + self.size/2 > height:
-            # Корректируем позицию, чтобы фигура не проваливалась под пол
-            self.y = height - self.size/2
-            # Меняем направление вертикальной скорости (отскок вверх)
-            # Умножаем на restitution (коэффициент упругости): 0.7 = 70% энергии сохраняется
-            self.velocity.y = -self.velocity.y * restitution
-            # Дополнительное трение при контакте с полом для замедления скольжения
-            self.velocity.x *= 0.9
-        
-        # Проверяем столкновение с верхней границей (потолком)
-        if self.y - self.size/2 < 0:
-            # Корректируем позицию, чтобы фигура не вылетала за потолок
-            self.y = self.size/2
-            # Отскок вниз с потерей энергии
-            self.velocity.y = -self.velocity.y * restitution
-        
-        # Проверяем столкновение с правой стеной
-        if self.x + self.size/2 > width:
-            # Корректируем позицию у правой стены
-            self.x = width - self.size/2
-            # Отскок влево с потерей энергии
-            self.velocity.x = -self.velocity.x * restitution
-        # Проверяем столкновение с левой стеной
-        elif self.x - self.size/2 < 0:
-            # Корректируем позицию у левой стены
-            self.x = self.size/2
-            # Отскок вправо с потерей энергии
-            self.velocity.x = -self.velocity.x * restitution
-        
-        # Обновляем визуальное отображение фигуры на скорректированной позиции
-        self.update_position()
 
 
-# Класс круга - наследуется от базового класса Shape
-class Circle(Shape):
-    """Круг - отскакивает при падении благодаря высокому коэффициенту упругости"""
+# Класс круга окна - физика круга из bodies.py и овал на холсте
+class Circle(Shape, bodies.Circle):
+    """Круг на холсте - отскакивает при падении благодаря высокому коэффициенту упругости"""
     # Переопределяем метод создания визуального представления для круга
     def create_shape(self):
         # Создаем овал на холсте с помощью метода create_oval
@@ -182,75 +83,24 @@ class Circle(Shape):
             outline="black", width=2
         )
     
-    # Переопределяем метод обновления позиции для круга
-    def update_position(self):
+    # Переопределяем метод перемещения объекта круга на холсте
+    def place(self, x, y, size):
+        # Половина размера - радиус круга
+        half = size/2
         # Обновляем координаты овала на холсте с новыми позициями центра
         self.canvas.coords(
             # Идентификатор объекта на холсте
             self.shape_id,
             # Новые координаты левого верхнего угла
-            self.x - self.size/2, self.y - self.size/2,
+            x - half, y - half,
             # Новые координаты правого нижнего угла
-            self.x + self.size/2, self.y + self.size/2
+            x + half, y + half
         )
-    
-    # Переопределяем метод проверки попадания точки внутрь круга
-    def contains_point(self, px, py):
-        # Вычисляем разницу координат между точкой и центром круга
-        dx = px - self.x
-        dy = py - self.y
-        # Точка внутри круга, если расстояние до центра меньше радиуса
-        # Используем math.hypot для вычисления гипотенузы (расстояния)
-        return math.hypot(dx, dy) <= self.size/2
-    
-    # Переопределяем метод обработки столкновения для круга (упругое столкновение)
-    def on_collision(self, other):
-        """Упругое столкновение с сохранением импульса и энергии"""
-        # Вычисляем вектор между центрами двух кругов
-        dx = self.x - other.x
-        dy = self.y - other.y
-        # Вычисляем расстояние между центрами по теореме Пифагора
-        distance = math.hypot(dx, dy)
-        
-        # Проверяем, действительно ли произошло столкновение (дистанция меньше суммы радиусов)
-        # и избегаем деления на ноль (distance > 0)
-        if distance < (self.size/2 + other.size/2) and distance > 0:
-            # Нормализуем вектор направления (делаем его длиной 1)
-            nx = dx / distance
-            ny = dy / distance
-            
-            # Вычисляем относительную скорость двух фигур
-            dvx = self.velocity.x - other.velocity.x
-            dvy = self.velocity.y - other.velocity.y
-            
-            # Вычисляем проекцию относительной скорости на линию столкновения
-            # (1 + 0.8) - коэффициент восстановления (0.8 = 80% упругости)
-            impulse = (dvx * nx + dvy * ny) * (1 + 0.8) / (1/self.mass + 1/other.mass)
-            
-            # Применяем импульс к первой фигуре (закон сохранения импульса)
-            self.velocity.x -= impulse * nx / self.mass
-            self.velocity.y -= impulse * ny / self.mass
-            # Применяем противоположный импульс ко второй фигуре
-            other.velocity.x += impulse * nx / other.mass
-            other.velocity.y += impulse * ny / other.mass
-            
-            # Раздвигаем фигуры, чтобы избежать "залипания" при пересечении
-            overlap = (self.size/2 + other.size/2) - distance
-            if overlap > 0:
-                # Первая фигура сдвигается вдоль нормали на половину пересечения
-                self.x += nx * overlap * 0.5
-                self.y += ny * overlap * 0.5
-                # Вторая фигура сдвигается в противоположном направлении
-                other.x -= nx * overlap * 0.5
-                other.y -= ny * overlap * 0.5
-                # Обновляем визуальное отображение обеих фигур
-                self.update_position()
-                other.update_position()
 
 
-# Класс квадрата - наследуется от базового класса Shape
-class Square(Shape):
-    """Квадрат - падает без отскока благодаря низкому коэффициенту упругости"""
+# Класс квадрата окна - физика квадрата из bodies.py и прямоугольник на холсте
+class Square(Shape, bodies.Square):
+    """Квадрат на холсте - падает без отскока благодаря низкому коэффициенту упругости"""
     # Переопределяем метод создания визуального представления для квадрата
     def create_shape(self):
         # Создаем прямоугольник на холсте с помощью метода create_rectangle
@@ -269,79 +119,30 @@ class Square(Shape):
             outline="black", width=2
         )
     
-    # Переопределяем метод обновления позиции для квадрата
-    def update_position(self):
+    # Переопределяем метод перемещения объекта квадрата на холсте
+    def place(self, x, y, size):
+        # Половина стороны квадрата
+        half = size/2
         # Обновляем координаты прямоугольника на холсте
         self.canvas.coords(
             self.shape_id,
-            self.x - self.size/2, self.y - self.size/2,
-            self.x + self.size/2, self.y + self.size/2
+            x - half, y - half,
+            x + half, y + half
         )
-    
-    # Переопределяем метод проверки попадания точки внутрь квадрата
-    def contains_point(self, px, py):
-        # Точка внутри квадрата, если её координаты находятся в пределах половины размера
-        # от центра по обеим осям
-        return (abs(px - self.x) <= self.size/2 and 
-                abs(py - self.y) <= self.size/2)
-    
-    # Переопределяем метод обработки столкновения для квадрата (неупругое столкновение)
-    def on_collision(self, other):
-        """Неупругое столкновение - минимальный отскок, быстрая потеря энергии"""
-        # Вычисляем вектор между центрами фигур
-        dx = self.x - other.x
-        dy = self.y - other.y
-        # Вычисляем расстояние между центрами
-        distance = math.hypot(dx, dy)
-        
-        # Проверяем факт столкновения
-        if distance < (self.size/2 + other.size/2) and distance > 0:
-            # Нормализуем вектор направления
-            nx = dx / distance
-            ny = dy / distance
-            
-            # Раздвигаем фигуры для предотвращения залипания
-            overlap = (self.size/2 + other.size/2) - distance
-            if overlap > 0:
-                self.x += nx * overlap * 0.5
-                self.y += ny * overlap * 0.5
-                other.x -= nx * overlap * 0.5
-                other.y -= ny * overlap * 0.5
-                self.update_position()
-                other.update_position()
-            
-            # Сильно гасим скорость обеих фигур (неупругое столкновение)
-            # 0.95 означает потерю 5% скорости при каждом столкновении
-            self.velocity.x *= 0.95
-            self.velocity.y *= 0.95
-            other.velocity.x *= 0.95
-            other.velocity.y *= 0.95
 
 
-# Класс треугольника - наследуется от базового класса Shape
-class Triangle(Shape):
-    """Треугольник - фигуры соскальзывают по его наклонным сторонам"""
+# Класс треугольника окна - физика треугольника из bodies.py и многоугольник на холсте
+class Triangle(Shape, bodies.Triangle):
+    """Треугольник на холсте - фигуры соскальзывают по его наклонным сторонам"""
     # Переопределяем конструктор для установки большей массы (треугольник почти неподвижен)
-    def __init__(self, canvas, x, y, size, color, mass=2.0):
+    def __init__(self, world, canvas, x, y, size, color, mass=2.0):
         # У треугольника больше масса (по умолчанию 2.0), чтобы он был "неподвижен"
         # при столкновениях с легкими фигурами
-        super().__init__(canvas, x, y, size, color, mass)
-        # Список вершин треугольника (каждая вершина - кортеж (x, y))
-        self.points = []
+        super().__init__(world, canvas, x, y, size, color, mass)
     
     # Переопределяем метод создания визуального представления для треугольника
     def create_shape(self):
-        # Вычисляем высоту равностороннего треугольника по формуле: h = a * sqrt(3) / 2
-        h = self.size * math.sqrt(3) / 2
-        # Определяем координаты трех вершин равностороннего треугольника
-        self.points = [
-            # Верхняя вершина (острие вверх)
-            (self.x, self.y - h/2),
-            # Левая нижняя вершина
-            (self.x - self.size/2, self.y + h/2),
-            # Правая нижняя вершина
-            (self.x + self.size/2, self.y + h/2)
-        ]
+        # Вершины треугольника (self.points) уже посчитал конструктор bodies.Triangle
         # Создаем многоугольник на холсте с тремя вершинами
         self.shape_id = self.canvas.create_polygon(
             # Распаковываем список вершин в плоский список координат [x1, y1, x2, y2, x3, y3]
@@ -358,161 +159,24 @@ class Triangle(Shape):
         # Генератор списка: для каждой точки извлекаем обе координаты
         return [coord for point in points for coord in point]
     
-    # Переопределяем метод обновления позиции для треугольника
-    def update_position(self):
+    # Переопределяем метод перемещения объекта треугольника на холсте
+    def place(self, x, y, size):
         # Пересчитываем координаты вершин при изменении позиции центра
-        h = self.size * math.sqrt(3) / 2
-        self.points = [
-            (self.x, self.y - h/2),
-            (self.x - self.size/2, self.y + h/2),
-            (self.x + self.size/2, self.y + h/2)
-        ]
+        self.points = self.vertices(x, y, size)
         # Обновляем координаты многоугольника на холсте
         self.canvas.coords(self.shape_id, *self._flatten_points(self.points))
-    
-    # Переопределяем метод проверки попадания точки внутрь треугольника
-    def contains_point(self, px, py):
-        """Проверка точки внутри треугольника через барицентрические координаты"""
-        # Вспомогательная функция для вычисления знака ориентации трех точек
-        def sign(p1, p2, p3):
-            # Возвращает положительное число, если точка p3 справа от вектора p1->p2
-            return (p1[0] - p3[0]) * (p2[1] - p3[1]) - (p2[0] - p3[0]) * (p1[1] - p3[1])
-        
-        # Проверяем, находится ли точка по одну сторону от всех трех ребер треугольника
-        b1 = sign((px, py), self.points[0], self.points[1]) < 0.0
-        b2 = sign((px, py), self.points[1], self.points[2]) < 0.0
-        b3 = sign((px, py), self.points[2], self.points[0]) < 0.0
-        
-        # Точка внутри треугольника, если все три проверки дали одинаковый результат
-        return (b1 == b2) and (b2 == b3)
-    
-    # Метод определения нормали (перпендикуляра) к поверхности в точке контакта
-    def get_surface_normal(self, px, py):
-        """
-        Определить нормаль к поверхности в точке контакта.
-        Возвращает нормаль к ближайшей стороне треугольника.
-        """
-        # Инициализируем минимальное расстояние бесконечностью
-        min_dist = float('inf')
-        # Нормаль по умолчанию направлена вверх (0, -1)
-        closest_normal = Vector(0, -1)
-        
-        # Проверяем все три стороны треугольника
-        for i in range(3):
-            # Берем две вершины, образующие сторону
-            p1 = self.points[i]
-            p2 = self.points[(i + 1) % 3]
-            
-            # Вычисляем вектор стороны (от p1 к p2)
-            side_vec = Vector(p2[0] - p1[0], p2[1] - p1[1])
-            # Нормаль к стороне получается поворотом вектора стороны на 90° против часовой
-            normal = Vector(-side_vec.y, side_vec.x).normalize()
-            
-            # Вектор от первой вершины стороны к проверяемой точке
-            to_point = Vector(px - p1[0], py - p1[1])
-            # Длина проекции точки на сторону (параметр положения вдоль стороны)
-            proj_length = (to_point.x * side_vec.x + to_point.y * side_vec.y) / side_vec.magnitude()
-            # Ограничиваем проекцию пределами отрезка стороны
-            proj_length = max(0, min(proj_length, side_vec.magnitude()))
-            
-            # Координаты ближайшей точки на стороне
-            closest_point = Vector(
-                p1[0] + side_vec.normalize().x * proj_length,
-                p1[1] + side_vec.normalize().y * proj_length
-            )
-            
-            # Расстояние от проверяемой точки до стороны
-            dist = math.hypot(px - closest_point.x, py - closest_point.y)
-            
-            # Если эта сторона ближе предыдущих, запоминаем её нормаль
-            if dist < min_dist:
-                min_dist = dist
-                # Проверяем направление нормали: должна быть НАРУЖУ треугольника
-                center = Vector(self.x, self.y)
-                to_center = Vector(center.x - closest_point.x, center.y - closest_point.y)
-                # Если центр треугольника находится по ту же сторону от нормали - разворачиваем её
-                if to_center.x * normal.x + to_center.y * normal.y > 0:
-                    normal = Vector(-normal.x, -normal.y)
-                closest_normal = normal
-        
-        # Возвращаем нормаль к ближайшей стороне
-        return closest_normal
-    
-    # Переопределяем метод обработки столкновения для треугольника (соскальзывание)
-    def on_collision(self, other):
-        """
-        Обработка столкновения: другие фигуры соскальзывают по сторонам треугольника.
-        Треугольник почти неподвижен благодаря большой массе.
-        """
-        # Оптимизация: быстрая проверка пересечения ограничивающих прямоугольников
-        dx = abs(self.x - other.x)
-        dy = abs(self.y - other.y)
-        # Если фигуры слишком далеко друг от друга - столкновения нет
-        if dx > (self.size/2 + other.size/2) or dy > (self.size/2 + other.size/2):
-            return
-        
-        # Вычисляем высоту треугольника для дальнейших расчетов
-        h = self.size * math.sqrt(3) / 2
-        # Проверяем все три стороны треугольника на столкновение
-        for i in range(3):
-            p1 = self.points[i]
-            p2 = self.points[(i + 1) % 3]
-            
-            # Вектор стороны треугольника
-            side_vec = Vector(p2[0] - p1[0], p2[1] - p1[1])
-            # Вектор от вершины к центру другой фигуры
-            to_point = Vector(other.x - p1[0], other.y - p1[1])
-            
-            # Нормаль к стороне (перпендикуляр), направленная наружу
-            normal = Vector(-side_vec.y, side_vec.x).normalize()
-            # Корректируем направление нормали наружу треугольника
-            center_vec = Vector(self.x - p1[0], self.y - p1[1])
-            if center_vec.x * normal.x + center_vec.y * normal.y > 0:
-                normal = Vector(-normal.x, -normal.y)
-            
-            # Расстояние от центра фигуры до линии стороны (проекция на нормаль)
-            distance = abs(to_point.x * normal.x + to_point.y * normal.y)
-            
-            # Если расстояние меньше радиуса фигуры + небольшой запас - есть столкновение
-            if distance < other.size/2 + 2:
-                # Точка проекции центра фигуры на линию стороны
-                proj = to_point - normal * (to_point.x * normal.x + to_point.y * normal.y)
-                proj_point = Vector(p1[0] + proj.x, p1[1] + proj.y)
-                
-                # Проверяем, что проекция лежит на отрезке стороны (не за его пределами)
-                t = (proj.x * side_vec.x + proj.y * side_vec.y) / (side_vec.magnitude() ** 2)
-                if 0 <= t <= 1:
-                    # Раздвигаем фигуры чтобы избежать пересечения
-                    overlap = other.size/2 + 2 - distance
-                    if overlap > 0:
-                        other.x += normal.x * overlap
-                        other.y += normal.y * overlap
-                        other.update_position()
-                    
-                    # Вычисляем касательный вектор (вдоль поверхности)
-                    tangent = Vector(-normal.y, normal.x)
-                    
-                    # Скорость вдоль касательной (сохраняется при соскальзывании)
-                    tangent_speed = other.velocity.x * tangent.x + other.velocity.y * tangent.y
-                    
-                    # Скорость по нормали (гасится при контакте с поверхностью)
-                    normal_speed = other.velocity.x * normal.x + other.velocity.y * normal.y
-                    
-                    # Новая скорость: движение вдоль поверхности + слабое отталкивание от поверхности
-                    other.velocity = tangent * tangent_speed + normal * (normal_speed * -0.3)
-                    
-                    # Добавляем эффект соскальзывания вниз по наклону
-                    # Чем больше наклон (меньше |normal.y|), тем сильнее соскальзывание
-                    if abs(normal.y) > 0.3:
-                        slide_factor = 0.2 * (1 - abs(normal.y))
-                        other.velocity.y += slide_factor * 2
+
+
+# Класс фигуры окна для каждого вида фигур
+SHAPE_VIEWS = {CIRCLE: Circle, SQUARE: Square, TRIANGLE: Triangle}
 
 
 # Основной класс симуляции - управляет всеми фигурами и физикой
 class PhysicsSimulation:
     """Основной класс симуляции физики - координирует все объекты и анимацию"""
     # Конструктор приложения
-    def __init__(self, root):
+    def __init__(self, root, profile=False, trace=None, iterations=SOLVER_ITERATIONS,
+                 fps=DISPLAY_FPS, speed=1.0, max_substeps=MAX_SUBSTEPS, interpolate=False, scene=None):
         # Сохраняем ссылку на главное окно tkinter
         self.root = root
         # Устанавливаем заголовок окна
@@ -522,17 +186,34 @@ class PhysicsSimulation:
         # Разрешаем изменение размера окна пользователем
         self.root.resizable(True, True)
         
+        # Замеры кадров (см. profiling.py) включаются только по желанию
+        self.profiler: Optional[FrameProfiler] = FrameProfiler() if profile or trace else None
+        # Файл, куда при закрытии окна сохранить трассу кадров
+        self.trace_path = trace
+        
         # Параметры симуляции
-        # Сила гравитации (ускорение вниз за один кадр)
-        self.gravity = 0.3
-        # Список всех фигур в симуляции
-        self.shapes: List[Shape] = []
+        # Физика без окна (см. engine.py): мир, фигуры, гравитация и столкновения;
+        # iterations - сколько раз за шаг уточнять импульсы касаний кругов
+        self.engine = PhysicsEngine(iterations=iterations, profiler=self.profiler)
+        # Физический мир движка: координаты, скорости и массы всех фигур в общих массивах
+        self.world = self.engine.world
+        # Список всех фигур движка (i-я фигура - i-я строка мира)
+        self.shapes: List[Shape] = self.engine.shapes
+        # Сцена, с которой начинается симуляция (None - начальные фигуры окна, см. scene.py)
+        self.scene = scene
         # Текущая перетаскиваемая фигура (или None если ничего не перетаскивается)
         self.selected_shape: Optional[Shape] = None
         # Смещение курсора относительно центра фигуры при перетаскивании
         self.drag_offset = Vector(0, 0)
         # Флаг работы симуляции (пауза/старт)
         self.running = True
+        # Физика идёт шагами постоянной длины независимо от частоты кадров (см. timestep.py);
+        # speed - во сколько раз время симуляции быстрее настоящего
+        self.timestep = FixedTimestep(max_substeps=max_substeps, speed=speed)
+        # Пауза между кадрами окна в миллисекундах
+        self.frame_ms = max(1, round(1000 / fps))
+        # Рисовать ли фигуры между двумя последними шагами физики (плавнее при частоте кадров выше 60)
+        self.interpolate = interpolate
         
         # Настраиваем пользовательский интерфейс
         self.setup_ui()
@@ -583,7 +264,7 @@ class PhysicsSimulation:
             command=self.update_gravity  # Функция вызывается при изменении значения
         )
         # Устанавливаем начальное значение ползунка
-        self.gravity_slider.set(self.gravity)
+        self.gravity_slider.set(self.engine.gravity)
         # Размещаем ползунок в интерфейсе
         self.gravity_slider.pack(side=tk.LEFT)
         
@@ -672,6 +353,17 @@ class PhysicsSimulation:
         self.canvas.bind("<ButtonRelease-1>", self.on_mouse_up)
         # Изменение размера окна
         self.root.bind("<Configure>", self.on_resize)
+        
+        # При включённых замерах фигуры рисуют через обёртку, которая считает вызовы холста
+        if self.profiler is not None:
+            # Надпись с замерами рисуется настоящим холстом, чтобы не попадать в замеры
+            self.overlay = ProfileOverlay(self.canvas, self.profiler)
+            # Все фигуры получат обёртку вместо холста
+            self.canvas = CountingCanvas(self.canvas, self.profiler)
+            # Клавиша F3 прячет и показывает надпись
+            self.root.bind("<F3>", lambda event: self.overlay.toggle())
+            # При закрытии окна сохраняем трассу
+            self.root.protocol("WM_DELETE_WINDOW", self.close)
     
     # Метод создания начальных фигур при запуске приложения
     def create_initial_shapes(self):
@@ -680,26 +372,26 @@ class PhysicsSimulation:
         canvas_width = self.canvas.winfo_width() or 850
         canvas_height = self.canvas.winfo_height() or 550
         
-        # Вертикальная позиция "линии старта" для падающих фигур
-        start_y = 80
-        
-        # Создаем два круга в верхней части экрана (будут отскакивать)
-        self.shapes.append(Circle(self.canvas, canvas_width * 0.25, start_y, 50, "#4CAF50", mass=1.0))
-        self.shapes.append(Circle(self.canvas, canvas_width * 0.35, start_y, 40, "#8BC34A", mass=0.8))
-        
-        # Создаем два квадрата (будут падать без отскока)
-        self.shapes.append(Square(self.canvas, canvas_width * 0.55, start_y, 45, "#2196F3", mass=1.2))
-        self.shapes.append(Square(self.canvas, canvas_width * 0.65, start_y, 55, "#03A9F4", mass=1.5))
-        
-        # Создаем два треугольника-платформы в нижней части экрана (фигуры будут соскальзывать)
-        self.shapes.append(Triangle(self.canvas, canvas_width * 0.85, canvas_height * 0.7, 80, "#FF9800", mass=5.0))
-        self.shapes.append(Triangle(self.canvas, canvas_width * 0.15, canvas_height * 0.6, 70, "#FF5722", mass=4.0))
+        # Сцена из файла или начальные фигуры окна под размер холста (гравитация - с ползунка)
+        scene = self.scene or initial_scene(canvas_width, canvas_height, self.engine.gravity)
+        # Заполняем движок фигурами сцены, которые умеют рисовать себя на холсте
+        populate(self.engine, scene, self.create_view)
+        # Гравитацию могла задать сцена - показываем её на ползунке
+        self.gravity_slider.set(self.engine.gravity)
+    
+    # Создание фигуры окна по описанию из сцены
+    def create_view(self, kind, spec):
+        """Создать фигуру вида kind на холсте по описанию spec из сцены (см. scene.py)"""
+        # Цвет и масса из сцены, а если их нет - по виду фигуры
+        color = spec.get("color", DEFAULT_COLOR[kind])
+        mass = spec.get("mass", DEFAULT_MASS[kind])
+        return SHAPE_VIEWS[kind](self.world, self.canvas, spec["x"], spec["y"], spec["size"], color, mass)
     
     # Метод обновления силы гравитации при изменении ползунка
     def update_gravity(self, value):
         """Обновить силу гравитации из значения ползунка"""
         # Преобразуем строковое значение в число с плавающей точкой
-        self.gravity = float(value)
+        self.engine.gravity = float(value)
     
     # Обработчик нажатия левой кнопки мыши
     def on_mouse_down(self, event):
@@ -780,20 +472,20 @@ class PhysicsSimulation:
         # Получаем ширину холста
         canvas_width = self.canvas.winfo_width() or 850
         # Создаем новый круг и добавляем в список фигур
-        self.shapes.append(Circle(self.canvas, canvas_width * 0.5, 50, 45, "#4CAF50", mass=1.0))
+        self.shapes.append(Circle(self.world, self.canvas, canvas_width * 0.5, 50, 45, "#4CAF50", mass=1.0))
     
     # Метод добавления нового квадрата
     def add_square(self):
         """Добавить новый квадрат в центр верхней части холста"""
         canvas_width = self.canvas.winfo_width() or 850
-        self.shapes.append(Square(self.canvas, canvas_width * 0.5, 50, 50, "#2196F3", mass=1.2))
+        self.shapes.append(Square(self.world, self.canvas, canvas_width * 0.5, 50, 50, "#2196F3", mass=1.2))
     
     # Метод добавления нового треугольника
     def add_triangle(self):
         """Добавить новый треугольник в центр нижней части холста"""
         canvas_width = self.canvas.winfo_width() or 850
         canvas_height = self.canvas.winfo_height() or 550
-        self.shapes.append(Triangle(self.canvas, canvas_width * 0.5, canvas_height * 0.7, 75, "#FF9800", mass=5.0))
+        self.shapes.append(Triangle(self.world, self.canvas, canvas_width * 0.5, canvas_height * 0.7, 75, "#FF9800", mass=5.0))
     
     # Метод сброса симуляции к начальному состоянию
     def reset_simulation(self):
@@ -802,9 +494,7 @@ class PhysicsSimulation:
         for shape in self.shapes:
             self.canvas.delete(shape.shape_id)
         
-        # Очищаем список фигур
-        self.shapes.clear()
-        # Создаем начальный набор фигур
+        # Создаем начальный набор фигур (движок при этом очищается от старых)
         self.create_initial_shapes()
     
     # Метод переключения паузы/старта симуляции
@@ -812,70 +502,111 @@ class PhysicsSimulation:
         """Переключить паузу/старт симуляции - остановить или возобновить физику"""
         # Инвертируем флаг состояния
         self.running = not self.running
-    
-    # Метод проверки столкновений между всеми парами фигур
-    def check_collisions(self):
-        """Проверить столкновения между всеми фигурами в симуляции"""
-        # Перебираем все пары фигур без повторений (каждую пару один раз)
-        for i, shape1 in enumerate(self.shapes):
-            for shape2 in self.shapes[i+1:]:
-                # Пропускаем столкновения, если хотя бы одна фигура перетаскивается
-                if shape1.is_dragged or shape2.is_dragged:
-                    continue
-                
-                # Специальная обработка для треугольников: другие фигуры соскальзывают с них
-                if isinstance(shape1, Triangle):
-                    shape1.on_collision(shape2)
-                elif isinstance(shape2, Triangle):
-                    shape2.on_collision(shape1)
-                else:
-                    # Обычное столкновение между кругами и/или квадратами
-                    shape1.on_collision(shape2)
+        # Время, пока симуляция стояла, догонять не нужно
+        self.timestep.reset()
+    
+    # Таймер фазы кадра (или пустой, если замеры выключены)
+    def profile_phase(self, name):
+        """Вернуть таймер фазы кадра для with, если замеры включены"""
+        # Тот же таймер, что у фаз шага движка
+        return self.engine.profile_phase(name)
+    
+    # Метод закрытия окна при включённых замерах
+    def close(self):
+        """Сохранить трассу кадров (если задан файл) и закрыть окно"""
+        if self.trace_path:
+            self.profiler.dump(self.trace_path)
+        self.root.destroy()
     
     # Основной цикл анимации - вызывается постоянно для обновления состояния
     def animation_loop(self):
-        """Основной цикл анимации - обновляет физику и положение всех фигур"""
+        """Основной цикл анимации - делает накопившиеся шаги физики и рисует фигуры"""
+        # Начинаем замер кадра
+        if self.profiler is not None:
+            self.profiler.begin_frame()
         # Выполняем физические расчеты только если симуляция запущена (не на паузе)
         if self.running:
-            # Получаем текущие размеры холста для обработки границ
-            canvas_width = self.canvas.winfo_width()
-            canvas_height = self.canvas.winfo_height()
+            # Сколько шагов физики постоянной длины поместилось в прошедшее время
+            steps = self.timestep.advance()
+            # Делаем их подряд (при плавной отрисовке запоминаем координаты перед последним)
+            for step in range(steps):
+                if self.interpolate and step == steps - 1:
+                    self.world.remember()
+                self.physics_step()
+            # Число шагов за кадр - в замеры
+            if self.profiler is not None:
+                self.profiler.count(SUBSTEPS, steps)
             
-            # Применяем физику к каждой фигуре в симуляции
-            for shape in self.shapes:
-                # Физика не применяется к перетаскиваемым фигурам
-                if not shape.is_dragged:
-                    # Применяем гравитацию (ускорение вниз)
-                    shape.apply_gravity(self.gravity)
-                    # Применяем трение для замедления горизонтального движения
-                    shape.apply_friction()
-                    # Перемещаем фигуру согласно её текущей скорости
-                    shape.move(shape.velocity.x, shape.velocity.y)
-                    # Обрабатываем столкновения с границами холста с разной упругостью
-                    if isinstance(shape, Circle):
-                        # Круги: высокая упругость (0.75) - хорошо отскакивают
-                        shape.resolve_boundary_collision(canvas_width, canvas_height, restitution=0.75)
-                    elif isinstance(shape, Square):
-                        # Квадраты: низкая упругость (0.15) - почти не отскакивают
-                        shape.resolve_boundary_collision(canvas_width, canvas_height, restitution=0.15)
-                    elif isinstance(shape, Triangle):
-                        # Треугольники: очень низкая упругость, почти неподвижны
-                        shape.velocity.x *= 0.95
-                        shape.velocity.y *= 0.95
-                        shape.resolve_boundary_collision(canvas_width, canvas_height, restitution=0.3)
-            
-            # Проверяем и обрабатываем столкновения между фигурами
-            self.check_collisions()
-        
-        # Планируем следующий кадр анимации через 16 миллисекунд (~60 кадров в секунду)
-        self.root.after(16, self.animation_loop)
+            # Переносим координаты фигур на холст, если они изменились или рисуются между шагами
+            if steps or self.interpolate:
+                with self.profile_phase(RENDER):
+                    self.draw_shapes()
+        
+        # Заканчиваем замер кадра и обновляем надпись с замерами
+        if self.profiler is not None:
+            self.profiler.end_frame()
+            self.overlay.update()
+        
+        # Планируем следующий кадр анимации (по умолчанию через 16 мс, ~60 кадров в секунду)
+        self.root.after(self.frame_ms, self.animation_loop)
+    
+    # Один шаг физики постоянной длины: движение и столкновения
+    def physics_step(self):
+        """Сделать один шаг физики движка в границах текущего холста"""
+        # Движок двигает фигуры, отражает их от границ холста и обрабатывает столкновения
+        self.engine.step(self.canvas.winfo_width(), self.canvas.winfo_height())
+    
+    # Перенос координат всех фигур из мира на холст
+    def draw_shapes(self):
+        """Передвинуть объекты на холсте туда, где фигуры оказались после шага и столкновений"""
+        # Читаем координаты из мира списками, а не по одной через ручки
+        xs, ys, sizes, dragged = self.world.lists("x", "y", "size", "dragged")
+        # При плавной отрисовке фигуры стоят между двумя последними шагами физики
+        if self.interpolate:
+            xs, ys = self.world.interpolated(self.timestep.alpha())
+        for shape, x, y, size, held in zip(self.shapes, xs, ys, sizes, dragged):
+            # Перетаскиваемую фигуру холст уже показывает там, где её держит мышь
+            if not held:
+                shape.place(x, y, size)
 
 
 # Точка входа в программу - выполняется только при запуске файла напрямую
 if __name__ == "__main__":
+    # Разбираем аргументы командной строки
+    parser = argparse.ArgumentParser(description="Симуляция фигур с гравитацией и столкновениями")
+    # Флаг включения замеров кадров с надписью на холсте
+    parser.add_argument("--profile", action="store_true",
+                        help="показывать на холсте замеры кадров: шаг, столкновения, отрисовка, простой")
+    # Файл для трассы кадров
+    parser.add_argument("--trace", metavar="FILE",
+                        help="при закрытии окна сохранить трассу кадров (формат chrome://tracing, Perfetto)")
+    # Число итераций уточнения импульсов при столкновениях кругов
+    parser.add_argument("--iterations", type=int, default=SOLVER_ITERATIONS, metavar="N",
+                        help=f"итераций уточнения импульсов кругов за кадр (по умолчанию {SOLVER_ITERATIONS}; "
+                             "больше - устойчивее высокие стопки)")
+    # Частота кадров окна (на физику не влияет)
+    parser.add_argument("--fps", type=float, default=DISPLAY_FPS,
+                        help=f"частота кадров окна (по умолчанию {DISPLAY_FPS}); физика всегда идёт 60 шагами в секунду")
+    # Ускорение времени симуляции
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="во сколько раз симуляция быстрее настоящего времени (по умолчанию 1)")
+    # Предел шагов физики за кадр
+    parser.add_argument("--max-substeps", type=int, default=MAX_SUBSTEPS, metavar="N",
+                        help=f"не больше N шагов физики за кадр, остальное время выбрасывается (по умолчанию {MAX_SUBSTEPS})")
+    # Плавная отрисовка между шагами
+    parser.add_argument("--interpolate", action="store_true",
+                        help="рисовать фигуры между двумя последними шагами физики (плавнее при --fps выше 60)")
+    # Файл сцены вместо начальных фигур
+    parser.add_argument("--scene", metavar="FILE",
+                        help="начать со сцены из файла JSON (см. scene.py; подходит и итог headless.py)")
+    args = parser.parse_args()
     # Создаем главное окно приложения
     root = tk.Tk()
     # Создаем экземпляр симуляции, передавая ему главное окно
-    app = PhysicsSimulation(root)
+    app = PhysicsSimulation(
+        root, profile=args.profile, trace=args.trace, iterations=args.iterations,
+        fps=args.fps, speed=args.speed, max_substeps=args.max_substeps, interpolate=args.interpolate,
+        scene=load_scene(args.scene) if args.scene else None
+    )
     # Запускаем главный цикл обработки событий tkinter
     root.mainloop()
@@ -0,0 +1,225 @@
+# Узкая фаза для пар кругов: все касания кругов за кадр решаются массивами.
+#
+# Раньше каждая пара кругов проходила через Circle.on_collision: hypot,
+# импульс и раздвигание считались на Python по одной паре, и в "бассейне
+# с шариками" это был самый горячий код. Теперь пары кругов, отобранные
+# широкой фазой (broadphase.py), обрабатываются вместе: расстояния,
+# нормали и импульсы считаются операциями над массивами, а поправки
+# скоростей и координат разносятся по столбцам мира одной операцией.
+#
+# Импульсы уточняются несколько раз за кадр (последовательные импульсы):
+# каждая итерация смотрит на скорости после предыдущих касаний и добавляет
+# или забирает импульс касания, но суммарный импульс никогда не становится
+# отрицательным — круги можно только расталкивать, а не притягивать.
+# Несколько итераций нужны высоким стопкам кругов, где каждый круг давит
+# на нижних соседей.
+#
+# Если решать все касания одновременно, круг с k касаниями получает k
+# полных толчков сразу, и плотная куча кругов разлетается. Поэтому касания
+# делятся на группы, в которых каждый круг встречается не больше одного
+# раза (contact_batches): внутри группы касания независимы и решаются одной
+# операцией над массивами, а группы идут друг за другом — как прежний
+# перебор пар по одной, только по сотне пар за раз.
+#
+# Без NumPy те же касания решаются циклом по спискам (resolve_circle_pairs_loop):
+# те же итерации, тот же порог отскока, те же группы в том же порядке и те же
+# формулы, поэтому круги двигаются одинаково с NumPy и без него.
+
+import math
+
+from world import np
+
+# Коэффициент восстановления при ударе кругов (0.8 = 80% упругости), как в Circle.on_collision
+CIRCLE_RESTITUTION = 0.8
+# Медленнее этого (пикселей за кадр) круги сходятся без отскока: иначе
+# лежащие друг на друге круги подпрыгивали бы от каждого кадра гравитации
+BOUNCE_SPEED = 1.0
+# Сколько итераций уточнения импульсов делать за кадр по умолчанию
+SOLVER_ITERATIONS = 4
+
+# Множитель для перемешивания порядка касаний при разбиении на группы
+# (нечётное число: номер касания -> приоритет без повторов)
+PRIORITY_MULTIPLIER = 2654435761
+PRIORITY_RANGE = 2 ** 32
+
+
+def contact_batches(first, second, count):
+    """
+    Разбивает касания (first[k], second[k]) мира из count фигур на группы,
+    в которых ни один круг не встречается дважды. Возвращает перестановку
+    касаний (номера касаний группа за группой) и границы групп в ней.
+    В группу на каждом проходе попадают касания, у которых приоритет меньше,
+    чем у всех ещё не разобранных касаний тех же кругов. Приоритеты — номера
+    касаний, перемешанные умножением: при порядке по номерам цепочка кругов
+    разбиралась бы по одному касанию за проход.
+    """
+    remaining = np.arange(len(first), dtype=np.int64)
+    priority = remaining * PRIORITY_MULTIPLIER % PRIORITY_RANGE
+    owner = np.empty(count, dtype=np.int64)
+    order = []
+    bounds = [0]
+    while len(remaining):
+        f, s, p = first[remaining], second[remaining], priority[remaining]
+        # Наименьший приоритет среди касаний каждого круга
+        owner.fill(PRIORITY_RANGE)
+        np.minimum.at(owner, f, p)
+        np.minimum.at(owner, s, p)
+        chosen = (owner[f] == p) & (owner[s] == p)
+        order.append(remaining[chosen])
+        bounds.append(bounds[-1] + len(order[-1]))
+        remaining = remaining[~chosen]
+    return np.concatenate(order), bounds
+
+
+def contact_batches_loop(first, second, count):
+    """Тот же разбор касаний на группы, что contact_batches(), циклом по спискам (без NumPy)."""
+    remaining = list(range(len(first)))
+    priority = [k * PRIORITY_MULTIPLIER % PRIORITY_RANGE for k in remaining]
+    order = []
+    bounds = [0]
+    while remaining:
+        # Наименьший приоритет среди касаний каждого круга
+        owner = [PRIORITY_RANGE] * count
+        for k in remaining:
+            p = priority[k]
+            if p < owner[first[k]]:
+                owner[first[k]] = p
+            if p < owner[second[k]]:
+                owner[second[k]] = p
+        chosen = [k for k in remaining if owner[first[k]] == priority[k] == owner[second[k]]]
+        order.extend(chosen)
+        bounds.append(len(order))
+        remaining = [k for k in remaining if not owner[first[k]] == priority[k] == owner[second[k]]]
+    return order, bounds
+
+
+def resolve_circle_pairs(world, first, second, iterations=SOLVER_ITERATIONS):
+    """
+    Решает столкновения пар кругов (first[k], second[k]) — массивов номеров
+    фигур в мире world: меняет скорости импульсами за iterations итераций,
+    затем раздвигает пересекающиеся круги поровну вдоль нормали.
+    Возвращает, сколько пар действительно касались.
+    """
+    if np is None:
+        return resolve_circle_pairs_loop(world, first, second, iterations)
+    n = world.count
+    x, y, vx, vy = world.x[:n], world.y[:n], world.vx[:n], world.vy[:n]
+    size = world.size[:n]
+    # Вектор между центрами и расстояние (через sqrt, а не hypot: hypot в NumPy
+    # и в math может расходиться в последнем бите, а sqrt округляется одинаково)
+    dx = x[first] - x[second]
+    dy = y[first] - y[second]
+    distance = np.sqrt(dx * dx + dy * dy)
+    reach = size[first] / 2 + size[second] / 2
+    # Касаются только пары ближе суммы радиусов (совпавшие центры пропускаем: нормали нет)
+    touching = (distance < reach) & (distance > 0)
+    if not touching.any():
+        return 0
+    first, second = first[touching], second[touching]
+    reach = reach[touching]
+    nx = dx[touching] / distance[touching]
+    ny = dy[touching] / distance[touching]
+
+    # Переставляем касания группа за группой: группа — непрерывный срез массивов
+    order, bounds = contact_batches(first, second, n)
+    first, second, reach, nx, ny = first[order], second[order], reach[order], nx[order], ny[order]
+    batches = list(zip(bounds[:-1], bounds[1:]))
+    inverse_first = 1 / world.mass[first]
+    inverse_second = 1 / world.mass[second]
+    inverse_sum = inverse_first + inverse_second
+
+    # Скорость сближения по нормали в начале кадра (отрицательная — круги сближаются);
+    # после удара они должны расходиться со скоростью CIRCLE_RESTITUTION от неё
+    approach = (vx[first] - vx[second]) * nx + (vy[first] - vy[second]) * ny
+    target = np.where(approach < -BOUNCE_SPEED, -CIRCLE_RESTITUTION * approach, 0.0)
+    total = np.zeros(len(first))
+    for _ in range(max(1, iterations)):
+        for start, end in batches:
+            f, s = first[start:end], second[start:end]
+            bx, by = nx[start:end], ny[start:end]
+            normal_speed = (vx[f] - vx[s]) * bx + (vy[f] - vy[s]) * by
+            # Сколько импульса не хватает до нужной скорости; суммарный импульс — не меньше нуля
+            updated = np.maximum(total[start:end] + (target[start:end] - normal_speed) / inverse_sum[start:end], 0)
+            applied = updated - total[start:end]
+            total[start:end] = updated
+            # Первый круг толкаем вдоль нормали, второй — против
+            # (в группе каждый круг один раз, так что поправки не перекрываются)
+            vx[f] += applied * bx * inverse_first[start:end]
+            vy[f] += applied * by * inverse_first[start:end]
+            vx[s] -= applied * bx * inverse_second[start:end]
+            vy[s] -= applied * by * inverse_second[start:end]
+
+    # Раздвигаем пересекающиеся круги, каждый на половину пересечения; пересечение
+    # считается по уже сдвинутым предыдущими группами координатам
+    for start, end in batches:
+        f, s = first[start:end], second[start:end]
+        dx = x[f] - x[s]
+        dy = y[f] - y[s]
+        distance = np.sqrt(dx * dx + dy * dy)
+        overlap = reach[start:end] - distance
+        # Разошедшиеся пары и совпавшие центры не двигаем
+        overlap[(overlap <= 0) | (distance == 0)] = 0
+        distance[distance == 0] = 1
+        push = overlap * 0.5 / distance
+        x[f] += dx * push
+        y[f] += dy * push
+        x[s] -= dx * push
+        y[s] -= dy * push
+    return len(first)
+
+
+def resolve_circle_pairs_loop(world, first, second, iterations=SOLVER_ITERATIONS):
+    """
+    То же, что resolve_circle_pairs(), циклом по спискам (без NumPy):
+    first и second — списки номеров фигур. Касания решаются по одному,
+    но группами и в том же порядке, что и с массивами.
+    """
+    x, y, vx, vy = world.x, world.y, world.vx, world.vy
+    size, mass = world.size, world.mass
+    # Касания: (первый, второй, сумма радиусов, нормаль); пары без касания отбрасываем
+    contacts = []
+    for i, j in zip(first, second):
+        dx = x[i] - x[j]
+        dy = y[i] - y[j]
+        distance = math.sqrt(dx * dx + dy * dy)
+        reach = size[i] / 2 + size[j] / 2
+        if 0 < distance < reach:
+            contacts.append((i, j, reach, dx / distance, dy / distance))
+    if not contacts:
+        return 0
+    order, bounds = contact_batches_loop([c[0] for c in contacts], [c[1] for c in contacts], world.count)
+    contacts = [contacts[k] for k in order]
+    inverse = [(1 / mass[i], 1 / mass[j]) for i, j, _, _, _ in contacts]
+
+    # Нужная скорость расхождения после удара (см. resolve_circle_pairs)
+    target = []
+    for i, j, _, bx, by in contacts:
+        approach = (vx[i] - vx[j]) * bx + (vy[i] - vy[j]) * by
+        target.append(-CIRCLE_RESTITUTION * approach if approach < -BOUNCE_SPEED else 0.0)
+    total = [0.0] * len(contacts)
+    for _ in range(max(1, iterations)):
+        for k, (i, j, _, bx, by) in enumerate(contacts):
+            inverse_first, inverse_second = inverse[k]
+            normal_speed = (vx[i] - vx[j]) * bx + (vy[i] - vy[j]) * by
+            updated = max(total[k] + (target[k] - normal_speed) / (inverse_first + inverse_second), 0.0)
+            applied = updated - total[k]
+            total[k] = updated
+            vx[i] += applied * bx * inverse_first
+            vy[i] += applied * by * inverse_first
+            vx[j] -= applied * bx * inverse_second
+            vy[j] -= applied * by * inverse_second
+
+    # Раздвигаем пересекающиеся круги по уже сдвинутым координатам
+    for i, j, reach, _, _ in contacts:
+        dx = x[i] - x[j]
+        dy = y[i] - y[j]
+        distance = math.sqrt(dx * dx + dy * dy)
+        overlap = reach - distance
+        if overlap <= 0 or distance == 0:
+            continue
+        push = overlap * 0.5 / distance
+        x[i] += dx * push
+        y[i] += dy * push
+        x[j] -= dx * push
+        y[j] -= dy * push
+    return len(contacts)
@@ -0,0 +1,22 @@
+# Замеры кадров окна — общий модуль Game_Life/profiling.py.
+#
+# Приложения лежат в разных папках и запускаются каждое из своей, поэтому
+# здесь нет своей копии замеров: этот файл загружает модуль Game_Life по пути
+# и подставляет его вместо себя. После "from profiling import ..." и в
+# Game_Life, и здесь работает один и тот же код. Свои счётчики Drag_n_Drop
+# заводит через register_counter (см. engine.py и timestep.py).
+
+import importlib.util
+import os
+import sys
+
+# Путь к общему модулю: папка Game_Life рядом с папкой Drag_n_Drop
+SHARED_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Game_Life", "profiling.py")
+)
+
+_spec = importlib.util.spec_from_file_location(__name__, SHARED_PATH)
+_module = importlib.util.module_from_spec(_spec)
+# Импорт вернёт то, что лежит в sys.modules, — то есть общий модуль
+sys.modules[__name__] = _module
+_spec.loader.exec_module(_module)
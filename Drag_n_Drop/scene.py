@@ -0,0 +1,124 @@
+# Сцены: начальное состояние фигур в виде словаря и файла JSON.
+#
+# Сцена — словарь с размерами поля, гравитацией и списком фигур:
+#
+#     {"width": 850, "height": 550, "gravity": 0.3, "seed": 7,
+#      "shapes": [{"kind": "circle", "x": 212.5, "y": 80, "size": 50,
+#                  "mass": 1.0, "vx": 0.0, "vy": 0.0, "color": "#4CAF50"}, ...]}
+#
+# Окно (main.py) и headless.py строят фигуры из одной и той же сцены,
+# а snapshot() записывает состояние движка в том же виде, поэтому
+# итог одного прогона можно загрузить как начало следующего. Числа
+# пишутся в JSON без потерь (repr float), так что продолжение прогона
+# из сохранённого состояния совпадает с прогоном без остановки.
+# Случайная сцена строится своим генератором random.Random(seed):
+# одно и то же зерно всегда даёт одну и ту же сцену.
+
+import json
+import random
+
+from bodies import BODY_TYPES
+from engine import GRAVITY, HEIGHT, WIDTH
+from world import CIRCLE, SQUARE, TRIANGLE
+
+# Имена видов фигур в файлах сцен
+KIND_NAMES = {CIRCLE: "circle", SQUARE: "square", TRIANGLE: "triangle"}
+KINDS = {name: kind for kind, name in KIND_NAMES.items()}
+# Масса и цвет фигуры каждого вида, если в сцене их нет (как у кнопок окна)
+DEFAULT_MASS = {CIRCLE: 1.0, SQUARE: 1.2, TRIANGLE: 5.0}
+DEFAULT_COLOR = {CIRCLE: "#4CAF50", SQUARE: "#2196F3", TRIANGLE: "#FF9800"}
+
+
+def shape_spec(kind, x, y, size, mass=None, color=None, vx=0.0, vy=0.0):
+    """Описание одной фигуры сцены; kind — CIRCLE, SQUARE или TRIANGLE."""
+    return {
+        "kind": KIND_NAMES[kind], "x": x, "y": y, "size": size,
+        "mass": DEFAULT_MASS[kind] if mass is None else mass,
+        "vx": vx, "vy": vy, "color": color or DEFAULT_COLOR[kind],
+    }
+
+
+def initial_scene(width=WIDTH, height=HEIGHT, gravity=GRAVITY):
+    """Начальные фигуры окна: два круга, два квадрата и две треугольные платформы."""
+    # Вертикальная позиция "линии старта" для падающих фигур
+    start_y = 80
+    shapes = [
+        shape_spec(CIRCLE, width * 0.25, start_y, 50, 1.0, "#4CAF50"),
+        shape_spec(CIRCLE, width * 0.35, start_y, 40, 0.8, "#8BC34A"),
+        shape_spec(SQUARE, width * 0.55, start_y, 45, 1.2, "#2196F3"),
+        shape_spec(SQUARE, width * 0.65, start_y, 55, 1.5, "#03A9F4"),
+        shape_spec(TRIANGLE, width * 0.85, height * 0.7, 80, 5.0, "#FF9800"),
+        shape_spec(TRIANGLE, width * 0.15, height * 0.6, 70, 4.0, "#FF5722"),
+    ]
+    return {"width": width, "height": height, "gravity": gravity, "seed": None, "shapes": shapes}
+
+
+def random_scene(count, seed, width=WIDTH, height=HEIGHT, gravity=GRAVITY):
+    """
+    count случайных фигур по зерну seed: круги и квадраты разлетаются из
+    верхней половины поля, треугольники стоят в нижней.
+    """
+    rng = random.Random(seed)
+    shapes = []
+    for _ in range(count):
+        kind = rng.choices((CIRCLE, SQUARE, TRIANGLE), weights=(5, 3, 1))[0]
+        if kind == TRIANGLE:
+            size = rng.uniform(60, 90)
+            x = rng.uniform(size / 2, width - size / 2)
+            y = rng.uniform(height * 0.55, height - size / 2)
+            shapes.append(shape_spec(kind, x, y, size))
+        else:
+            size = rng.uniform(20, 60)
+            x = rng.uniform(size / 2, width - size / 2)
+            y = rng.uniform(size / 2, height * 0.5)
+            shapes.append(shape_spec(kind, x, y, size, vx=rng.uniform(-3, 3), vy=rng.uniform(-3, 3)))
+    return {"width": width, "height": height, "gravity": gravity, "seed": seed, "shapes": shapes}
+
+
+def populate(engine, scene, create=None):
+    """
+    Очищает движок и заполняет его фигурами сцены. create(kind, spec) строит
+    фигуру в engine.world (окно передаёт фигуры с холстом); по умолчанию —
+    фигуры bodies.py без холста. Возвращает движок.
+    """
+    engine.clear()
+    engine.width = scene.get("width", WIDTH)
+    engine.height = scene.get("height", HEIGHT)
+    engine.gravity = scene.get("gravity", GRAVITY)
+    for spec in scene["shapes"]:
+        kind = KINDS[spec["kind"]]
+        mass = spec.get("mass", DEFAULT_MASS[kind])
+        if create is None:
+            shape = BODY_TYPES[kind](engine.world, spec["x"], spec["y"], spec["size"], mass)
+        else:
+            shape = create(kind, spec)
+        engine.add(shape)
+        shape.vx = spec.get("vx", 0.0)
+        shape.vy = spec.get("vy", 0.0)
+    return engine
+
+
+def snapshot(engine, seed=None):
+    """Текущее состояние движка сценой (цвета не сохраняются - это забота окна)."""
+    world = engine.world
+    columns = world.lists("kind", "x", "y", "vx", "vy", "size", "mass")
+    shapes = [
+        {"kind": KIND_NAMES[kind], "x": x, "y": y, "vx": vx, "vy": vy, "size": size, "mass": mass}
+        for kind, x, y, vx, vy, size, mass in zip(*columns)
+    ]
+    return {
+        "width": engine.width, "height": engine.height, "gravity": engine.gravity,
+        "seed": seed, "steps": engine.steps, "shapes": shapes,
+    }
+
+
+def load_scene(path):
+    """Читает сцену из файла JSON."""
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_scene(scene, path):
+    """Записывает сцену в файл JSON."""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(scene, file, ensure_ascii=False, indent=1)
@@ -0,0 +1,84 @@
+# Постоянный шаг физики, не зависящий от частоты кадров окна.
+#
+# Раньше каждый вызов animation_loop (root.after(16, ...)) делал ровно один
+# шаг физики. Если Tk запаздывал — перетаскивание, изменение размера окна,
+# медленный кадр, — симуляция просто замедлялась, а скорость падения фигур
+# зависела от частоты кадров. Теперь физика идёт шагами постоянной длины
+# STEP_SECONDS (1/60 секунды — как прежний кадр, поэтому гравитация и
+# скорости в пикселях за шаг остались прежними). FixedTimestep копит
+# прошедшее настоящее время и за кадр отдаёт столько шагов, сколько
+# в нём поместилось, — при 30 кадрах в секунду по два шага, при 144 —
+# шаг примерно через кадр. Итог физики зависит только от числа шагов,
+# поэтому он одинаков при любой частоте кадров.
+#
+# Чтобы медленный кадр не тянул за собой ещё более медленный (каждый
+# следующий кадр догоняет всё больше шагов), за кадр делается не больше
+# max_substeps шагов, а недоделанное время выбрасывается — симуляция на
+# миг замедляется, но не замирает. Множитель speed ускоряет (или замедляет)
+# время симуляции относительно настоящего.
+
+import time
+
+from profiling import register_counter
+
+# Частота шагов физики (шагов в секунду) и длина шага
+PHYSICS_HZ = 60
+STEP_SECONDS = 1 / PHYSICS_HZ
+# Частота кадров окна по умолчанию
+DISPLAY_FPS = 60
+# Наибольшее число шагов физики за один кадр
+MAX_SUBSTEPS = 8
+# Счётчик замеров кадра: сколько шагов физики сделано за кадр
+SUBSTEPS = register_counter("substeps", "шаги")
+
+
+class FixedTimestep:
+    """
+    Счётчик шагов физики постоянной длины step секунд. advance() вызывается
+    раз в кадр и возвращает, сколько шагов сделать сейчас; alpha() — какую
+    долю следующего шага уже накопили (для плавной отрисовки между шагами).
+    clock — функция текущего времени в секундах (подменяется в проверках).
+    """
+
+    def __init__(self, step=STEP_SECONDS, max_substeps=MAX_SUBSTEPS, speed=1.0, clock=time.perf_counter):
+        self.step = step
+        self.max_substeps = max_substeps
+        self.speed = speed
+        self.clock = clock
+        # Накопленное время симуляции, ещё не отданное шагами (секунды)
+        self.accumulator = 0.0
+        # Когда был прошлый кадр (None — отсчёт ещё не начат или была пауза)
+        self.last = None
+        # Сколько шагов сделано и сколько выброшено из-за предела max_substeps
+        self.steps = 0
+        self.dropped = 0
+
+    def reset(self):
+        """Начинает отсчёт заново (после паузы): время, пока симуляция стояла, не догоняется."""
+        self.last = None
+        self.accumulator = 0.0
+
+    def advance(self):
+        """Сколько шагов физики сделать в этом кадре."""
+        now = self.clock()
+        if self.last is None:
+            # Первый кадр после запуска или паузы: отсчитываем время от него
+            self.last = now
+            return 0
+        self.accumulator += (now - self.last) * self.speed
+        self.last = now
+        steps = int(self.accumulator // self.step)
+        if steps > self.max_substeps:
+            # Не догоняем всё сразу: лишние шаги выбрасываем вместе с их временем
+            self.dropped += steps - self.max_substeps
+            steps = self.max_substeps
+            self.accumulator %= self.step
+        else:
+            # (не меньше нуля: при делении с плавающей точкой остаток может уйти в -1e-18)
+            self.accumulator = max(self.accumulator - steps * self.step, 0.0)
+        self.steps += steps
+        return steps
+
+    def alpha(self):
+        """Доля следующего шага, уже накопленная к этому кадру (от 0 до 1)."""
+        return min(self.accumulator / self.step, 1.0)
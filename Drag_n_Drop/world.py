@@ -0,0 +1,213 @@
+# Физический мир: все фигуры симуляции в общих массивах.
+#
+# Раньше каждая фигура хранила свои координаты и скорость (Vector) и каждый
+# кадр проходила через apply_gravity, apply_friction, move и
+# resolve_boundary_collision — по четыре вызова Python на фигуру и новый
+# объект Vector на каждое действие с векторами. Теперь координаты,
+# скорости, массы, размеры, упругость о стенки, вид фигуры и признак
+# перетаскивания лежат столбцами в массивах PhysicsWorld, а шаг мира
+# (гравитация, трение, движение, стенки) делается сразу для всех фигур
+# несколькими операциями NumPy. Circle, Square и Triangle в bodies.py —
+# лёгкие ручки: номер фигуры в мире и свойства, читающие массивы.
+#
+# NumPy — необязательная зависимость: без него столбцы — обычные списки,
+# а шаг считается циклом по фигурам с теми же формулами и тем же результатом.
+
+try:
+    import numpy as np
+except ImportError:  # NumPy не установлен — мир считается циклом по спискам
+    np = None
+
+# === ВИДЫ ФИГУР ===
+CIRCLE = 0    # круг: упругий мяч
+SQUARE = 1    # квадрат: тяжёлая коробка без отскока
+TRIANGLE = 2  # треугольник: наклонная плоскость, почти неподвижен
+
+# Какая доля скорости остаётся после удара о стенку (по виду фигуры)
+BOUNDARY_RESTITUTION = {CIRCLE: 0.75, SQUARE: 0.15, TRIANGLE: 0.3}
+
+# Трение: доля горизонтальной скорости, остающаяся за кадр
+FRICTION = 0.98
+# Дополнительное трение при касании пола
+FLOOR_FRICTION = 0.9
+# Треугольники гасят скорость сильнее всех, чтобы стоять почти на месте
+TRIANGLE_DAMPING = 0.95
+
+# Начальная вместимость массивов (дальше удваивается)
+INITIAL_CAPACITY = 16
+
+# Столбцы мира: имя -> тип элементов в NumPy
+COLUMNS = {
+    "x": "float64",            # центр фигуры по горизонтали
+    "y": "float64",            # центр фигуры по вертикали
+    "vx": "float64",           # скорость по горизонтали (пикселей за кадр)
+    "vy": "float64",           # скорость по вертикали
+    "mass": "float64",         # масса
+    "size": "float64",         # диаметр круга, сторона квадрата или треугольника
+    "restitution": "float64",  # упругость при ударе о стенку
+    "kind": "int8",            # вид фигуры: CIRCLE, SQUARE или TRIANGLE
+    "dragged": "bool",         # фигуру сейчас тащат мышью — физика её не трогает
+}
+
+
+class PhysicsWorld:
+    """
+    Все фигуры симуляции столбцами массивов: x, y, vx, vy, mass, size,
+    restitution, kind, dragged. Фигура — номер строки, который возвращает
+    add(); номера не меняются, пока мир не очищен через clear().
+    С NumPy столбцы — массивы с запасом по длине (заняты первые count
+    элементов), без NumPy — списки ровно из count элементов.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.capacity = 0
+        self.clear()
+
+    def clear(self):
+        """Удаляет все фигуры."""
+        self.count = 0
+        # Координаты, запомненные remember() перед последним шагом
+        self.previous = None
+        self.capacity = INITIAL_CAPACITY if np is not None else 0
+        for name, dtype in COLUMNS.items():
+            setattr(self, name, np.zeros(self.capacity, dtype=dtype) if np is not None else [])
+
+    def add(self, kind, x, y, size, mass=1.0, restitution=None):
+        """Добавляет неподвижную фигуру вида kind и возвращает её номер."""
+        if restitution is None:
+            restitution = BOUNDARY_RESTITUTION[kind]
+        values = {
+            "x": x, "y": y, "vx": 0.0, "vy": 0.0, "mass": mass, "size": size,
+            "restitution": restitution, "kind": kind, "dragged": False,
+        }
+        index = self.count
+        if np is None:
+            for name, value in values.items():
+                getattr(self, name).append(value)
+        else:
+            if index == self.capacity:
+                self.grow()
+            for name, value in values.items():
+                getattr(self, name)[index] = value
+        self.count += 1
+        return index
+
+    def grow(self):
+        """Удваивает вместимость массивов (только с NumPy)."""
+        self.capacity *= 2
+        for name, dtype in COLUMNS.items():
+            column = np.zeros(self.capacity, dtype=dtype)
+            column[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, column)
+
+    def lists(self, *names):
+        """
+        Столбцы names обычными списками Python, например lists("x", "y", "size") —
+        для кода, который перебирает фигуры по одной (широкая фаза, перенос на холст):
+        элементы списка читаются быстрее, чем элементы массива NumPy.
+        """
+        if np is None:
+            return tuple(getattr(self, name) for name in names)
+        return tuple(getattr(self, name)[:self.count].tolist() for name in names)
+
+    def remember(self):
+        """Запоминает текущие координаты — перед шагом, для плавной отрисовки (interpolated)."""
+        if np is None:
+            self.previous = (list(self.x), list(self.y))
+        else:
+            self.previous = (self.x[:self.count].copy(), self.y[:self.count].copy())
+
+    def interpolated(self, alpha):
+        """
+        Координаты xs, ys списками между запомненными remember() и текущими:
+        alpha = 0 — запомненные, 1 — текущие. Фигуры, добавленные после
+        remember(), берутся на своих текущих местах.
+        """
+        xs, ys = self.lists("x", "y")
+        if self.previous is None:
+            return xs, ys
+        previous_x, previous_y = self.previous
+        known = min(len(previous_x), self.count)
+        if np is None:
+            # Без NumPy lists() отдаёт сами столбцы мира — меняем копии
+            xs, ys = list(xs), list(ys)
+            for i in range(known):
+                xs[i] = previous_x[i] + (xs[i] - previous_x[i]) * alpha
+                ys[i] = previous_y[i] + (ys[i] - previous_y[i]) * alpha
+            return xs, ys
+        x = previous_x[:known] + (self.x[:known] - previous_x[:known]) * alpha
+        y = previous_y[:known] + (self.y[:known] - previous_y[:known]) * alpha
+        return x.tolist() + xs[known:], y.tolist() + ys[known:]
+
+    def step(self, gravity, width, height):
+        """
+        Один кадр для всех фигур, кроме перетаскиваемых: гравитация, трение,
+        движение на скорость, гашение скорости треугольников и удары о стенки
+        холста width x height.
+        """
+        if np is None:
+            self.step_loop(gravity, width, height)
+            return
+        n = self.count
+        x, y, vx, vy = self.x[:n], self.y[:n], self.vx[:n], self.vy[:n]
+        half = self.size[:n] / 2
+        restitution = self.restitution[:n]
+        # Фигуры, которые тащат мышью, не двигаются сами (where= оставляет их нетронутыми)
+        active = ~self.dragged[:n]
+        # Гравитация ускоряет вниз, трение замедляет горизонтальное движение
+        np.add(vy, gravity, out=vy, where=active)
+        np.multiply(vx, FRICTION, out=vx, where=active)
+        # Движение на скорость за один кадр
+        np.add(x, vx, out=x, where=active)
+        np.add(y, vy, out=y, where=active)
+        # Треугольники почти неподвижны: гасим их скорость
+        damped = active & (self.kind[:n] == TRIANGLE)
+        np.multiply(vx, TRIANGLE_DAMPING, out=vx, where=damped)
+        np.multiply(vy, TRIANGLE_DAMPING, out=vy, where=damped)
+
+        # Пол: ставим фигуру на пол, отражаем скорость с потерей энергии и добавляем трение
+        hit = active & (y + half > height)
+        np.subtract(height, half, out=y, where=hit)
+        np.multiply(-vy, restitution, out=vy, where=hit)
+        np.multiply(vx, FLOOR_FRICTION, out=vx, where=hit)
+        # Потолок (проверяется уже после поправки у пола, как и раньше)
+        hit = active & (y - half < 0)
+        np.copyto(y, half, where=hit)
+        np.multiply(-vy, restitution, out=vy, where=hit)
+        # Правая стена, а если фигура не у правой — левая
+        right = active & (x + half > width)
+        left = active & ~right & (x - half < 0)
+        np.subtract(width, half, out=x, where=right)
+        np.copyto(x, half, where=left)
+        hit = right | left
+        np.multiply(-vx, restitution, out=vx, where=hit)
+
+    def step_loop(self, gravity, width, height):
+        """Тот же кадр, что step(), циклом по спискам (без NumPy)."""
+        x, y, vx, vy = self.x, self.y, self.vx, self.vy
+        for i in range(self.count):
+            if self.dragged[i]:
+                continue
+            half = self.size[i] / 2
+            restitution = self.restitution[i]
+            vy[i] += gravity
+            vx[i] *= FRICTION
+            x[i] += vx[i]
+            y[i] += vy[i]
+            if self.kind[i] == TRIANGLE:
+                vx[i] *= TRIANGLE_DAMPING
+                vy[i] *= TRIANGLE_DAMPING
+            if y[i] + half > height:
+                y[i] = height - half
+                vy[i] = -vy[i] * restitution
+                vx[i] *= FLOOR_FRICTION
+            if y[i] - half < 0:
+                y[i] = half
+                vy[i] = -vy[i] * restitution
+            if x[i] + half > width:
+                x[i] = width - half
+                vx[i] = -vx[i] * restitution
+            elif x[i] - half < 0:
+                x[i] = half
+                vx[i] = -vx[i] * restitution
@@ -0,0 +1,336 @@
+# Замеры скорости игры Жизнь: каждый движок и каждый отрисовщик
+# на одних и тех же эталонных задачах.
+#
+# Задачи — случайные поля (суп) нескольких размеров и плотностей
+# и классические фигуры: ружьё Госпера, R-пентамино и желудь (Acorn).
+# Для каждой пары "движок + задача" измеряется скорость в поколениях и клетках
+# в секунду и пиковая память, для отрисовщиков — миллисекунды на кадр.
+# Каждый замер идёт в отдельном процессе: так пиковая память относится
+# только к нему, а не ко всем замерам сразу.
+#
+# Результаты сохраняются в JSON, чтобы сравнивать запуски между собой:
+#
+#     python benchmark.py --output before.json
+#     ... правки ...
+#     python benchmark.py --output after.json --compare before.json
+#
+# Флаг --quick уменьшает поля и число поколений (проверка за минуту).
+
+import argparse
+import io
+import json
+import multiprocessing as mp
+import os
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+
+from engine_base import np
+from engines import ENGINES, available_engines
+from library import ACORN, GOSPER_GUN, R_PENTOMINO
+from patterns import parse_rle
+from renderers import RENDERERS
+from simulation import Simulation
+
+try:
+    import resource
+except ImportError:  # Windows: пиковую память процесса узнать нечем
+    resource = None
+
+# Движки на чистом Python (и разреженные, которым плотный суп не по силам)
+# на больших полях считали бы часами — их гоняем только на полях до SLOW_CELLS клеток
+SLOW_ENGINES = ("list", "incremental", "sparse", "hashlife")
+SLOW_CELLS = 512 * 512
+
+
+class Workload:
+    """
+    Эталонная задача: поле rows x cols и generations поколений.
+    Поле заполняется супом плотности density или фигурой pattern (текст RLE) в центре.
+    """
+
+    def __init__(self, name, rows, cols, generations, density=None, pattern=None):
+        self.name = name
+        self.rows = rows
+        self.cols = cols
+        self.generations = generations
+        self.density = density
+        self.pattern = pattern
+
+    def setup(self, sim):
+        """Заполняет поле симуляции начальным состоянием задачи."""
+        if self.pattern is not None:
+            sim.load_pattern(parse_rle(io.StringIO(self.pattern)))
+        else:
+            sim.randomize(density=self.density, seed=2024)
+
+    def suits(self, engine):
+        """True, если движок имеет смысл гонять на этой задаче."""
+        return engine not in SLOW_ENGINES or self.rows * self.cols <= SLOW_CELLS
+
+
+def workloads(quick=False):
+    """Список эталонных задач (с quick — уменьшенных)."""
+    if quick:
+        return [
+            Workload("soup-128-d35", 128, 128, 50, density=0.35),
+            Workload("soup-512-d35", 512, 512, 20, density=0.35),
+            Workload("gosper-gun", 256, 256, 200, pattern=GOSPER_GUN),
+            Workload("r-pentomino", 256, 256, 200, pattern=R_PENTOMINO),
+            Workload("acorn", 256, 256, 200, pattern=ACORN),
+        ]
+    return [
+        Workload("soup-256-d20", 256, 256, 200, density=0.2),
+        Workload("soup-256-d50", 256, 256, 200, density=0.5),
+        Workload("soup-1024-d35", 1024, 1024, 100, density=0.35),
+        Workload("soup-4096-d35", 4096, 4096, 20, density=0.35),
+        Workload("gosper-gun", 512, 512, 1000, pattern=GOSPER_GUN),
+        Workload("r-pentomino", 512, 512, 1103, pattern=R_PENTOMINO),
+        Workload("acorn", 1024, 1024, 5206, pattern=ACORN),
+    ]
+
+
+# Поля для замера отрисовщиков: (отрисовщик, строки, столбцы, размер клетки)
+RENDER_CASES = [
+    ("canvas", 60, 100, 8),
+    ("canvas", 150, 150, 4),
+    ("image", 150, 150, 4),
+    ("image", 1000, 1000, 1),
+]
+
+
+# === ЗАМЕРЫ (выполняются в отдельном процессе) ===
+
+def peak_memory_kb():
+    """Пиковый объём памяти процесса в килобайтах или None, если его не узнать."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # В Linux ru_maxrss в килобайтах, в macOS — в байтах
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def bench_engine(engine, workload, budget):
+    """
+    Считает задачу на движке и возвращает словарь с замерами.
+    Поколения идут порциями 1, 2, 4, ...: если время вышло раньше (budget секунд),
+    замер честно сообщает, сколько поколений успел посчитать.
+    """
+    memory_before = peak_memory_kb()
+    topology = ENGINES[engine].topologies[0]
+    sim = Simulation(workload.rows, workload.cols, engine, detect_cycles=False,
+                     topology=topology, checkpoint_interval=None)
+    try:
+        workload.setup(sim)
+        sim.engine.step()  # разогрев: у parallel первый шаг запускает процессы
+        done, chunk = 0, 1
+        started = time.perf_counter()
+        while done < workload.generations:
+            chunk = min(chunk, workload.generations - done)
+            sim.engine.advance(chunk)
+            done += chunk
+            chunk *= 2
+            if time.perf_counter() - started > budget:
+                break
+        seconds = time.perf_counter() - started
+        population = sim.engine.population()
+    finally:
+        sim.engine.close()
+    memory_after = peak_memory_kb()
+    per_second = done / seconds if seconds > 0 else float("inf")
+    return {
+        "kind": "engine",
+        "workload": workload.name,
+        "engine": engine,
+        "topology": topology,
+        "rows": workload.rows,
+        "cols": workload.cols,
+        "generations": done,
+        "complete": done == workload.generations,
+        "seconds": seconds,
+        "generations_per_second": per_second,
+        "cells_per_second": per_second * workload.rows * workload.cols,
+        "population": population,
+        "peak_memory_mb": None if memory_before is None else (memory_after - memory_before) / 1024,
+    }
+
+
+def bench_renderer(renderer, rows, cols, cell_size, frames):
+    """
+    Рисует frames кадров супа на скрытом окне tkinter и возвращает
+    словарь с миллисекундами на кадр. Без экрана замер пропускается.
+    """
+    import tkinter as tk
+
+    result = {"kind": "renderer", "renderer": renderer, "rows": rows, "cols": cols, "cell_size": cell_size}
+    try:
+        root = tk.Tk()
+    except tk.TclError as error:
+        return {**result, "skipped": f"нет экрана: {error}"}
+    memory_before = peak_memory_kb()
+    try:
+        root.withdraw()
+        canvas = tk.Canvas(root, width=cols * cell_size, height=rows * cell_size)
+        canvas.pack()
+        sim = Simulation(rows, cols, detect_cycles=False, checkpoint_interval=None)
+        sim.randomize(density=0.35, seed=2024)
+        painter = RENDERERS[renderer](canvas, rows, cols, cell_size)
+        painter.render(sim.engine)
+        root.update_idletasks()
+        spent = 0.0
+        for _ in range(frames):
+            sim.engine.step()  # шаг в замер не входит — только отрисовка
+            started = time.perf_counter()
+            painter.render(sim.engine)
+            root.update_idletasks()
+            spent += time.perf_counter() - started
+    finally:
+        root.destroy()
+    memory_after = peak_memory_kb()
+    return {
+        **result,
+        "frames": frames,
+        "ms_per_frame": spent / frames * 1000,
+        "peak_memory_mb": None if memory_before is None else (memory_after - memory_before) / 1024,
+    }
+
+
+def isolated_worker(queue, function, args):
+    """Тело отдельного процесса: выполняет замер и отправляет результат."""
+    try:
+        queue.put(function(*args))
+    except Exception as error:  # замер упал — сообщаем об этом, а не зависаем
+        queue.put({"error": f"{type(error).__name__}: {error}"})
+
+
+def isolated(function, *args):
+    """Выполняет замер в отдельном процессе и возвращает его результат."""
+    context = mp.get_context()
+    queue = context.Queue()
+    process = context.Process(target=isolated_worker, args=(queue, function, args))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+# === ЗАПУСК ===
+
+def run_benchmarks(engines=None, names=None, quick=False, budget=10.0, render=True, log=None):
+    """
+    Прогоняет все замеры и возвращает словарь для JSON: сведения о машине
+    и список результатов. engines и names ограничивают движки и задачи;
+    log(result) вызывается после каждого замера (для вывода прогресса).
+    """
+    results = []
+    for workload in workloads(quick):
+        if names and workload.name not in names:
+            continue
+        for engine in available_engines():
+            if (engines and engine not in engines) or not workload.suits(engine):
+                continue
+            result = isolated(bench_engine, engine, workload, budget)
+            result.setdefault("workload", workload.name)
+            result.setdefault("engine", engine)
+            results.append(result)
+            if log:
+                log(result)
+    if render:
+        for renderer, rows, cols, cell_size in RENDER_CASES:
+            result = isolated(bench_renderer, renderer, rows, cols, cell_size, 10 if quick else 30)
+            result.setdefault("renderer", renderer)
+            results.append(result)
+            if log:
+                log(result)
+    return {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__ if np is not None else None,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "quick": quick,
+        "results": results,
+    }
+
+
+def result_key(result):
+    """По чему сопоставляются замеры двух запусков."""
+    if result.get("kind") == "renderer":
+        return ("renderer", result["renderer"], result["rows"], result["cols"], result["cell_size"])
+    return ("engine", result.get("workload"), result.get("engine"))
+
+
+def describe(result):
+    """Одна строка о замере для консоли."""
+    if "error" in result or "skipped" in result:
+        what = result.get("engine") or result.get("renderer")
+        return f"{result.get('workload', 'render'):>14} {what:>12}: {result.get('error') or result['skipped']}"
+    memory = result.get("peak_memory_mb")
+    memory_text = f", память +{memory:.0f} МБ" if memory is not None else ""
+    if result["kind"] == "renderer":
+        return (
+            f"{'render':>14} {result['renderer']:>12}: {result['rows']}x{result['cols']}, "
+            f"{result['ms_per_frame']:.1f} мс/кадр{memory_text}"
+        )
+    partial = "" if result["complete"] else " (не успел все)"
+    return (
+        f"{result['workload']:>14} {result['engine']:>12}: {result['generations_per_second']:10.1f} поколений/с, "
+        f"{result['cells_per_second']:.3g} клеток/с{memory_text}, "
+        f"{result['generations']} поколений{partial}, живых {result['population']}"
+    )
+
+
+def compare(old, new):
+    """
+    Сравнивает два запуска и возвращает строки вида
+    "задача движок: было -> стало (xK)" для замеров, которые есть в обоих.
+    """
+    before = {result_key(r): r for r in old["results"] if "error" not in r and "skipped" not in r}
+    lines = []
+    for result in new["results"]:
+        previous = before.get(result_key(result))
+        if previous is None or "error" in result or "skipped" in result:
+            continue
+        if result["kind"] == "renderer":
+            # Для отрисовки меньше — лучше, поэтому ускорение — старое / новое
+            old_value, new_value, unit = previous["ms_per_frame"], result["ms_per_frame"], "мс/кадр"
+            speedup = old_value / new_value if new_value else float("inf")
+            name = f"render {result['renderer']} {result['rows']}x{result['cols']}"
+        else:
+            old_value, new_value = previous["generations_per_second"], result["generations_per_second"]
+            unit = "поколений/с"
+            speedup = new_value / old_value if old_value else float("inf")
+            name = f"{result['workload']} {result['engine']}"
+        lines.append(f"{name}: {old_value:.1f} -> {new_value:.1f} {unit} (x{speedup:.2f})")
+    return lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Замеры скорости движков и отрисовщиков игры Жизнь")
+    parser.add_argument("--output", help="сохранить результаты в этот JSON-файл")
+    parser.add_argument("--compare", metavar="JSON", help="сравнить с результатами прошлого запуска")
+    parser.add_argument("--quick", action="store_true", help="маленькие поля и мало поколений")
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), help="только эти движки")
+    parser.add_argument("--workloads", nargs="+", help="только эти задачи (по имени)")
+    parser.add_argument("--budget", type=float, default=10.0,
+                        help="сколько секунд самое большее считать одну задачу на одном движке")
+    parser.add_argument("--no-render", action="store_true", help="не замерять отрисовщики")
+    args = parser.parse_args()
+    known = {workload.name for workload in workloads(args.quick)}
+    if args.workloads and not set(args.workloads) <= known:
+        parser.error(f"неизвестные задачи: {', '.join(sorted(set(args.workloads) - known))}; "
+                     f"есть: {', '.join(sorted(known))}")
+
+    report = run_benchmarks(args.engines, args.workloads, args.quick, args.budget,
+                            render=not args.no_render, log=lambda result: print(describe(result), flush=True))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+            file.write("\n")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            old_report = json.load(file)
+        print(f"\nСравнение с {args.compare} ({old_report.get('created')}):")
+        for line in compare(old_report, report):
+            print(line)
@@ -0,0 +1,322 @@
+# Битовый движок игры Жизнь: 64 клетки в одном машинном слове.
+# Функции шага вынесены на уровень модуля, чтобы ими пользовался
+# и обычный движок, и параллельный (parallel.py) для своих полос поля.
+
+from engine_base import BOUNDED, LIFE, TORUS, Engine, count_blocks, np
+from rules import CONWAY
+
+# Сколько клеток помещается в одно слово uint64
+WORD_BITS = 64
+
+# Число единичных битов в каждом байте 0..255 (для NumPy старше 2.0, где нет bitwise_count)
+BYTE_BITS = None if np is None else np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+
+def unpack_words(words, cols):
+    """Распаковывает слова uint64 (строка за строкой) в массив uint8 шириной cols."""
+    as_bytes = np.asarray(words).astype("<u8").view(np.uint8)
+    dense = np.unpackbits(as_bytes, axis=1, bitorder="little")
+    return dense[:, :cols]
+
+
+class BitPackedEngine(Engine):
+    """
+    Битовый движок: каждая строка поля упакована в слова uint64,
+    по 64 клетки в слове (бит j слова w — это клетка в столбце w * 64 + j).
+    На клетку уходит 1 бит памяти вместо 8 байт на ссылку в списке.
+
+    Шаг считается "бит-параллельно": восемь сдвинутых копий поля складываются
+    схемами полных сумматоров из операций & | ^, так что одна побитовая
+    операция обрабатывает сразу 64 клетки. Число соседей получается
+    в виде четырёх битовых плоскостей (биты 1, 2, 4 и 8 счётчика).
+    Правило — любое B/S с восемью соседями (семейство LIFE).
+    """
+
+    name = "bitpacked"
+    rule_kinds = (LIFE,)
+
+    def __init__(self, rows, cols, topology=BOUNDED, rule=None):
+        if np is None:
+            raise RuntimeError("Для движка 'bitpacked' нужна библиотека NumPy (pip install numpy)")
+        self.rows = rows
+        self.cols = cols
+        self.topology = topology
+        self.rule = rule or CONWAY
+        self.last_evaluated = 0
+        self.words = (cols + WORD_BITS - 1) // WORD_BITS
+        self.board = np.zeros((rows, self.words), dtype=np.uint64)
+        # Маска последнего слова строки: биты за правым краем поля всегда должны быть нулями
+        tail = cols % WORD_BITS
+        self.tail_mask = np.uint64((1 << tail) - 1 if tail else (1 << WORD_BITS) - 1)
+        # Поле до последнего шага (только при track_changes) — для live_changes()
+        self.previous = None
+
+    def get(self, row, col):
+        """Возвращает True, если клетка (row, col) жива."""
+        word = int(self.board[row, col // WORD_BITS])
+        return bool((word >> (col % WORD_BITS)) & 1)
+
+    def set(self, row, col, alive):
+        """Делает клетку (row, col) живой или мёртвой."""
+        w = col // WORD_BITS
+        bit = 1 << (col % WORD_BITS)
+        word = int(self.board[row, w])
+        word = word | bit if alive else word & ~bit
+        self.board[row, w] = np.uint64(word)
+
+    def clear(self):
+        """Убивает все клетки поля."""
+        self.board.fill(0)
+
+    def set_cells(self, rows, cols):
+        """Оживляет сразу много клеток: биты ставятся прямо в слова, без распаковки поля."""
+        cols = np.asarray(cols, dtype=np.uint64)
+        words = (cols // np.uint64(WORD_BITS)).astype(np.intp)
+        bits = np.uint64(1) << (cols % np.uint64(WORD_BITS))
+        np.bitwise_or.at(self.board, (np.asarray(rows, dtype=np.intp), words), bits)
+
+    def clear_cells(self, rows, cols):
+        """Убивает сразу много клеток: биты снимаются прямо в словах, без распаковки поля."""
+        cols = np.asarray(cols, dtype=np.uint64)
+        words = (cols // np.uint64(WORD_BITS)).astype(np.intp)
+        bits = np.uint64(1) << (cols % np.uint64(WORD_BITS))
+        np.bitwise_and.at(self.board, (np.asarray(rows, dtype=np.intp), words), ~bits)
+
+    def load(self, cells):
+        """Загружает поле из двумерного списка True/False или массива NumPy."""
+        dense = np.zeros((self.rows, self.words * WORD_BITS), dtype=np.uint8)
+        src = np.asarray(cells, dtype=bool)[:self.rows, :self.cols]
+        dense[:src.shape[0], :src.shape[1]] = src
+        self.board = self.pack(dense)
+
+    def set_block(self, top, left, block):
+        """
+        Оживляет отмеченные клетки прямоугольника: строки блока распаковываются,
+        на них накладывается блок, и строки упаковываются обратно.
+        """
+        block = np.asarray(block, dtype=bool)
+        bottom = top + block.shape[0]
+        dense = np.unpackbits(self.board[top:bottom].astype("<u8").view(np.uint8), axis=1, bitorder="little")
+        dense[:, left:left + block.shape[1]] |= block
+        self.board[top:bottom] = self.pack(dense)
+
+    def save_state(self):
+        """
+        Снимок поля для контрольной точки — копия упакованных слов uint64
+        (по биту на клетку), без распаковки в байты (см. timeline.py).
+        """
+        return self.board.copy()
+
+    def restore_state(self, state):
+        """
+        Возвращает поле к снимку: слова save_state() копируются как есть,
+        а поле номерами состояний (uint8, снимок другого движка) загружается через load().
+        """
+        state = np.asarray(state)
+        if state.dtype == np.uint64:
+            self.board = np.array(state)
+        else:
+            self.load(state)
+
+    def pack(self, dense):
+        """Упаковывает массив 0/1 шириной words * 64 в слова uint64."""
+        packed = np.packbits(dense, axis=1, bitorder="little")
+        return packed.view("<u8").astype(np.uint64)
+
+    def unpack(self):
+        """Распаковывает поле в массив uint8 размера rows x cols."""
+        return unpack_words(self.board, self.cols)
+
+    def to_list(self):
+        """Возвращает копию поля в виде списка списков True/False."""
+        return self.unpack().astype(bool).tolist()
+
+    def to_array(self):
+        """Возвращает поле массивом NumPy uint8 размера rows x cols."""
+        return self.unpack()
+
+    def region(self, top, left, height, width):
+        """Прямоугольник поля: распаковываются только его строки и слова."""
+        if height <= 0 or width <= 0:
+            return np.zeros((max(height, 0), max(width, 0)), dtype=np.uint8)
+        first, last = left // WORD_BITS, (left + width - 1) // WORD_BITS + 1
+        words = self.board[top:top + height, first:last].astype("<u8")
+        dense = np.unpackbits(words.view(np.uint8), axis=1, bitorder="little")
+        start = left - first * WORD_BITS
+        return dense[:, start:start + width]
+
+    def block_counts(self, top, left, height, width, block):
+        """
+        Живые клетки в квадратах block x block прямо по упакованному полю:
+        если block и left кратны 8, каждый байт слова целиком лежит в одном
+        квадрате, и складываются числа единиц в байтах — без распаковки.
+        """
+        if block % 8 or left % 8 or height <= 0 or width <= 0:
+            return super().block_counts(top, left, height, width, block)
+        as_bytes = self.board[top:top + height].astype("<u8").view(np.uint8)
+        as_bytes = as_bytes[:, left // 8:-(-(left + width) // 8)]
+        if width % 8:
+            # Биты последнего байта правее прямоугольника не считаем
+            as_bytes = as_bytes.copy()
+            as_bytes[:, -1] &= (1 << width % 8) - 1
+        if hasattr(np, "bitwise_count"):
+            ones = np.bitwise_count(as_bytes)
+        else:
+            ones = BYTE_BITS[as_bytes]
+        return count_blocks(ones, block, block // 8)
+
+    def population(self):
+        """Количество живых клеток на поле."""
+        return int(np.unpackbits(self.board.astype("<u8").view(np.uint8)).sum())
+
+    def live_changes(self):
+        """Ожившие и умершие клетки — из масок изменений."""
+        masks = self.live_change_masks()
+        if masks is None:
+            return None
+        top, _, flipped, alive = masks
+        rows, cols = np.nonzero(flipped)
+        return rows + top, cols, alive[rows, cols]
+
+    def live_change_masks(self):
+        """
+        Маски изменений: XOR упакованных полей до и после шага. Распаковываются
+        только строки от первой до последней изменившейся.
+        """
+        if self.previous is None:
+            return None
+        diff = self.previous ^ self.board
+        changed_rows = np.flatnonzero(diff.any(axis=1))
+        if not changed_rows.size:
+            return 0, 0, np.zeros((0, self.cols), dtype=bool), np.zeros((0, self.cols), dtype=bool)
+        top, bottom = int(changed_rows[0]), int(changed_rows[-1]) + 1
+        flipped = np.unpackbits(diff[top:bottom].astype("<u8").view(np.uint8), axis=1, bitorder="little")
+        alive = np.unpackbits(self.board[top:bottom].astype("<u8").view(np.uint8), axis=1, bitorder="little")
+        return top, 0, flipped[:, :self.cols].view(bool), alive[:, :self.cols].view(bool)
+
+    def step(self):
+        """Вычисляет следующее поколение для всего поля сразу, по 64 клетки за операцию."""
+        # Новое поле — всегда новый массив, поэтому старое можно запомнить без копии
+        self.previous = self.board if self.track_changes else None
+        if self.topology == TORUS:
+            # Приклеиваем сверху последнюю строку, снизу — первую,
+            # считаем с переходом через левый и правый край и отрезаем лишнее
+            extended = np.concatenate([self.board[-1:], self.board, self.board[:1]])
+            self.board = packed_next_generation(extended, self.tail_mask, self.cols, self.rule)[1:-1]
+        else:
+            self.board = packed_next_generation(self.board, self.tail_mask, rule=self.rule)
+        self.last_evaluated = self.rows * self.cols
+
+
+def shift_from_left(x, wrap_cols=None):
+    """
+    Каждая клетка получает значение соседа слева (столбец col - 1).
+    Если задано wrap_cols (ширина поля), столбец 0 получает значение
+    последнего столбца — поле замкнуто по горизонтали.
+    """
+    out = x << np.uint64(1)
+    # Старший бит предыдущего слова переезжает в младший бит текущего
+    out[:, 1:] |= x[:, :-1] >> np.uint64(WORD_BITS - 1)
+    if wrap_cols is not None:
+        last_bit = np.uint64((wrap_cols - 1) % WORD_BITS)
+        out[:, 0] |= (x[:, -1] >> last_bit) & np.uint64(1)
+    return out
+
+
+def shift_from_right(x, wrap_cols=None):
+    """
+    Каждая клетка получает значение соседа справа (столбец col + 1).
+    Если задано wrap_cols, последний столбец получает значение столбца 0.
+    """
+    out = x >> np.uint64(1)
+    # Младший бит следующего слова переезжает в старший бит текущего
+    out[:, :-1] |= x[:, 1:] << np.uint64(WORD_BITS - 1)
+    if wrap_cols is not None:
+        last_bit = np.uint64((wrap_cols - 1) % WORD_BITS)
+        out[:, -1] |= (x[:, 0] & np.uint64(1)) << last_bit
+    return out
+
+
+def neighbor_planes(board, wrap_cols=None):
+    """
+    Возвращает четыре битовые плоскости (s1, s2, s4, s8) числа соседей
+    для упакованного поля board (клетки выше первой и ниже последней строки
+    считаются мёртвыми; по горизонтали — тоже, если не задано wrap_cols):
+    бит клетки в плоскости s1 — младший бит счётчика, в s8 — старший.
+    """
+    # Строки выше и ниже (за краем поля — мёртвые клетки)
+    up = np.zeros_like(board)
+    up[1:] = board[:-1]
+    down = np.zeros_like(board)
+    down[:-1] = board[1:]
+
+    # Три соседа сверху складываем полным сумматором: результат 0..3 (биты t1, t2)
+    t1, t2 = full_adder(shift_from_left(up, wrap_cols), up, shift_from_right(up, wrap_cols))
+    # Три соседа снизу — так же
+    b1, b2 = full_adder(shift_from_left(down, wrap_cols), down, shift_from_right(down, wrap_cols))
+    # Два соседа в своей строке (слева и справа) — полусумматор: 0..2
+    left, right = shift_from_left(board, wrap_cols), shift_from_right(board, wrap_cols)
+    m1, m2 = left ^ right, left & right
+
+    # Складываем единицы: s1 — итоговый младший бит, c2 — перенос в двойки
+    s1, c2 = full_adder(t1, b1, m1)
+    # Складываем двойки: t2 + b2 + m2 + c2 (0..4)
+    x, y4 = full_adder(t2, b2, m2)
+    s2, z4 = x ^ c2, x & c2
+    # Четвёрки: y4 + z4 (0..2) — дают биты 4 и 8
+    s4, s8 = y4 ^ z4, y4 & z4
+    return s1, s2, s4, s8
+
+
+def packed_next_generation(board, tail_mask, wrap_cols=None, rule=None):
+    """
+    Следующее поколение упакованного поля board (массив uint64 rows x words).
+    tail_mask — маска битов последнего слова, лежащих внутри поля;
+    wrap_cols — ширина поля, если оно замкнуто по горизонтали;
+    rule — правило семейства LIFE (по умолчанию B3/S23).
+    Возвращает новый массив, исходный не меняется.
+    """
+    planes = neighbor_planes(board, wrap_cols)
+    if rule is None or rule == CONWAY:
+        s1, s2, s4, s8 = planes
+        # Ровно 2 или 3 соседа: бит 2 установлен, биты 4 и 8 — нет
+        two_or_three = s2 & ~s4 & ~s8
+        # 3 соседа — рождение или выживание; 2 соседа — только выживание (s1 == 0, клетка жива)
+        new_board = two_or_three & (s1 | board)
+    else:
+        # Произвольное правило B/S: маски "ровно n соседей" для нужных n
+        new_board = count_mask(planes, rule.always)
+        if rule.birth_only:
+            new_board |= ~board & count_mask(planes, rule.birth_only)
+        if rule.survive_only:
+            new_board |= board & count_mask(planes, rule.survive_only)
+    # Биты за правым краем поля обнуляем, чтобы там не зарождалась "жизнь"
+    new_board[:, -1] &= tail_mask
+    return new_board
+
+
+def count_mask(planes, ranges):
+    """
+    Маска клеток, у которых число соседей (битовые плоскости planes
+    из neighbor_planes) попадает в один из отрезков ranges.
+    Для каждого числа n берётся AND плоскостей: плоскость, если
+    соответствующий бит n равен 1, и её инверсия, если 0.
+    """
+    mask = np.zeros_like(planes[0])
+    for low, high in ranges:
+        for n in range(low, high + 1):
+            exact = None
+            for bit, plane in enumerate(planes):
+                term = plane if (n >> bit) & 1 else ~plane
+                exact = term if exact is None else exact & term
+            mask |= exact
+    return mask
+
+
+def full_adder(a, b, c):
+    """
+    Полный сумматор над битовыми масками: складывает три бита в каждой позиции.
+    Возвращает (сумма, перенос) — младший и старший биты результата 0..3.
+    """
+    a_xor_b = a ^ b
+    return a_xor_b ^ c, (a & b) | (c & a_xor_b)
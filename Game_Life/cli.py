@@ -0,0 +1,157 @@
+# Запуск игры Жизнь из командной строки, без окна tkinter.
+# Пример: посчитать 1000 поколений глайдера на поле 100 x 100
+# и сохранить результат в сжатый RLE:
+#
+#     python cli.py --pattern glider.rle --rows 100 --cols 100 \
+#         --generations 1000 --format rle --output result.rle.gz
+#
+# Поколения считаются подряд без пауз, в конце в stderr печатается
+# скорость: сколько поколений и клеток обработано за секунду.
+
+import argparse
+import json
+import sys
+
+from engine_base import TOPOLOGIES
+from engines import ENGINES
+from patterns import WRITERS, Pattern, read_pattern, write_pattern
+from rules import parse_rule
+from simulation import Simulation
+from stats import CENSUS_EVERY, StatsSink
+
+
+def build_parser():
+    """Описывает аргументы командной строки."""
+    parser = argparse.ArgumentParser(description="Игра Жизнь без графического интерфейса")
+    parser.add_argument("--pattern",
+                        help="файл с начальной фигурой: .rle, .cells или .lif (можно сжатый .gz, .bz2, .xz)")
+    parser.add_argument("--random", type=float, metavar="DENSITY",
+                        help="вместо фигуры заполнить поле случайно с такой долей живых клеток (0..1)")
+    parser.add_argument("--count", type=int,
+                        help="вместо фигуры оживить ровно столько случайных клеток")
+    parser.add_argument("--region", metavar="TOP,LEFT,HEIGHT,WIDTH",
+                        help="заполнять случайно только этот прямоугольник поля (для --random и --count)")
+    parser.add_argument("--seed", type=int,
+                        help="зерно генератора случайных чисел: с одним зерном поле одинаково на всех движках")
+    parser.add_argument("--rows", type=int, default=30, help="число строк поля (по умолчанию 30)")
+    parser.add_argument("--cols", type=int, default=50, help="число столбцов поля (по умолчанию 50)")
+    parser.add_argument("--rule",
+                        help="правила игры: B36/S23, B2/S/C3, R5,C0,M1,S34..58,B34..45,NM "
+                             "или название (HighLife, Seeds...); по умолчанию — из файла фигуры или B3/S23")
+    parser.add_argument("--generations", type=int, default=100, help="сколько поколений посчитать")
+    parser.add_argument("--detect-cycles", action="store_true",
+                        help="искать зацикливание (поле застыло или повторяется) и сообщить о нём; "
+                             "по умолчанию выключено — поиск стоит времени на каждом поколении")
+    parser.add_argument("--stop-on-cycle", action="store_true",
+                        help="остановиться раньше, если поле застыло или стало повторяться "
+                             "(включает --detect-cycles)")
+    parser.add_argument("--engine", default="auto", choices=["auto", *ENGINES],
+                        help="движок расчёта поколений")
+    parser.add_argument("--topology", choices=TOPOLOGIES,
+                        help="поле с краями (bounded), тор (torus) или бесконечная плоскость (plane)")
+    parser.add_argument("--format", default="stats", choices=["stats", "json", "cells", "rle", "life106"],
+                        help="что вывести: только замеры, замеры с клетками в JSON "
+                             "или итоговое поле в формате plaintext, RLE или Life 1.06")
+    parser.add_argument("--output",
+                        help="файл для результата (по умолчанию — стандартный вывод); "
+                             "с расширением .gz, .bz2 или .xz файл сжимается")
+    parser.add_argument("--stats", metavar="FILE",
+                        help="записывать статистику каждого поколения (живые клетки, рамка, рождения, "
+                             "смерти, перепись объектов) в .csv или .jsonl")
+    parser.add_argument("--census-every", type=int, default=CENSUS_EVERY, metavar="N",
+                        help=f"перепись объектов раз в N поколений (по умолчанию {CENSUS_EVERY}, 0 — без переписи)")
+    return parser
+
+
+def parse_region(text):
+    """Разбирает прямоугольник '10,20,16,16' в (top, left, height, width)."""
+    parts = text.split(",")
+    if len(parts) != 4 or not all(part.strip().lstrip("-").isdigit() for part in parts):
+        raise ValueError(f"Прямоугольник задаётся четырьмя числами TOP,LEFT,HEIGHT,WIDTH, а не {text!r}")
+    return tuple(int(part) for part in parts)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if [args.pattern, args.random, args.count].count(None) != 2:
+        sys.exit("Нужно указать что-то одно: --pattern, --random или --count")
+    try:
+        rule = parse_rule(args.rule) if args.rule else None
+        region = parse_region(args.region) if args.region else None
+        sim = Simulation(args.rows, args.cols, args.engine, topology=args.topology, rule=rule,
+                         detect_cycles=args.detect_cycles or args.stop_on_cycle,
+                         track_stats=args.stats is not None, census_every=args.census_every)
+        if args.pattern is not None:
+            # Фигура ставится в левый верхний угол; правило из файла — если не задано --rule
+            sim.load_pattern(read_pattern(args.pattern), 0, 0, apply_rule=rule is None)
+        else:
+            sim.randomize(args.count, args.random, args.seed, region)
+        if args.stats is not None:
+            sim.stats_sink = StatsSink(args.stats)
+            sim.reset_stats()  # первая запись — начальное поле
+    except (OSError, ValueError) as error:
+        sys.exit(str(error))
+
+    try:
+        stats = sim.run(args.generations, stop_on_cycle=args.stop_on_cycle)
+    finally:
+        if sim.stats_sink is not None:
+            sim.stats_sink.close()
+    print(
+        f"{stats['generations']} поколений за {stats['seconds']:.3f} с: "
+        f"{stats['generations_per_second']:.1f} поколений/с, "
+        f"{stats['cells_per_second']:.3g} клеток/с (движок {sim.engine.name})",
+        file=sys.stderr,
+    )
+    if sim.cycle is not None:
+        print(f"Зацикливание: {sim.cycle.describe()}", file=sys.stderr)
+
+    if args.format in ("cells", "rle", "life106"):
+        fmt = "plaintext" if args.format == "cells" else args.format
+        pattern = Pattern.from_engine(sim.engine, name=f"generation {sim.generation}")
+        try:
+            if args.output:
+                write_pattern(args.output, pattern, fmt)
+            else:
+                WRITERS[fmt](pattern, sys.stdout)
+        except (OSError, ValueError) as error:
+            sys.exit(str(error))
+        return
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        result = {
+            "engine": sim.engine.name,
+            "rule": str(sim.engine.rule),
+            "rows": sim.rows,
+            "cols": sim.cols,
+            "generation": sim.generation,
+            "population": sim.engine.population(),
+            **stats,
+        }
+        if sim.seed is not None:
+            result["seed"] = sim.seed
+        if sim.last_stats is not None:
+            result["bbox"] = sim.last_stats.bbox
+        if sim.cycle is not None:
+            result["cycle"] = {
+                "kind": sim.cycle.kind,
+                "start": sim.cycle.start,
+                "period": sim.cycle.period,
+                "detected_at": sim.cycle.detected_at,
+            }
+        if args.format == "json":
+            result["cells"] = [
+                [row, col]
+                for row, line in enumerate(sim.engine.to_list())
+                for col, state in enumerate(line) if state == 1
+            ]
+        json.dump(result, output, ensure_ascii=False, indent=2)
+        output.write("\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+# Поиск зацикливания в игре Жизнь: поле перестало меняться
+# (устойчивые фигуры) или повторяется с некоторым периодом (осцилляторы).
+#
+# Каждой клетке поля сопоставляется псевдослучайное 64-битное число (ключ Зобриста).
+# Хэш поля — XOR ключей всех живых клеток. Когда клетка меняет состояние,
+# хэш меняется ровно на её ключ, поэтому его не нужно пересчитывать
+# по всему полю: достаточно пройти по изменившимся клеткам (их даёт сам
+# движок — маски изменений или список клеток, см. engine_base.py).
+# Ключи не хранятся таблицей (8 байт на клетку — на поле 8192 x 8192 это
+# 512 МБ), а вычисляются по координатам клетки перемешиванием splitmix64:
+# оно взаимно однозначно, поэтому у разных клеток ключи всегда разные.
+# Если хэш нового поколения уже встречался среди недавних, поле повторилось.
+# Хэш 64-битный, поэтому случайные совпадения практически исключены.
+# У правил Generations клетка вносит в хэш ключ, умноженный на номер
+# состояния: иначе поля с разными угасающими клетками не различались бы.
+# На бесконечной плоскости хэшируется вся плоскость, а не окно, в
+# координатах плоскости: глайдер, улетевший за край окна, продолжает
+# менять хэш, и его уход не принимается за застывшее поле. HashLife
+# хэшировать не нужно: его корень без пустой рамки сам однозначно
+# задаёт плоскость (см. fingerprint() в hashlife.py).
+
+from collections import deque
+
+from engine_base import np
+
+# Хэши — 64-битные числа
+MASK64 = (1 << 64) - 1
+# Сколько клеток поля хэшировать за раз: массивы координат не растут с полем
+STRIP_CELLS = 1 << 20
+
+
+def mix64(x):
+    """Перемешивание splitmix64 одного 64-битного числа (без NumPy)."""
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+
+def cell_key(row, col, salt):
+    """Ключ Зобриста клетки (row, col): строка и столбец — в старшей и младшей половинах числа."""
+    return mix64((((row << 32) | (col & 0xFFFFFFFF)) & MASK64) ^ salt)
+
+
+def cell_keys(rows, cols, salt):
+    """Ключи Зобриста клеток массивами NumPy: то же, что cell_key(), для всех клеток сразу."""
+    x = (np.asarray(rows).astype(np.uint64) << np.uint64(32)) | (np.asarray(cols).astype(np.uint64) & np.uint64(0xFFFFFFFF))
+    x ^= np.uint64(salt)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+class Cycle:
+    """Найденное зацикливание: с какого поколения и с каким периодом повторяется поле."""
+
+    def __init__(self, start, period, detected_at, population):
+        self.start = start              # первое поколение, с которого поле повторяется
+        self.period = period            # период: 1 — поле больше не меняется
+        self.detected_at = detected_at  # поколение, на котором повтор заметили
+        self.population = population    # число живых клеток в момент обнаружения
+
+    @property
+    def kind(self):
+        """'empty' — всё вымерло, 'still' — поле застыло, 'oscillator' — повторяется с периодом."""
+        if self.population == 0:
+            return "empty"
+        return "still" if self.period == 1 else "oscillator"
+
+    def describe(self):
+        """Короткое описание для строки состояния."""
+        if self.kind == "empty":
+            return f"всё вымерло к поколению {self.start}"
+        if self.kind == "still":
+            return f"поле застыло на поколении {self.start}"
+        return f"период {self.period} начиная с поколения {self.start}"
+
+
+class CycleDetector:
+    """
+    Следит за хэшем поля и помнит хэши последних history поколений.
+    После каждого шага вызывается update(); как только хэш повторяется,
+    update() возвращает объект Cycle. Копий поля детектор не держит:
+    изменения за шаг он берёт у движка (и включает их учёт — track_changes).
+    """
+
+    def __init__(self, rows, cols, history=256, seed=2024):
+        self.rows = rows
+        self.cols = cols
+        self.history_size = history
+        # Соль ключей Зобриста: одинаковое зерно — одинаковые ключи
+        self.salt = mix64(seed & MASK64)
+        self.reset_history()
+
+    def reset_history(self):
+        """Забывает все запомненные поколения (например, после правки поля)."""
+        self.hash = None
+        self.seen = {}             # хэш -> поколение, на котором он был
+        self.order = deque()       # (хэш, поколение) в порядке появления — для вытеснения старых
+        self.cycle = None
+
+    def full_hash(self, engine):
+        """
+        Считает хэш поля целиком: XOR ключей всех живых (и угасающих) клеток.
+        С NumPy поле читается полосами строк (region), чтобы не распаковывать
+        и не индексировать его всё сразу. У бесконечной плоскости — все её клетки.
+        """
+        if engine.can_pan:
+            return self.plane_hash(engine)
+        if np is None:
+            value = 0
+            for r, row in enumerate(engine.to_list()):
+                for c, state in enumerate(row):
+                    if state:
+                        value ^= (cell_key(r, c, self.salt) * state) & MASK64
+            return value
+        value = 0
+        height = max(1, STRIP_CELLS // max(engine.cols, 1))
+        for top in range(0, engine.rows, height):
+            strip = np.asarray(engine.region(top, 0, min(height, engine.rows - top), engine.cols))
+            value ^= self.xor_cells(strip != 0, top, 0, strip)
+        return value
+
+    def plane_hash(self, engine):
+        """
+        Хэш всей бесконечной плоскости в её координатах (угол окна прибавляется
+        к координатам клеток), поэтому сдвиг окна хэш не меняет. У правил
+        Generations — вместе с угасающими клетками (cell_states).
+        """
+        if engine.rule.states > 2:
+            rows, cols, states = engine.cell_states()
+        else:
+            rows, cols = engine.live_cells()
+            states = None
+        if np is not None:
+            rows = np.asarray(rows, dtype=np.int64) + engine.top
+            cols = np.asarray(cols, dtype=np.int64) + engine.left
+            keys = cell_keys(rows, cols, self.salt)
+            if states is not None:
+                keys = keys * np.asarray(states, dtype=np.uint64)
+            return int(np.bitwise_xor.reduce(keys))
+        value = 0
+        for r, c, state in zip(rows, cols, states or [1] * len(rows)):
+            value ^= (cell_key(r + engine.top, c + engine.left, self.salt) * state) & MASK64
+        return value
+
+    def xor_cells(self, mask, top, left, cells=None):
+        """
+        XOR ключей клеток из маски mask, чей угол лежит в клетке (top, left).
+        Если задан массив cells, ключи умножаются на состояния клеток из него.
+        """
+        rows, cols = np.nonzero(mask)
+        keys = cell_keys(rows + top, cols + left, self.salt)
+        if cells is not None:
+            states = cells[rows, cols]
+            if states.size and states.max() > 1:
+                keys = keys * states.astype(np.uint64)  # переполнение — просто остаток по модулю 2^64
+        return int(np.bitwise_xor.reduce(keys))
+
+    def xor_mask(self, mask, top, left):
+        """XOR ключей клеток маски изменений — полосами строк, как в full_hash()."""
+        value = 0
+        height = max(1, STRIP_CELLS // max(mask.shape[1], 1))
+        for start in range(0, mask.shape[0], height):
+            value ^= self.xor_cells(mask[start:start + height], top + start, left)
+        return value
+
+    def xor_list(self, rows, cols):
+        """XOR ключей клеток, заданных списками (или массивами) строк и столбцов."""
+        if np is not None:
+            if len(rows) == 0:
+                return 0
+            return int(np.bitwise_xor.reduce(cell_keys(rows, cols, self.salt)))
+        value = 0
+        for r, c in zip(rows, cols):
+            value ^= cell_key(r, c, self.salt)
+        return value
+
+    def changed_hash(self, engine):
+        """
+        Обновляет хэш по изменившимся клеткам: по списку движка (changed_cells),
+        по маскам изменений (live_change_masks) или по координатам оживших и
+        умерших клеток (live_changes). Угасающие состояния Generations в маски
+        не попадают, поэтому у таких правил, как и у движков, которые изменений
+        не ведут, хэш считается заново.
+        """
+        changed = engine.changed_cells()
+        if changed is not None:
+            return self.hash ^ self.xor_list([r for r, _ in changed], [c for _, c in changed])
+        if engine.rule.states == 2:
+            # Координаты изменений отсчитаны от угла окна, хэш плоскости — от её начала
+            top, left = (engine.top, engine.left) if engine.can_pan else (0, 0)
+            masks = engine.live_change_masks()
+            if masks is not None:
+                mask_top, mask_left, flipped, _ = masks
+                return self.hash ^ self.xor_mask(flipped, top + mask_top, left + mask_left)
+            changes = engine.live_changes()
+            if changes is not None:
+                rows, cols, _ = changes
+                if top or left:
+                    rows = [r + top for r in rows] if np is None else rows + top
+                    cols = [c + left for c in cols] if np is None else cols + left
+                return self.hash ^ self.xor_list(rows, cols)
+        return self.full_hash(engine)
+
+    def update(self, engine, generation):
+        """
+        Вызывается после каждого поколения. Возвращает Cycle, если поле
+        повторило одно из недавних поколений, иначе None.
+        """
+        # Движок запоминает поле перед шагом — по нему считаются изменения
+        engine.track_changes = True
+        fingerprint = engine.fingerprint()
+        if fingerprint is not None:
+            self.hash = fingerprint
+        elif self.hash is None:
+            self.hash = self.full_hash(engine)
+        else:
+            self.hash = self.changed_hash(engine)
+
+        first = self.seen.get(self.hash)
+        if first is not None and self.cycle is None:
+            self.cycle = Cycle(first, generation - first, generation, engine.population())
+
+        if first is None:
+            self.seen[self.hash] = generation
+            self.order.append((self.hash, generation))
+            # Храним не больше history_size последних поколений
+            if len(self.order) > self.history_size:
+                old_hash, old_generation = self.order.popleft()
+                if self.seen.get(old_hash) == old_generation:
+                    del self.seen[old_hash]
+        return self.cycle
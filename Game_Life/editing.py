@@ -0,0 +1,134 @@
+# Правки поля мышью: кисть, заливка и очистка прямоугольника, штамп фигуры.
+#
+# Окно не меняет движок сразу при каждом движении мыши: правки копятся
+# в очереди EditQueue, а Simulation.apply_edits() раз в кадр (или после
+# шага, если игра идёт) забирает их все и накладывает на поле пачками —
+# одним вызовом set_cells/clear_cells на каждую серию правок одного знака.
+# Во время игры правки накладывает тот же поток, что считает поколения,
+# сразу после шага, поэтому они никогда не попадают в середину шага.
+
+import threading
+
+from engine_base import np
+
+
+class EditQueue:
+    """
+    Очередь правок поля: каждая правка — (alive, rows, cols), оживить или
+    убить клетки с такими координатами окна. add() можно вызывать из потока
+    окна, пока поток симуляции забирает правки через take().
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.edits = []
+
+    def __len__(self):
+        return len(self.edits)
+
+    def add(self, rows, cols, alive=True):
+        """Добавляет правку: клетки (rows[i], cols[i]) станут живыми (alive) или мёртвыми."""
+        if len(rows):
+            with self.lock:
+                self.edits.append((bool(alive), rows, cols))
+
+    def take(self):
+        """Забирает все накопленные правки (в порядке добавления) и очищает очередь."""
+        with self.lock:
+            edits, self.edits = self.edits, []
+        return edits
+
+
+def apply_edits(engine, edits):
+    """
+    Накладывает правки на движок по порядку. Подряд идущие правки одного
+    знака склеиваются в один вызов set_cells или clear_cells.
+    Возвращает, сколько координат было в правках.
+    """
+    total = 0
+    start = 0
+    while start < len(edits):
+        alive = edits[start][0]
+        end = start
+        while end < len(edits) and edits[end][0] == alive:
+            end += 1
+        if np is not None:
+            rows = np.concatenate([np.asarray(edit[1], dtype=np.intp) for edit in edits[start:end]])
+            cols = np.concatenate([np.asarray(edit[2], dtype=np.intp) for edit in edits[start:end]])
+        else:
+            rows = [r for edit in edits[start:end] for r in edit[1]]
+            cols = [c for edit in edits[start:end] for c in edit[2]]
+        if alive:
+            engine.set_cells(rows, cols)
+        else:
+            engine.clear_cells(rows, cols)
+        total += len(rows)
+        start = end
+    return total
+
+
+def line_cells(row0, col0, row1, col1):
+    """
+    Клетки отрезка от (row0, col0) до (row1, col1) включительно (алгоритм
+    Брезенхэма): быстрое движение мыши между двумя событиями не оставляет
+    в мазке кисти пропусков.
+    """
+    rows, cols = [], []
+    d_row, d_col = abs(row1 - row0), abs(col1 - col0)
+    step_row = 1 if row1 >= row0 else -1
+    step_col = 1 if col1 >= col0 else -1
+    error = d_col - d_row
+    row, col = row0, col0
+    while True:
+        rows.append(row)
+        cols.append(col)
+        if row == row1 and col == col1:
+            return rows, cols
+        double = 2 * error
+        if double > -d_row:
+            error -= d_row
+            col += step_col
+        if double < d_col:
+            error += d_col
+            row += step_row
+
+
+def rectangle_cells(top, left, bottom, right, rows, cols):
+    """
+    Все клетки прямоугольника между углами (top, left) и (bottom, right)
+    (в любом порядке, включительно), обрезанного по полю rows x cols.
+    """
+    top, bottom = max(min(top, bottom), 0), min(max(top, bottom), rows - 1)
+    left, right = max(min(left, right), 0), min(max(left, right), cols - 1)
+    if top > bottom or left > right:
+        return [], []
+    if np is not None:
+        grid_rows, grid_cols = np.mgrid[top:bottom + 1, left:right + 1]
+        return grid_rows.ravel(), grid_cols.ravel()
+    cells = [(r, c) for r in range(top, bottom + 1) for c in range(left, right + 1)]
+    return [r for r, _ in cells], [c for _, c in cells]
+
+
+def stamp_cells(pattern, top, left, rows=None, cols=None, states=False):
+    """
+    Клетки фигуры pattern (Pattern из patterns.py), поставленной левым
+    верхним углом в клетку (top, left). Если заданы rows и cols, клетки
+    за краем поля rows x cols отбрасываются (на бесконечной плоскости их не задают).
+    С states=True — все клетки фигуры, включая угасающие, и третьим
+    элементом их номера состояний.
+    """
+    pattern_top, pattern_left, _, _ = pattern.bounds()
+    cells = pattern.cell_states() if states else pattern.coordinates()
+    cell_rows, cell_cols = cells[0], cells[1]
+    dr, dc = top - pattern_top, left - pattern_left
+    if np is not None:
+        cells = (cell_rows + dr, cell_cols + dc, *cells[2:])
+        if rows is not None:
+            inside = (cells[0] >= 0) & (cells[0] < rows) & (cells[1] >= 0) & (cells[1] < cols)
+            cells = tuple(values[inside] for values in cells)
+        return cells
+    kept = [
+        (r + dr, c + dc, *rest) for r, c, *rest in zip(*cells)
+        if rows is None or (0 <= r + dr < rows and 0 <= c + dc < cols)
+    ]
+    return tuple([cell[i] for cell in kept] for i in range(len(cells)))
@@ -0,0 +1,230 @@
+# Общий предок движков игры Жизнь и необязательный импорт NumPy.
+# Вынесено в отдельный файл, чтобы им пользовались и engines.py, и hashlife.py.
+
+# NumPy — необязательная зависимость: без неё работают движки на чистом Python.
+try:
+    import numpy as np
+except ImportError:  # NumPy не установлен — векторные движки будут недоступны
+    np = None
+
+
+# === ТОПОЛОГИИ ПОЛЯ ===
+# Что находится за краем поля:
+BOUNDED = "bounded"  # ничего: клетки за краем всегда мёртвые (как в исходной игре)
+TORUS = "torus"      # противоположный край: поле склеено в бублик (тор)
+PLANE = "plane"      # продолжение поля: бесконечная плоскость, окно лишь показывает её часть
+TOPOLOGIES = (BOUNDED, TORUS, PLANE)
+
+# === СЕМЕЙСТВА ПРАВИЛ (см. rules.py) ===
+LIFE = "life"                # два состояния, 8 соседей: B3/S23, B36/S23 и т. п.
+GENERATIONS = "generations"  # больше двух состояний: умирающая клетка угасает несколько поколений
+LARGER = "larger"            # два состояния, окрестность радиуса больше 1 (Larger than Life)
+
+
+def count_blocks(cells, block_rows, block_cols):
+    """
+    Суммы массива cells по прямоугольникам block_rows x block_cols (квадраты
+    у правого и нижнего края могут быть неполными). Результат — массив uint32.
+    """
+    height, width = cells.shape
+    rows, cols = -(-height // block_rows), -(-width // block_cols)
+    if rows * block_rows != height or cols * block_cols != width:
+        padded = np.zeros((rows * block_rows, cols * block_cols), dtype=cells.dtype)
+        padded[:height, :width] = cells
+        cells = padded
+    # Сначала складываем строки квадрата (подряд идущая память), потом столбцы
+    sums = cells.reshape(rows, block_rows, cols * block_cols).sum(axis=1, dtype=np.uint32)
+    return sums.reshape(rows, cols, block_cols).sum(axis=2, dtype=np.uint32)
+
+
+class Engine:
+    """
+    Общий предок всех движков. Каждый движок умеет:
+    get/set — прочитать и изменить клетку, clear — очистить поле,
+    load/to_list — загрузить и выгрузить поле списком списков True/False,
+    population — посчитать живые клетки, step — сделать один шаг.
+    Шаг считается по правилу self.rule (см. rules.py). Если у правила больше
+    двух состояний, to_list/to_array отдают номера состояний: 0 — мертва,
+    1 — жива, 2 и дальше — угасает; get по-прежнему отвечает "жива ли клетка".
+
+    Движки бесконечной плоскости (topology == PLANE) показывают окно
+    rows x cols, левый верхний угол которого — клетка (top, left) плоскости;
+    все координаты в get/set/load/to_list отсчитываются от этого угла.
+    """
+
+    name = "base"
+    # Какие топологии поддерживает движок (первая — по умолчанию)
+    topologies = (BOUNDED, TORUS)
+    # Можно ли сдвигать окно по полю (только для бесконечной плоскости)
+    can_pan = False
+    # Какие семейства правил умеет считать движок
+    rule_kinds = (LIFE,)
+    # Запоминать ли поле перед шагом, чтобы live_changes() мог найти изменения
+    # (включает статистика поля, см. stats.py; без неё лишняя память не нужна)
+    track_changes = False
+
+    @classmethod
+    def supports_rule(cls, rule):
+        """True, если движок умеет считать поле по правилу rule (объект Rule из rules.py)."""
+        return rule.kind in cls.rule_kinds
+
+    def pan(self, rows, cols):
+        """Сдвигает окно по плоскости на rows строк вниз и cols столбцов вправо."""
+        if not self.can_pan:
+            raise ValueError(f"Поле движка '{self.name}' ограничено, сдвигать окно некуда")
+        self.top += rows
+        self.left += cols
+
+    def advance(self, generations):
+        """
+        Продвигает поле на generations поколений вперёд.
+        По умолчанию просто делает нужное число обычных шагов;
+        движки, умеющие прыгать сразу на много поколений, переопределяют метод.
+        """
+        for _ in range(generations):
+            self.step()
+
+    def close(self):
+        """
+        Освобождает ресурсы движка (процессы, общую память).
+        Обычным движкам освобождать нечего.
+        """
+
+    def set_cells(self, rows, cols):
+        """
+        Оживляет сразу много клеток: rows и cols — их координаты в окне
+        (массивы NumPy или списки одной длины). По умолчанию клетки
+        оживляются по одной через set(); движки, хранящие поле в массивах,
+        переопределяют метод и пишут всё одной операцией.
+        """
+        for r, c in zip(rows, cols):
+            self.set(int(r), int(c), True)
+
+    def clear_cells(self, rows, cols):
+        """
+        Убивает сразу много клеток (координаты — как в set_cells). По умолчанию
+        по одной через set(); движки на массивах пишут всё одной операцией.
+        """
+        for r, c in zip(rows, cols):
+            self.set(int(r), int(c), False)
+
+    def set_states(self, rows, cols, states):
+        """
+        Ставит клеткам (rows, cols) номера состояний states: 1 — жива, 2, 3, ... —
+        угасает (правила Generations). По умолчанию оживляются клетки
+        в состоянии 1, а угасающие остаются мёртвыми — так поле с угасающими
+        клетками читают движки и правила без Generations.
+        """
+        alive = [(r, c) for r, c, state in zip(rows, cols, states) if state == 1]
+        self.set_cells([r for r, _ in alive], [c for _, c in alive])
+
+    def set_block(self, top, left, block):
+        """
+        Оживляет клетки прямоугольника с углом (top, left), отмеченные в block —
+        массиве NumPy bool или списке списков True/False. Остальные клетки поля
+        не меняются. По умолчанию блок переводится в координаты для set_cells();
+        движки на массивах накладывают его на поле одной операцией.
+        """
+        if np is not None:
+            rows, cols = np.nonzero(np.asarray(block, dtype=bool))
+            self.set_cells(rows + top, cols + left)
+        else:
+            cells = [(r + top, c + left) for r, line in enumerate(block) for c, alive in enumerate(line) if alive]
+            self.set_cells([r for r, _ in cells], [c for _, c in cells])
+
+    def live_cells(self):
+        """
+        Координаты живых клеток (строки, столбцы): с NumPy — два массива,
+        без него — два списка. У бесконечной плоскости — все клетки, а не только окно
+        (координаты отсчитываются от угла окна и могут быть отрицательными).
+        """
+        if np is not None:
+            return np.nonzero(np.asarray(self.to_array()) == 1)
+        cells = [(r, c) for r, row in enumerate(self.to_list()) for c, state in enumerate(row) if state == 1]
+        return [r for r, _ in cells], [c for _, c in cells]
+
+    def cell_states(self):
+        """
+        Все не мёртвые клетки — живые и угасающие (правила Generations):
+        (строки, столбцы, номера состояний), координаты — как в live_cells().
+        """
+        if np is not None:
+            cells = np.asarray(self.to_array())
+            rows, cols = np.nonzero(cells)
+            return rows, cols, cells[rows, cols]
+        cells = [(r, c, int(state)) for r, row in enumerate(self.to_list()) for c, state in enumerate(row) if state]
+        return [r for r, _, _ in cells], [c for _, c, _ in cells], [state for _, _, state in cells]
+
+    def save_state(self):
+        """
+        Снимок поля для контрольной точки (см. timeline.py): окно номерами
+        состояний клеток — массив NumPy uint8 или, без NumPy, список списков.
+        Движки бесконечной плоскости переопределяют метод: их поле больше окна.
+        """
+        if np is not None:
+            return np.array(self.to_array(), dtype=np.uint8)
+        return self.to_list()
+
+    def restore_state(self, state):
+        """Возвращает поле к снимку, сделанному save_state()."""
+        self.load(state.tolist() if np is not None else state)
+
+    def fingerprint(self):
+        """
+        Ключ всего поля для поиска зацикливания: равен у равных полей и
+        различен у разных. None — такого ключа у движка нет, и поле хэшируется
+        по клеткам (см. cycles.py).
+        """
+        return None
+
+    def changed_cells(self):
+        """
+        Список клеток (row, col), изменившихся на последнем шаге,
+        или None, если движок такой список не ведёт.
+        """
+        return None
+
+    def live_changes(self):
+        """
+        Клетки, которые на последнем шаге ожили или умерли: (rows, cols, born) —
+        координаты относительно угла окна и признак "ожила" (True) или "умерла"
+        (False); с NumPy — массивы, без него — списки. Ответ верен сразу после
+        step() при включённом track_changes. None — движок изменения не ведёт,
+        тогда статистика пересчитывается по всему полю.
+        """
+        return None
+
+    def live_change_masks(self):
+        """
+        Те же изменения масками NumPy: (top, left, flipped, alive) — кто
+        изменился и кто жив внутри прямоугольника с углом (top, left); вне
+        прямоугольника ничего не менялось. Так отвечают движки, у которых поле
+        лежит массивом: перевод масок в координаты стоит дороже самих масок.
+        None — пользуйтесь live_changes().
+        """
+        return None
+
+    def region(self, top, left, height, width):
+        """
+        Прямоугольник окна с углом (top, left) массивом NumPy uint8 (как в
+        to_array) — то, что видно на холсте при увеличении. По умолчанию
+        вырезается из to_array(); движки, которым собрать всё поле дорого,
+        переопределяют метод и собирают только нужный кусок.
+        """
+        return np.asarray(self.to_array())[top:top + height, left:left + width]
+
+    def block_counts(self, top, left, height, width, block):
+        """
+        Сколько живых клеток в каждом квадрате block x block прямоугольника
+        окна (массив uint32) — так поле рисуется при уменьшении, когда на
+        пиксель приходится много клеток.
+        """
+        return count_blocks(self.region(top, left, height, width) == 1, block, block)
+
+    def to_array(self):
+        """
+        Возвращает поле массивом NumPy uint8 (1 — жива, 0 — мертва,
+        у правил Generations — номер состояния клетки).
+        Движки, которые хранят поле в NumPy, отдают его без преобразования.
+        """
+        return np.array(self.to_list(), dtype=np.uint8).reshape(self.rows, self.cols)
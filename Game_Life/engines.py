@@ -0,0 +1,686 @@
+# Движки (бэкенды) расчёта поколений для игры Жизнь.
+# Интерфейс (окно tkinter) ничего не знает о том, как хранится поле:
+# он только просит движок "сделай шаг", "какая клетка жива", "оживи клетку".
+# Поэтому способ хранения и алгоритм шага можно менять, не трогая интерфейс.
+
+from collections import Counter
+
+from engine_base import BOUNDED, GENERATIONS, LARGER, LIFE, PLANE, TORUS, Engine, np
+from bitpacked import BitPackedEngine
+from hashlife import HashLifeEngine
+from parallel import ParallelEngine
+from rules import CONWAY
+
+
+class ListEngine(Engine):
+    """
+    Эталонный движок: поле хранится как список списков True/False,
+    каждая клетка обрабатывается отдельно в цикле Python.
+    Медленный, но простой — по нему проверяются все остальные движки.
+    Умеет любые правила из rules.py; у правил Generations в клетках
+    хранятся номера состояний.
+    """
+
+    name = "list"
+    rule_kinds = (LIFE, GENERATIONS, LARGER)
+
+    def __init__(self, rows, cols, topology=BOUNDED, rule=None):
+        self.rows = rows
+        self.cols = cols
+        self.topology = topology
+        self.rule = rule or CONWAY
+        # Сколько клеток было проверено на последнем шаге
+        self.last_evaluated = 0
+        # Изначально всё поле мёртвое
+        self.grid = [[False for _ in range(self.cols)] for _ in range(self.rows)]
+
+    def get(self, row, col):
+        """Возвращает True, если клетка (row, col) жива."""
+        return self.grid[row][col] == 1
+
+    def set(self, row, col, alive):
+        """Делает клетку (row, col) живой или мёртвой."""
+        self.grid[row][col] = bool(alive)
+
+    def clear(self):
+        """Убивает все клетки поля."""
+        self.grid = [[False for _ in range(self.cols)] for _ in range(self.rows)]
+
+    def set_states(self, rows, cols, states):
+        """Ставит клеткам номера состояний (у правил без Generations угасающие мертвы)."""
+        for r, c, state in zip(rows, cols, states):
+            state = int(state)
+            if self.rule.states > 2:
+                self.grid[int(r)][int(c)] = state % self.rule.states
+            else:
+                self.grid[int(r)][int(c)] = state == 1
+
+    def load(self, cells):
+        """Загружает поле из двумерного списка (или любой таблицы) True/False или номеров состояний."""
+        if self.rule.states > 2:
+            self.grid = [[int(cells[r][c]) % self.rule.states for c in range(self.cols)] for r in range(self.rows)]
+        else:
+            self.grid = [[cells[r][c] == 1 for c in range(self.cols)] for r in range(self.rows)]
+
+    def to_list(self):
+        """Возвращает копию поля в виде списка списков True/False (или номеров состояний)."""
+        return [row[:] for row in self.grid]
+
+    def population(self):
+        """Количество живых клеток на поле."""
+        # True == 1, поэтому count(1) считает и True, и состояние 1
+        return sum(row.count(1) for row in self.grid)
+
+    def count_neighbors(self, row, col):
+        """
+        Считает, сколько живых соседей у клетки с координатами (row, col).
+        Какие клетки считаются соседями, задаёт правило (смещения rule.offsets).
+        """
+        count = 0
+        for dr, dc in self.rule.offsets:
+            # Вычисляем координаты соседа
+            r, c = row + dr, col + dc
+            if self.topology == TORUS:
+                # На торе сосед за краем — клетка у противоположного края
+                r, c = r % self.rows, c % self.cols
+            # Проверяем, что сосед находится внутри поля
+            if 0 <= r < self.rows and 0 <= c < self.cols:
+                if self.grid[r][c] == 1:  # если сосед жив — увеличиваем счётчик
+                    count += 1
+        return count
+
+    def step(self):
+        """
+        Создаёт новое поле, применяет правила ко всем клеткам
+        и заменяет старое поле на новое.
+        """
+        # Новое состояние клетки берём из таблицы переходов правила:
+        # table[старое состояние][число живых соседей]
+        table = self.rule.table
+        new_grid = [
+            [table[self.grid[row][col]][self.count_neighbors(row, col)] for col in range(self.cols)]
+            for row in range(self.rows)
+        ]
+
+        # Заменяем старое поле на новое
+        self.grid = new_grid
+        self.last_evaluated = self.rows * self.cols
+
+
+class NumpyEngine(Engine):
+    """
+    Векторный движок: поле — массив NumPy типа uint8 (1 — жива, 0 — мертва,
+    у правил Generations — номер состояния). Число соседей считается сразу
+    для всех клеток сложением сдвинутых копий поля, правило применяется
+    несколькими сравнениями с отрезками чисел соседей (rule.always и др.).
+    """
+
+    name = "numpy"
+    rule_kinds = (LIFE, GENERATIONS, LARGER)
+
+    def __init__(self, rows, cols, topology=BOUNDED, rule=None):
+        if np is None:
+            raise RuntimeError("Для движка 'numpy' нужна библиотека NumPy (pip install numpy)")
+        self.rows = rows
+        self.cols = cols
+        self.topology = topology
+        self.rule = rule or CONWAY
+        self.last_evaluated = 0
+        self.board = np.zeros((rows, cols), dtype=np.uint8)
+        # Поле до последнего шага (только при track_changes) — для live_changes()
+        self.previous = None
+
+    def get(self, row, col):
+        """Возвращает True, если клетка (row, col) жива."""
+        return bool(self.board[row, col] == 1)
+
+    def set(self, row, col, alive):
+        """Делает клетку (row, col) живой или мёртвой."""
+        self.board[row, col] = 1 if alive else 0
+
+    def clear(self):
+        """Убивает все клетки поля."""
+        self.board.fill(0)
+
+    def load(self, cells):
+        """Загружает поле из двумерного списка True/False (номеров состояний) или массива NumPy."""
+        board = np.asarray(cells).astype(np.uint8)[:self.rows, :self.cols]
+        if self.rule.states == 2:
+            # Угасающие клетки (состояние 2 и дальше) в обычной Жизни мертвы
+            board = board == 1
+        self.board = (board % self.rule.states).astype(np.uint8)
+
+    def set_cells(self, rows, cols):
+        """Оживляет сразу много клеток одной операцией над массивом."""
+        self.board[rows, cols] = 1
+
+    def clear_cells(self, rows, cols):
+        """Убивает сразу много клеток одной операцией над массивом."""
+        self.board[rows, cols] = 0
+
+    def set_states(self, rows, cols, states):
+        """Ставит клеткам номера состояний одной операцией над массивом."""
+        states = np.asarray(states, dtype=np.uint8)
+        if self.rule.states == 2:
+            states = (states == 1).astype(np.uint8)
+        self.board[rows, cols] = states % self.rule.states
+
+    def set_block(self, top, left, block):
+        """Оживляет отмеченные клетки прямоугольника одним присваиванием по маске."""
+        block = np.asarray(block, dtype=bool)
+        self.board[top:top + block.shape[0], left:left + block.shape[1]][block] = 1
+
+    def restore_state(self, state):
+        """Возвращает поле к снимку save_state(): массив загружается без перевода в списки."""
+        self.load(state)
+
+    def to_list(self):
+        """Возвращает копию поля в виде списка списков True/False (или номеров состояний)."""
+        if self.rule.states > 2:
+            return self.board.tolist()
+        return self.board.astype(bool).tolist()
+
+    def to_array(self):
+        """Возвращает поле массивом NumPy uint8 (без копирования — только для чтения)."""
+        return self.board
+
+    def population(self):
+        """Количество живых клеток на поле."""
+        if self.rule.states > 2:
+            return int(np.count_nonzero(self.board == 1))
+        return int(self.board.sum())
+
+    def live_changes(self):
+        """Ожившие и умершие клетки: сравнение поля с запомненным перед шагом."""
+        masks = self.live_change_masks()
+        if masks is None:
+            return None
+        _, _, flipped, alive = masks
+        rows, cols = np.nonzero(flipped)
+        return rows, cols, alive[rows, cols]
+
+    def live_change_masks(self):
+        """Маски изменений по всему полю: сравнение с полем, запомненным перед шагом."""
+        if self.previous is None:
+            return None
+        if self.rule.states == 2:
+            alive = self.board.view(bool)
+            flipped = self.previous.view(bool) != alive
+        else:
+            alive = self.board == 1
+            flipped = (self.previous == 1) != alive
+        return 0, 0, flipped, alive
+
+    def neighbor_counts(self):
+        """
+        Возвращает массив с числом живых соседей для каждой клетки.
+        Поле окружается рамкой толщиной в радиус окрестности (мёртвой, а на торе —
+        копией противоположных краёв), после чего складываются сдвинутые
+        "окна" размера rows x cols — по одному на каждого соседа.
+        Для квадратной окрестности большого радиуса сумма по окну
+        считается через накопленные суммы, за время, не зависящее от радиуса.
+        """
+        rule = self.rule
+        alive = self.board if rule.states == 2 else (self.board == 1).view(np.uint8)
+        radius = rule.radius
+        padded = np.pad(alive, radius, mode="wrap" if self.topology == TORUS else "constant")
+        rows, cols = self.rows, self.cols
+        if radius > 1 and rule.neighborhood == "M":
+            # Накопленные суммы с нулевой строкой и столбцом впереди:
+            # сумма по квадрату — четыре обращения к таблице
+            side = 2 * radius + 1
+            sums = np.zeros((padded.shape[0] + 1, padded.shape[1] + 1), dtype=np.int32)
+            np.cumsum(padded, axis=0, out=sums[1:, 1:])
+            np.cumsum(sums[1:, 1:], axis=1, out=sums[1:, 1:])
+            counts = (sums[side:, side:] - sums[:-side, side:]
+                      - sums[side:, :-side] + sums[:-side, :-side])
+            # Сама клетка соседом не считается
+            return (counts - alive).astype(np.uint16)
+        counts = np.zeros((rows, cols), dtype=np.uint8 if rule.max_neighbors < 256 else np.uint16)
+        for dr, dc in rule.offsets:
+            counts += padded[radius + dr:radius + dr + rows, radius + dc:radius + dc + cols]
+        return counts
+
+    def step(self):
+        """Вычисляет следующее поколение для всего поля сразу."""
+        rule = self.rule
+        # Новое поле — всегда новый массив, поэтому старое можно запомнить без копии
+        self.previous = self.board if self.track_changes else None
+        counts = self.neighbor_counts()
+        alive = self.board == 1
+        # Для B3/S23 это ровно (counts == 3) | (alive & (counts == 2))
+        new_alive = in_ranges(counts, rule.always)
+        if rule.birth_only:
+            new_alive |= ~alive & in_ranges(counts, rule.birth_only)
+        if rule.survive_only:
+            new_alive |= alive & in_ranges(counts, rule.survive_only)
+        if rule.states == 2:
+            self.board = new_alive.view(np.uint8)
+        else:
+            # Generations: живая клетка, не выжившая по правилу, начинает угасать
+            # (состояние 2), угасающая переходит в следующее состояние, последнее — в 0
+            board = self.board
+            new_board = np.where(board > 0, board + np.uint8(1), np.uint8(0))
+            new_board[new_board == rule.states] = 0
+            # Рождаются только мёртвые клетки, угасающие — нет
+            new_board[new_alive & ((board == 0) | alive)] = 1
+            self.board = new_board
+        self.last_evaluated = self.rows * self.cols
+
+
+def in_ranges(counts, ranges):
+    """
+    Маска клеток, у которых число соседей попадает в один из отрезков ranges
+    (список пар (от, до) из rules.py). Пустой список — ни одной клетки.
+    """
+    mask = np.zeros(counts.shape, dtype=bool)
+    for low, high in ranges:
+        if low == high:
+            mask |= counts == low
+        else:
+            mask |= (counts >= low) & (counts <= high)
+    return mask
+
+
+class IncrementalEngine(Engine):
+    """
+    Инкрементальный движок: пересчитывает только "активные" клетки —
+    те, что изменились на прошлом шаге, и их соседей. Клетки в пустых
+    областях и внутри устойчивых фигур (блоки, ульи) не проверяются вовсе,
+    поэтому работа растёт с активностью на поле, а не с его площадью.
+
+    Для каждой клетки хранится готовое число живых соседей: при смене
+    состояния клетки счётчики восьми её соседей поправляются на +-1.
+    Если активных клеток слишком много (больше доли full_threshold от поля),
+    шаг выполняется полным перебором — так дешевле, чем вести множества.
+
+    Правила с рождением без соседей (B0) не поддерживаются: при них
+    меняются и клетки вдали от активных, которые движок не проверяет.
+    """
+
+    name = "incremental"
+    rule_kinds = (LIFE, LARGER)
+
+    @classmethod
+    def supports_rule(cls, rule):
+        """Любые правила с двумя состояниями, кроме рождения без соседей (B0)."""
+        return super().supports_rule(rule) and 0 not in rule.birth
+
+    def __init__(self, rows, cols, topology=BOUNDED, rule=None, full_threshold=0.5):
+        self.rows = rows
+        self.cols = cols
+        self.topology = topology
+        self.rule = rule or CONWAY
+        self.full_threshold = full_threshold
+        # === СЧЁТЧИКИ РАБОТЫ ===
+        self.last_evaluated = 0   # сколько клеток проверено на последнем шаге
+        self.total_evaluated = 0  # сколько клеток проверено за всё время
+        self.full_steps = 0       # сколько шагов прошло полным перебором
+        self.clear()
+
+    def clear(self):
+        """Убивает все клетки поля."""
+        self.grid = [[False for _ in range(self.cols)] for _ in range(self.rows)]
+        # Число живых соседей каждой клетки
+        self.counts = [[0 for _ in range(self.cols)] for _ in range(self.rows)]
+        # Клетки, которые нужно проверить на следующем шаге
+        self.active = set()
+        # Клетки, поменявшие состояние на последнем шаге
+        self.changed = []
+
+    def get(self, row, col):
+        """Возвращает True, если клетка (row, col) жива."""
+        return self.grid[row][col]
+
+    def set(self, row, col, alive):
+        """Делает клетку (row, col) живой или мёртвой."""
+        if self.grid[row][col] != bool(alive):
+            self.flip(row, col)
+
+    def load(self, cells):
+        """Загружает поле из двумерного списка (или любой таблицы) True/False."""
+        self.clear()
+        for r in range(self.rows):
+            for c in range(self.cols):
+                if cells[r][c] == 1:
+                    self.flip(r, c)
+
+    def to_list(self):
+        """Возвращает копию поля в виде списка списков True/False."""
+        return [row[:] for row in self.grid]
+
+    def population(self):
+        """Количество живых клеток на поле."""
+        return sum(sum(row) for row in self.grid)
+
+    def changed_cells(self):
+        """Клетки, изменившиеся на последнем шаге (движок ведёт этот список сам)."""
+        return self.changed
+
+    def live_changes(self):
+        """Ожившие и умершие клетки — из списка изменившихся за шаг."""
+        rows = [r for r, _ in self.changed]
+        cols = [c for _, c in self.changed]
+        born = [self.grid[r][c] for r, c in self.changed]
+        if np is not None:
+            return np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp), np.array(born, dtype=bool)
+        return rows, cols, born
+
+    def neighbors(self, row, col):
+        """Перечисляет координаты соседей клетки (по окрестности правила), лежащих внутри поля."""
+        if self.topology == TORUS:
+            # На торе у каждой клетки полная окрестность (с переходом через край)
+            for dr, dc in self.rule.offsets:
+                yield (row + dr) % self.rows, (col + dc) % self.cols
+            return
+        for dr, dc in self.rule.offsets:
+            r, c = row + dr, col + dc
+            if 0 <= r < self.rows and 0 <= c < self.cols:
+                yield r, c
+
+    def flip(self, row, col):
+        """
+        Переключает состояние клетки, поправляет счётчики соседей
+        и помечает клетку с окрестностью как активную.
+        """
+        alive = not self.grid[row][col]
+        self.grid[row][col] = alive
+        delta = 1 if alive else -1
+        self.active.add((row, col))
+        for r, c in self.neighbors(row, col):
+            self.counts[r][c] += delta
+            self.active.add((r, c))
+
+    def step(self):
+        """Вычисляет следующее поколение, проверяя только активные клетки."""
+        grid, counts = self.grid, self.counts
+        if len(self.active) > self.full_threshold * self.rows * self.cols:
+            # Активна большая часть поля — проверяем все клетки подряд
+            candidates = [(r, c) for r in range(self.rows) for c in range(self.cols)]
+            self.full_steps += 1
+        else:
+            candidates = self.active
+
+        # Сначала только собираем клетки, которые должны измениться,
+        # чтобы правила применялись к старому поколению целиком
+        # (новое состояние — из таблицы переходов правила)
+        table = self.rule.table
+        flips = [(r, c) for r, c in candidates if table[grid[r][c]][counts[r][c]] != grid[r][c]]
+
+        self.last_evaluated = len(candidates)
+        self.total_evaluated += self.last_evaluated
+
+        # Теперь применяем изменения; активными на следующем шаге станут
+        # только изменившиеся клетки и их соседи
+        self.active = set()
+        for r, c in flips:
+            self.flip(r, c)
+        self.changed = flips
+
+
+class SparseEngine(Engine):
+    """
+    Движок бесконечной плоскости: хранит только множество координат живых клеток.
+    Память и время шага растут с числом живых клеток, а не с размером
+    поля: глайдер может улететь сколь угодно далеко. Окно rows x cols
+    показывает часть плоскости и сдвигается методом pan().
+    У правил Generations угасающие клетки хранятся отдельно, в словаре dying.
+    """
+
+    name = "sparse"
+    topologies = (PLANE,)
+    can_pan = True
+    rule_kinds = (LIFE, GENERATIONS, LARGER)
+
+    @classmethod
+    def supports_rule(cls, rule):
+        """Любые правила, кроме рождения без соседей (B0): оно заполнило бы всю плоскость."""
+        return super().supports_rule(rule) and 0 not in rule.birth
+
+    def __init__(self, rows, cols, topology=PLANE, rule=None):
+        self.rows = rows
+        self.cols = cols
+        self.topology = topology
+        self.rule = rule or CONWAY
+        self.last_evaluated = 0
+        # Левый верхний угол окна на плоскости
+        self.top = 0
+        self.left = 0
+        # Живые клетки до последнего шага (только при track_changes) — для live_changes()
+        self.previous = None
+        self.clear()
+
+    def get(self, row, col):
+        """Возвращает True, если клетка (row, col) окна жива."""
+        return (row + self.top, col + self.left) in self.live
+
+    def set(self, row, col, alive):
+        """Делает клетку (row, col) окна живой или мёртвой."""
+        cell = (row + self.top, col + self.left)
+        self.dying.pop(cell, None)
+        if alive:
+            self.live.add(cell)
+        else:
+            self.live.discard(cell)
+
+    def set_cells(self, rows, cols):
+        """Оживляет сразу много клеток: координаты добавляются в множество одним вызовом."""
+        cells = set(zip(map(int, rows), map(int, cols)))
+        if self.top or self.left:
+            cells = {(r + self.top, c + self.left) for r, c in cells}
+        for cell in cells.intersection(self.dying):
+            del self.dying[cell]
+        self.live |= cells
+
+    def set_states(self, rows, cols, states):
+        """Ставит клеткам номера состояний: живые — в множество, угасающие — в словарь dying."""
+        generations = self.rule.states > 2
+        for r, c, state in zip(rows, cols, states):
+            cell, state = (int(r) + self.top, int(c) + self.left), int(state)
+            if state == 1:
+                self.dying.pop(cell, None)
+                self.live.add(cell)
+            elif generations and state % self.rule.states > 1:
+                self.live.discard(cell)
+                self.dying[cell] = state % self.rule.states
+
+    def clear_cells(self, rows, cols):
+        """Убивает сразу много клеток: координаты вычитаются из множества одним вызовом."""
+        cells = {(int(r) + self.top, int(c) + self.left) for r, c in zip(rows, cols)}
+        for cell in cells.intersection(self.dying):
+            del self.dying[cell]
+        self.live -= cells
+
+    def live_cells(self):
+        """Координаты всех живых клеток плоскости относительно угла окна."""
+        rows = [r - self.top for r, _ in self.live]
+        cols = [c - self.left for _, c in self.live]
+        if np is not None:
+            return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)
+        return rows, cols
+
+    def cell_states(self):
+        """Живые и угасающие клетки всей плоскости с номерами состояний относительно угла окна."""
+        rows, cols, states = self.save_state()
+        if np is not None:
+            return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64), np.array(states, dtype=np.uint8)
+        return rows, cols, states
+
+    def save_state(self):
+        """
+        Снимок всей плоскости для контрольной точки: строки, столбцы и состояния
+        живых и угасающих клеток относительно угла окна.
+        """
+        cells = [(r, c, 1) for r, c in self.live] + [(r, c, state) for (r, c), state in self.dying.items()]
+        return (
+            [r - self.top for r, _, _ in cells],
+            [c - self.left for _, c, _ in cells],
+            [state for _, _, state in cells],
+        )
+
+    def restore_state(self, state):
+        """Возвращает плоскость к снимку save_state()."""
+        self.clear()
+        for r, c, value in zip(*state):
+            cell = (int(r) + self.top, int(c) + self.left)
+            if value == 1:
+                self.live.add(cell)
+            else:
+                self.dying[cell] = int(value)
+
+    def clear(self):
+        """Убивает все клетки плоскости."""
+        # Координаты (строка, столбец) живых клеток на плоскости
+        self.live = set()
+        # Угасающие клетки (правила Generations): координаты -> состояние 2, 3, ...
+        self.dying = {}
+
+    def load(self, cells):
+        """Загружает окно из двумерного списка True/False или номеров состояний (остальная плоскость пустеет)."""
+        self.clear()
+        for r in range(self.rows):
+            for c in range(self.cols):
+                state = int(cells[r][c])
+                if state == 1:
+                    self.live.add((r + self.top, c + self.left))
+                elif state > 1 and self.rule.states > 2:
+                    self.dying[(r + self.top, c + self.left)] = state % self.rule.states
+
+    def to_list(self):
+        """Возвращает видимое окно списком списков True/False (или номеров состояний)."""
+        generations = self.rule.states > 2
+        out = [[0 if generations else False] * self.cols for _ in range(self.rows)]
+        cells = [(cell, 1 if generations else True) for cell in self.live]
+        cells += self.dying.items()
+        for (r, c), state in cells:
+            r, c = r - self.top, c - self.left
+            if 0 <= r < self.rows and 0 <= c < self.cols:
+                out[r][c] = state
+        return out
+
+    def region(self, top, left, height, width):
+        """Прямоугольник окна: в массив попадают только живые и угасающие клетки внутри него."""
+        out = np.zeros((height, width), dtype=np.uint8)
+        top, left = top + self.top, left + self.left
+        cells = [(cell, 1) for cell in self.live]
+        cells += self.dying.items()
+        for (r, c), state in cells:
+            if top <= r < top + height and left <= c < left + width:
+                out[r - top, c - left] = state
+        return out
+
+    def population(self):
+        """Количество живых клеток на всей плоскости."""
+        return len(self.live)
+
+    def live_changes(self):
+        """Ожившие и умершие клетки — разность множеств живых клеток до и после шага."""
+        if self.previous is None:
+            return None
+        born = self.live - self.previous
+        died = self.previous - self.live
+        cells = [(r, c, True) for r, c in born] + [(r, c, False) for r, c in died]
+        rows = [r - self.top for r, _, _ in cells]
+        cols = [c - self.left for _, c, _ in cells]
+        flags = [flag for _, _, flag in cells]
+        if np is not None:
+            return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64), np.array(flags, dtype=bool)
+        return rows, cols, flags
+
+    def step(self):
+        """
+        Следующее поколение: каждая живая клетка добавляет по единице всем
+        своим соседям, и по получившимся счётчикам применяются правила.
+        Проверяются только клетки, у которых есть хотя бы один живой сосед
+        (и живые клетки без соседей, если правило разрешает им выжить — S0).
+        """
+        live, dying, rule = self.live, self.dying, self.rule
+        # Множество живых клеток после шага — новое, старое можно запомнить без копии
+        self.previous = live if self.track_changes else None
+        counts = Counter(
+            (r + dr, c + dc) for r, c in live for dr, dc in rule.offsets
+        )
+        if 0 in rule.survive:
+            for cell in live:
+                counts.setdefault(cell, 0)
+        # Рождаются только мёртвые клетки, угасающие — нет
+        self.live = {
+            cell for cell, n in counts.items()
+            if (n in rule.survive if cell in live else n in rule.birth and cell not in dying)
+        }
+        if rule.states > 2:
+            # Угасающие переходят в следующее состояние, умершие живые начинают угасать
+            self.dying = {cell: state + 1 for cell, state in dying.items() if state + 1 < rule.states}
+            self.dying.update((cell, 2) for cell in live - self.live)
+        self.last_evaluated = len(counts)
+
+
+# Реестр всех движков: имя -> класс
+ENGINES = {
+    ListEngine.name: ListEngine,
+    NumpyEngine.name: NumpyEngine,
+    BitPackedEngine.name: BitPackedEngine,
+    IncrementalEngine.name: IncrementalEngine,
+    HashLifeEngine.name: HashLifeEngine,
+    ParallelEngine.name: ParallelEngine,
+    SparseEngine.name: SparseEngine,
+}
+
+
+def available_engines(topology=None, rule=None):
+    """
+    Список имён движков, которые можно создать в текущем окружении.
+    Если задана топология или правило — только движки, которые их поддерживают.
+    """
+    names = [ListEngine.name, IncrementalEngine.name, SparseEngine.name, HashLifeEngine.name]
+    if np is not None:
+        names.append(NumpyEngine.name)
+        names.append(BitPackedEngine.name)
+        names.append(ParallelEngine.name)
+    if topology is not None:
+        names = [name for name in names if topology in ENGINES[name].topologies]
+    if rule is not None:
+        names = [name for name in names if ENGINES[name].supports_rule(rule)]
+    return names
+
+
+def default_engine(topology=None, rule=None):
+    """
+    Имя движка, который выбирается для топологии и правила в режиме "auto".
+    Если подходящего движка нет, бросает ValueError.
+    """
+    if topology == PLANE:
+        preferred = [SparseEngine.name, HashLifeEngine.name]
+    else:
+        preferred = [NumpyEngine.name, ListEngine.name]
+    names = available_engines(topology, rule)
+    for name in preferred:
+        if name in names:
+            return name
+    raise ValueError(f"Ни один движок не умеет считать правило {str(rule)!r} на поле {topology!r}")
+
+
+def create_engine(name, rows, cols, topology=None, rule=None):
+    """
+    Создаёт движок по имени. Имя "auto" (или None) выбирает самый быстрый
+    из доступных: для ограниченного поля и тора — NumPy, если он установлен,
+    иначе эталонный на списках; для бесконечной плоскости — sparse.
+    Если топология не задана, берётся основная топология движка;
+    если не задано правило — B3/S23 (объект Rule из rules.py).
+    """
+    rule = rule or CONWAY
+    if name in (None, "auto"):
+        name = default_engine(topology, rule)
+    if name not in ENGINES:
+        raise ValueError(f"Неизвестный движок: {name!r}. Доступны: {', '.join(ENGINES)}")
+    engine_class = ENGINES[name]
+    if topology is None:
+        topology = engine_class.topologies[0]
+    if topology not in engine_class.topologies:
+        raise ValueError(
+            f"Движок {name!r} не поддерживает топологию {topology!r}. "
+            f"Поддерживаются: {', '.join(engine_class.topologies)}"
+        )
+    if not engine_class.supports_rule(rule):
+        raise ValueError(f"Движок {name!r} не умеет считать правило {str(rule)!r}")
+    return engine_class(rows, cols, topology, rule)
@@ -0,0 +1,525 @@
+# Движок HashLife для игры Жизнь (алгоритм Билла Госпера).
+#
+# Поле — бесконечная плоскость, которая хранится как квадродерево:
+# узел уровня k — это квадрат 2^k x 2^k клеток, разбитый на четыре
+# квадранта уровня k - 1 (a — северо-запад, b — северо-восток,
+# c — юго-запад, d — юго-восток). Листья (уровень 0) — одна клетка.
+#
+# Главные идеи:
+# 1. Канонизация: одинаковые квадраты хранятся в одном экземпляре
+#    (таблица "четыре потомка -> узел"), поэтому повторяющиеся области
+#    поля (пустота, одинаковые фигуры) занимают память один раз.
+# 2. Запоминание результата: для узла уровня k функция RESULT (successor)
+#    возвращает его центральный квадрат уровня k - 1 через 2^(k-2) поколений.
+#    Ответ запоминается, и для уже встречавшегося квадрата не пересчитывается.
+# 3. Благодаря этому за один вызов можно перепрыгнуть сразу 2^j поколений,
+#    а поколение N получить за log2(N) таких прыжков.
+
+from engine_base import LIFE, PLANE, Engine, np
+from rules import CONWAY
+
+
+class Node:
+    """
+    Узел квадродерева. Создаётся только через HashLifeEngine.join,
+    чтобы одинаковые квадраты были одним и тем же объектом.
+    """
+
+    __slots__ = ("level", "a", "b", "c", "d", "population")
+
+    def __init__(self, level, a, b, c, d, population):
+        self.level = level            # уровень: квадрат 2^level x 2^level
+        self.a, self.b = a, b         # верхние квадранты (левый, правый)
+        self.c, self.d = c, d         # нижние квадранты (левый, правый)
+        self.population = population  # число живых клеток в квадрате
+
+
+# Листья: мёртвая и живая клетка
+DEAD = Node(0, None, None, None, None, 0)
+ALIVE = Node(0, None, None, None, None, 1)
+
+
+class HashLifeEngine(Engine):
+    """
+    Движок HashLife. Поле бесконечно во все стороны, окно игры показывает
+    только его часть: rows строк и cols столбцов начиная с клетки (top, left).
+    Клетки, улетевшие за пределы окна (например, глайдеры), продолжают жить.
+
+    max_nodes — сколько узлов разрешено держать в таблице. Когда таблица
+    разрастается сильнее, запускается сборка мусора: остаются только узлы,
+    нужные для текущего поля, а запомненные результаты забываются.
+
+    Правило — любое B/S с восемью соседями, кроме рождения без соседей (B0):
+    алгоритм опирается на то, что в пустоте ничего не рождается.
+    """
+
+    name = "hashlife"
+    topologies = (PLANE,)
+    can_pan = True
+    rule_kinds = (LIFE,)
+
+    @classmethod
+    def supports_rule(cls, rule):
+        """Правила B/S с восемью соседями без рождения в пустоте (B0)."""
+        return super().supports_rule(rule) and 0 not in rule.birth
+
+    def __init__(self, rows, cols, topology=PLANE, rule=None, max_nodes=1_000_000):
+        self.rows = rows
+        self.cols = cols
+        self.topology = topology
+        self.rule = rule or CONWAY
+        # Левый верхний угол окна на плоскости
+        self.top = 0
+        self.left = 0
+        self.max_nodes = max_nodes
+        # Таблица канонизации: (a, b, c, d) -> узел
+        self.table = {}
+        # Запомненные результаты RESULT: (узел, j) -> центр узла через 2^j поколений
+        self.results = {}
+        # Пустые квадраты каждого уровня (нужны постоянно, поэтому храним отдельно)
+        self.empties = [DEAD]
+        # === СЧЁТЧИКИ РАБОТЫ ===
+        self.last_evaluated = 0  # сколько результатов пришлось вычислить на последнем шаге
+        self.collections = 0     # сколько раз запускалась сборка мусора
+        self.clear()
+
+    # === ПОСТРОЕНИЕ УЗЛОВ ===
+
+    def join(self, a, b, c, d):
+        """Возвращает канонический узел из четырёх квадрантов."""
+        key = (a, b, c, d)
+        node = self.table.get(key)
+        if node is None:
+            population = a.population + b.population + c.population + d.population
+            node = Node(a.level + 1, a, b, c, d, population)
+            self.table[key] = node
+        return node
+
+    def empty(self, level):
+        """Возвращает пустой квадрат заданного уровня."""
+        while len(self.empties) <= level:
+            z = self.empties[-1]
+            self.empties.append(self.join(z, z, z, z))
+        return self.empties[level]
+
+    def centre(self, m):
+        """
+        Окружает квадрат пустой рамкой: результат на уровень больше,
+        а исходный квадрат оказывается ровно в его центре.
+        """
+        z = self.empty(m.level - 1)
+        return self.join(
+            self.join(z, z, z, m.a), self.join(z, z, m.b, z),
+            self.join(z, m.c, z, z), self.join(m.d, z, z, z),
+        )
+
+    def inner(self, m):
+        """Центральный квадрат узла (на уровень меньше) — без сдвига во времени."""
+        return self.join(m.a.d, m.b.c, m.c.b, m.d.a)
+
+    # === ВЫЧИСЛЕНИЕ ПОКОЛЕНИЙ ===
+
+    def life_4x4(self, m):
+        """
+        Базовый случай RESULT: для квадрата 4x4 (уровень 2)
+        возвращает его центральный квадрат 2x2 через одно поколение.
+        """
+        cells = [
+            [m.a.a, m.a.b, m.b.a, m.b.b],
+            [m.a.c, m.a.d, m.b.c, m.b.d],
+            [m.c.a, m.c.b, m.d.a, m.d.b],
+            [m.c.c, m.c.d, m.d.c, m.d.d],
+        ]
+        table = self.rule.table
+        out = []
+        for row in (1, 2):
+            for col in (1, 2):
+                neighbors = sum(
+                    cells[r][c].population
+                    for r in (row - 1, row, row + 1)
+                    for c in (col - 1, col, col + 1)
+                ) - cells[row][col].population
+                alive = cells[row][col].population
+                # Новое состояние — из таблицы переходов правила
+                out.append(ALIVE if table[alive][neighbors] else DEAD)
+        return self.join(*out)
+
+    def successor(self, m, j):
+        """
+        Функция RESULT: центральный квадрат узла m (уровень k - 1)
+        через 2^j поколений, где j <= k - 2.
+        """
+        j = min(j, m.level - 2)
+        key = (m, j)
+        result = self.results.get(key)
+        if result is not None:
+            return result
+        self.last_evaluated += 1
+
+        if m.population == 0:
+            # В пустоте ничего не рождается
+            result = m.a
+        elif m.level == 2:
+            result = self.life_4x4(m)
+        else:
+            # Девять перекрывающихся квадратов уровня k - 1, покрывающих узел 3x3
+            join = self.join
+            n00 = join(m.a.a, m.a.b, m.a.c, m.a.d)
+            n01 = join(m.a.b, m.b.a, m.a.d, m.b.c)
+            n02 = join(m.b.a, m.b.b, m.b.c, m.b.d)
+            n10 = join(m.a.c, m.a.d, m.c.a, m.c.b)
+            n11 = join(m.a.d, m.b.c, m.c.b, m.d.a)
+            n12 = join(m.b.c, m.b.d, m.d.a, m.d.b)
+            n20 = join(m.c.a, m.c.b, m.c.c, m.c.d)
+            n21 = join(m.c.b, m.d.a, m.c.d, m.d.c)
+            n22 = join(m.d.a, m.d.b, m.d.c, m.d.d)
+
+            if j < m.level - 2:
+                # Малый шаг: каждый из девяти квадратов продвигаем на 2^j поколений,
+                # из их центров собираем ответ
+                c00, c01, c02 = (self.successor(n, j) for n in (n00, n01, n02))
+                c10, c11, c12 = (self.successor(n, j) for n in (n10, n11, n12))
+                c20, c21, c22 = (self.successor(n, j) for n in (n20, n21, n22))
+                result = join(
+                    join(c00.d, c01.c, c10.b, c11.a),
+                    join(c01.d, c02.c, c11.b, c12.a),
+                    join(c10.d, c11.c, c20.b, c21.a),
+                    join(c11.d, c12.c, c21.b, c22.a),
+                )
+            else:
+                # Полный шаг: два раза по 2^(k-3) поколений — сначала девять
+                # квадратов, затем четыре квадрата, собранных из их результатов
+                c00, c01, c02 = (self.successor(n, j) for n in (n00, n01, n02))
+                c10, c11, c12 = (self.successor(n, j) for n in (n10, n11, n12))
+                c20, c21, c22 = (self.successor(n, j) for n in (n20, n21, n22))
+                result = join(
+                    self.successor(join(c00, c01, c10, c11), j),
+                    self.successor(join(c01, c02, c11, c12), j),
+                    self.successor(join(c10, c11, c20, c21), j),
+                    self.successor(join(c11, c12, c21, c22), j),
+                )
+
+        self.results[key] = result
+        return result
+
+    def is_padded(self, m):
+        """
+        Проверяет, что все живые клетки лежат в центральной восьмушке
+        узла по ширине (квадрат [3/8, 5/8]). Тогда за 2^(k-3) поколений
+        фигура гарантированно не выйдет за центр узла, который вернёт RESULT.
+        """
+        return self.inner(self.inner(m)).population == m.population
+
+    def advance(self, generations):
+        """
+        Продвигает поле на generations поколений: число раскладывается
+        по степеням двойки, и для каждой единичной двоичной цифры
+        делается один прыжок RESULT на 2^j поколений.
+        """
+        self.last_evaluated = 0
+        j = 0
+        while generations > 0:
+            if generations & 1:
+                # Расширяем поле пустой рамкой, пока прыжок не станет безопасным
+                while self.root.level < j + 3 or not self.is_padded(self.root):
+                    self.root = self.centre(self.root)
+                self.root = self.successor(self.root, j)
+            generations >>= 1
+            j += 1
+        self.collect_if_needed()
+
+    def step(self):
+        """Вычисляет следующее поколение."""
+        self.advance(1)
+
+    # === ПАМЯТЬ ===
+
+    def collect_if_needed(self):
+        """
+        Сборка мусора: если таблица узлов выросла больше max_nodes,
+        забываем все запомненные результаты и оставляем только узлы,
+        из которых состоит текущее поле.
+        """
+        if len(self.table) <= self.max_nodes:
+            return
+        self.collections += 1
+        self.results = {}
+        self.table = {}
+        self.empties = [DEAD]
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.level == 0:
+                continue
+            key = (node.a, node.b, node.c, node.d)
+            if key in self.table:
+                continue
+            self.table[key] = node
+            stack.extend(key)
+
+    # === ДОСТУП К КЛЕТКАМ ===
+    # Корень всегда расположен так, что его центр — точка (0, 0):
+    # он покрывает строки и столбцы от -2^(k-1) до 2^(k-1) - 1.
+    # get/set/load/to_list работают в координатах окна: к ним прибавляется (top, left).
+
+    def half(self):
+        """Половина ширины корня — смещение от угла корня до точки (0, 0)."""
+        return 1 << (self.root.level - 1)
+
+    def get(self, row, col):
+        """Возвращает True, если клетка (row, col) окна жива."""
+        row, col = row + self.top, col + self.left
+        half = self.half()
+        y, x = row + half, col + half
+        if not (0 <= y < 2 * half and 0 <= x < 2 * half):
+            return False
+        node = self.root
+        while node.level > 0:
+            if node.population == 0:
+                return False
+            half_size = 1 << (node.level - 1)
+            top, left = y < half_size, x < half_size
+            node = (node.a if left else node.b) if top else (node.c if left else node.d)
+            y, x = y % half_size, x % half_size
+        return node is ALIVE
+
+    def set(self, row, col, alive):
+        """Делает клетку (row, col) окна живой или мёртвой."""
+        row, col = row + self.top, col + self.left
+        # Расширяем корень, пока клетка в него не поместится
+        while True:
+            half = self.half()
+            if -half <= row < half and -half <= col < half:
+                break
+            self.root = self.centre(self.root)
+        self.root = self.set_in(self.root, row + half, col + half, ALIVE if alive else DEAD)
+
+    def set_in(self, node, y, x, leaf):
+        """Возвращает копию узла, в которой клетка (y, x) заменена на лист leaf."""
+        if node.level == 0:
+            return leaf
+        half_size = 1 << (node.level - 1)
+        a, b, c, d = node.a, node.b, node.c, node.d
+        if y < half_size:
+            if x < half_size:
+                a = self.set_in(a, y, x, leaf)
+            else:
+                b = self.set_in(b, y, x - half_size, leaf)
+        else:
+            if x < half_size:
+                c = self.set_in(c, y - half_size, x, leaf)
+            else:
+                d = self.set_in(d, y - half_size, x - half_size, leaf)
+        return self.join(a, b, c, d)
+
+    def clear(self):
+        """Убивает все клетки поля."""
+        self.root = self.empty(3)
+
+    def set_cells(self, rows, cols):
+        """
+        Оживляет сразу много клеток. Вместо спуска от корня для каждой клетки
+        дерево строится снизу вверх: клетки группируются по четыре в узлы
+        уровня 1, те — по четыре в узлы уровня 2 и так далее до корня.
+        Живые клетки, уже стоявшие на поле, сохраняются.
+        """
+        old_rows, old_cols = self.live_cells()
+        if np is not None:
+            rows = np.concatenate([old_rows, np.asarray(rows, dtype=np.int64)]) + self.top
+            cols = np.concatenate([old_cols, np.asarray(cols, dtype=np.int64)]) + self.left
+            if rows.size:
+                self.root = self.build_numpy(rows, cols)
+            return
+        cells = set(zip(old_rows, old_cols))
+        cells.update(zip(map(int, rows), map(int, cols)))
+        if not cells:
+            return
+        cells = [(r + self.top, c + self.left) for r, c in cells]
+        level = self.root_level(max(max(abs(r), abs(c)) for r, c in cells))
+        half = 1 << (level - 1)
+        # Узлы текущего уровня: (строка, столбец узла) -> узел
+        nodes = {(r + half, c + half): ALIVE for r, c in cells}
+        for current in range(level):
+            empty = self.empty(current)
+            parents = {}
+            for y, x in nodes:
+                parents.setdefault((y >> 1, x >> 1), None)
+            get = nodes.get
+            nodes = {
+                (y, x): self.join(
+                    get((2 * y, 2 * x), empty), get((2 * y, 2 * x + 1), empty),
+                    get((2 * y + 1, 2 * x), empty), get((2 * y + 1, 2 * x + 1), empty),
+                )
+                for y, x in parents
+            }
+        self.root = nodes[(0, 0)]
+
+    @staticmethod
+    def root_level(reach):
+        """Уровень корня с центром в (0, 0), вмещающего клетки до reach по модулю."""
+        return max(3, (reach + 1).bit_length() + 1)
+
+    def build_numpy(self, rows, cols):
+        """
+        То же построение снизу вверх, но с NumPy: клетки сразу собираются
+        в квадраты 4x4 (уровень 2) в виде 16-битных масок, одинаковые маски
+        превращаются в узел один раз, а дальше на каждом уровне NumPy
+        раскладывает узлы по родителям, и в Python остаются только вызовы join.
+        """
+        level = self.root_level(int(max(np.abs(rows).max(), np.abs(cols).max())))
+        half = 1 << (level - 1)
+        ys, xs = rows + half, cols + half
+        # Квадраты 4x4: номер квадрата и маска его живых клеток (бит 4 * y + x)
+        width = 1 << (level - 2)
+        keys, where = np.unique((ys >> 2) * width + (xs >> 2), return_inverse=True)
+        masks = np.zeros(keys.size, dtype=np.int64)
+        np.bitwise_or.at(masks, where.ravel(), np.left_shift(1, (ys & 3) * 4 + (xs & 3)))
+        blocks = {}
+        for mask in np.unique(masks).tolist():
+            leaf = [ALIVE if mask >> bit & 1 else DEAD for bit in range(16)]
+            quarters = [
+                self.join(leaf[y * 4 + x], leaf[y * 4 + x + 1], leaf[y * 4 + x + 4], leaf[y * 4 + x + 5])
+                for y, x in ((0, 0), (0, 2), (2, 0), (2, 2))
+            ]
+            blocks[mask] = self.join(*quarters)
+        nodes = [blocks[mask] for mask in masks.tolist()]
+        for current in range(2, level):
+            ys, xs = keys // width, keys % width
+            width >>= 1
+            keys, where = np.unique((ys >> 1) * width + (xs >> 1), return_inverse=True)
+            # Четыре ребёнка каждого родителя: a, b, c, d по чётности строки и столбца
+            children = np.full((keys.size, 4), self.empty(current), dtype=object)
+            children[where.ravel(), (ys & 1) * 2 + (xs & 1)] = nodes
+            nodes = [self.join(a, b, c, d) for a, b, c, d in children.tolist()]
+        return nodes[0]
+
+    def live_cells(self):
+        """Координаты всех живых клеток плоскости относительно угла окна."""
+        half = self.half()
+        rows, cols = [], []
+        stack = [(self.root, -half, -half)]
+        while stack:
+            node, y0, x0 = stack.pop()
+            if node.population == 0:
+                continue
+            if node.level == 0:
+                rows.append(y0 - self.top)
+                cols.append(x0 - self.left)
+                continue
+            h = 1 << (node.level - 1)
+            stack.append((node.a, y0, x0))
+            stack.append((node.b, y0, x0 + h))
+            stack.append((node.c, y0 + h, x0))
+            stack.append((node.d, y0 + h, x0 + h))
+        if np is not None:
+            return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)
+        return rows, cols
+
+    def cell_states(self):
+        """Живые клетки всей плоскости относительно угла окна (угасающих у HashLife нет)."""
+        rows, cols = self.live_cells()
+        if np is not None:
+            return rows, cols, np.ones(len(rows), dtype=np.uint8)
+        return rows, cols, [1] * len(rows)
+
+    def save_state(self):
+        """
+        Снимок всей плоскости для контрольной точки — сам корень дерева.
+        Узлы не меняются после создания, поэтому корень и есть неизменная
+        копия поля: сохранить его ничего не стоит, сколько бы клеток ни было
+        живо (координаты в корне отсчитываются от точки (0, 0) плоскости, а не от окна).
+        """
+        return self.root
+
+    def fingerprint(self):
+        """
+        Корень без пустой рамки вокруг живых клеток. Узлы канонические,
+        поэтому у равных плоскостей это один и тот же узел, а у разных —
+        разные, и хэшировать клетки не нужно. После сборки мусора равная
+        плоскость собирается из новых узлов — повтор тогда заметят позже.
+        """
+        node = self.root
+        while node.level > 3 and self.inner(node).population == node.population:
+            node = self.inner(node)
+        return node
+
+    def restore_state(self, state):
+        """Возвращает плоскость к снимку save_state() (корню или, как раньше, координатам клеток)."""
+        if isinstance(state, Node):
+            self.root = self.intern(state)
+            return
+        self.clear()
+        self.set_cells(state[0], state[1])
+
+    def intern(self, node):
+        """
+        Возвращает канонический узел, равный node. Сохранённый корень мог
+        пережить сборку мусора: его узлы тогда выпали из таблицы, и новые
+        join построили бы их копии. Такие узлы возвращаются в таблицу, а
+        если там уже есть равный узел, берётся он. Обход останавливается на
+        узлах, которые таблица уже знает, — у свежей точки это сам корень.
+        """
+        done = {}
+
+        def walk(node):
+            if node.level == 0:
+                return node
+            key = (node.a, node.b, node.c, node.d)
+            if self.table.get(key) is node:
+                return node
+            known = done.get(id(node))
+            if known is None:
+                children = tuple(walk(child) for child in key)
+                known = self.table.get(children)
+                if known is None:
+                    known = node if children == key else Node(node.level, *children, node.population)
+                    self.table[children] = known
+                done[id(node)] = known
+            return known
+
+        return walk(node)
+
+    def load(self, cells):
+        """Загружает окно поля из двумерного списка True/False."""
+        self.clear()
+        live = [(r, c) for r in range(self.rows) for c in range(self.cols) if cells[r][c] == 1]
+        self.set_cells([r for r, _ in live], [c for _, c in live])
+
+    def window(self, top, left, height, width):
+        """
+        Возвращает прямоугольную часть плоскости списком списков True/False.
+        Пустые квадраты дерева пропускаются целиком, поэтому стоимость
+        зависит от числа живых клеток в окне, а не от размера всего поля.
+        """
+        out = [[False] * width for _ in range(height)]
+        half = self.half()
+        # Стек: (узел, строка и столбец его левого верхнего угла)
+        stack = [(self.root, -half, -half)]
+        while stack:
+            node, y0, x0 = stack.pop()
+            size = 1 << node.level
+            if (node.population == 0 or y0 >= top + height or x0 >= left + width
+                    or y0 + size <= top or x0 + size <= left):
+                continue  # узел пуст или не пересекается с окном
+            if node.level == 0:
+                out[y0 - top][x0 - left] = True
+                continue
+            h = size // 2
+            stack.append((node.a, y0, x0))
+            stack.append((node.b, y0, x0 + h))
+            stack.append((node.c, y0 + h, x0))
+            stack.append((node.d, y0 + h, x0 + h))
+        return out
+
+    def region(self, top, left, height, width):
+        """Прямоугольник окна: обходятся только узлы дерева, которые его задевают."""
+        cells = self.window(self.top + top, self.left + left, height, width)
+        return np.array(cells, dtype=np.uint8).reshape(height, width)
+
+    def to_list(self):
+        """Возвращает видимое окно поля (rows x cols) списком списков True/False."""
+        return self.window(self.top, self.left, self.rows, self.cols)
+
+    def population(self):
+        """Количество живых клеток на всей плоскости (не только в окне)."""
+        return self.root.population
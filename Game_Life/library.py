@@ -0,0 +1,55 @@
+# Библиотека известных фигур для штампа в окне игры и для замеров скорости.
+# Фигуры записаны в формате RLE (см. patterns.py), как в файлах LifeWiki.
+
+import io
+
+from patterns import parse_rle
+
+GLIDER = """#N Glider
+x = 3, y = 3, rule = B3/S23
+bob$2bo$3o!
+"""
+LWSS = """#N Lightweight spaceship
+x = 5, y = 4, rule = B3/S23
+bo2bo$o4b$o3bo$4o!
+"""
+R_PENTOMINO = """#N R-pentomino
+x = 3, y = 3, rule = B3/S23
+b2o$2o$bo!
+"""
+ACORN = """#N Acorn
+x = 7, y = 3, rule = B3/S23
+bo$3bo$2o2b3o!
+"""
+DIEHARD = """#N Diehard
+x = 8, y = 3, rule = B3/S23
+6bob$2o6b$bo3b3o!
+"""
+PULSAR = """#N Pulsar
+x = 13, y = 13, rule = B3/S23
+2b3o3b3o2b2$o4bobo4bo$o4bobo4bo$o4bobo4bo$2b3o3b3o2b2$2b3o3b3o2b$o4bobo4bo
+$o4bobo4bo$o4bobo4bo2$2b3o3b3o!
+"""
+GOSPER_GUN = """#N Gosper glider gun
+x = 36, y = 9, rule = B3/S23
+24bo$22bobo$12b2o6b2o12b2o$11bo3bo4b2o12b2o$2o8bo5bo3b2o$2o8bo3bob2o4bo
+bo$10bo5bo7bo$11bo3bo$12b2o!
+"""
+
+# Название для списка в окне -> текст RLE
+LIBRARY = {
+    "Глайдер": GLIDER,
+    "Лёгкий корабль": LWSS,
+    "R-пентамино": R_PENTOMINO,
+    "Желудь": ACORN,
+    "Диехард": DIEHARD,
+    "Пульсар": PULSAR,
+    "Ружьё Госпера": GOSPER_GUN,
+}
+
+
+def library_pattern(name):
+    """Фигура из библиотеки по названию (объект Pattern)."""
+    if name not in LIBRARY:
+        raise ValueError(f"Нет фигуры {name!r} в библиотеке. Есть: {', '.join(LIBRARY)}")
+    return parse_rle(io.StringIO(LIBRARY[name]))
@@ -1,18 +1,74 @@
 # Импортируем необходимые модули:
 
+import argparse
 import tkinter as tk
-import random
+import time
+from contextlib import nullcontext
+from tkinter import filedialog
+
+from editing import line_cells, rectangle_cells, stamp_cells
+from engine_base import BOUNDED, PLANE, TORUS
+from engines import available_engines, default_engine
+from library import LIBRARY, library_pattern
+from patterns import Pattern, read_pattern, write_pattern
+from profiling import RENDER, CountingCanvas, FrameProfiler, ProfileOverlay
+from renderers import IMAGE_THRESHOLD, OUTSIDE_COLOR, RENDERERS, choose_renderer, create_renderer
+from rules import PRESETS, parse_rule
+from simulation import BackgroundRunner, Simulation
+from viewport import VIEW_HEIGHT, VIEW_WIDTH, Viewport
+
+# Частота обновления картинки: кадр примерно каждые 33 мс (30 кадров в секунду).
+# Поколения при этом считаются в отдельном потоке со своей скоростью.
+FRAME_MS = 33
+
+# Названия топологий поля для выпадающего списка
+TOPOLOGY_NAMES = {
+    BOUNDED: "Ограниченное",
+    TORUS: "Тор",
+    PLANE: "Бесконечное",
+}
+
+# Инструменты левой кнопки мыши
+TOOL_BRUSH = "Кисть"        # мазок по клеткам: оживляет или стирает
+TOOL_FILL = "Заливка"       # прямоугольник живых клеток
+TOOL_ERASE = "Очистка"      # прямоугольник мёртвых клеток
+TOOL_STAMP = "Штамп"        # фигура из библиотеки (library.py) левым верхним углом в клетку
+TOOLS = (TOOL_BRUSH, TOOL_FILL, TOOL_ERASE, TOOL_STAMP)
+
+# Рамка выделяемого прямоугольника
+SELECTION_TAG = "selection"
+SELECTION_COLOR = "red"
+
+# Типы файлов в окнах "Открыть" и "Сохранить"
+PATTERN_FILETYPES = [
+    ("RLE", "*.rle *.rle.gz *.rle.bz2 *.rle.xz"),
+    ("Plaintext", "*.cells *.txt"),
+    ("Life 1.06", "*.lif *.life"),
+    ("Все файлы", "*"),
+]
 
 
 class GameOfLife:
     """
-    Класс, описывающий логику и интерфейс игры Жизнь.
+    Класс, описывающий интерфейс игры Жизнь.
+    Сама логика — в классе Simulation (simulation.py), окно только
+    передаёт ему команды кнопок и рисует его состояние.
     """
 
-    def __init__(self, root):
+    def __init__(self, root, engine="auto", rows=30, cols=50, cell_size=15,
+                 renderer="auto", image_threshold=IMAGE_THRESHOLD, profile=False, trace=None,
+                 view_width=VIEW_WIDTH, view_height=VIEW_HEIGHT):
         """
         Конструктор класса: вызывается один раз при создании объекта.
         Размеры, элементы управления, начальное поле.
+        engine — имя движка расчёта поколений ("list", "numpy" или "auto").
+        renderer — способ отрисовки ("canvas", "image" или "auto": картинкой,
+        если видно больше image_threshold клеток или поле уменьшено).
+        view_width, view_height — наибольший размер холста в пикселях: большое
+        поле показывается в нём частями или уменьшенным (колесо мыши — масштаб,
+        перетаскивание правой кнопкой — сдвиг).
+        profile — включить замеры кадров с надписью на холсте (F3 прячет её),
+        trace — файл, куда при закрытии окна сохранить трассу кадров.
         """
         self.root = root  # Сохраняем ссылку на главное окно Tkinter
         self.root.title("Игра Жизнь")  # Заголовок окна
@@ -20,40 +76,113 @@ class GameOfLife:
         # === ПАРАМЕТРЫ ПОЛЯ ===
         # Сколько строк и столбцов будет на нашем игровом поле.
         # Можно изменить эти числа, чтобы сделать поле больше или меньше !.
-        self.rows = 30   # количество строк (по вертикали)
-        self.cols = 50   # количество столбцов (по горизонтали)
-        self.cell_size = 15  # Размер одной клетки в пикселях (ширина и высота)
+        self.rows = rows   # количество строк (по вертикали), по умолчанию 30
+        self.cols = cols   # количество столбцов (по горизонтали), по умолчанию 50
+        self.cell_size = cell_size  # Размер одной клетки в пикселях (ширина и высота)
 
         # === СОСТОЯНИЕ ИГРОВОГО ПОЛЯ ===
-        # Создаём двумерный список (матрицу), где каждая ячейка — это True (живая) или False (мёртвая).
-        # Изначально всё поле мёртвое.
-        self.grid = [[False for _ in range(self.cols)] for _ in range(self.rows)]
+        # Поле, номер поколения и замеры времени хранит ядро симуляции,
+        # которое ничего не знает про окно. Изначально всё поле мёртвое.
+        self.sim = Simulation(self.rows, self.cols, engine)
 
         # Флаг, показывающий, запущена ли симуляция.
         self.running = False
 
-        # Скорость обновления (в миллисекундах между поколениями).
-        # Чем меньше число — тем быстрее идёт игра.
+        # Скорость симуляции (в миллисекундах между поколениями).
+        # Чем меньше число — тем быстрее идёт игра; 0 — так быстро, как получится.
+        # От частоты кадров окна эта скорость не зависит.
         self.speed = 200  # по умолчанию — 200 мс
 
+        # Поколения считаются в отдельном потоке, окно только показывает
+        # самый свежий из посчитанных снимков поля
+        self.runner = BackgroundRunner(self.sim, self.speed)
+
         # === ОСНОВНОЕ ИГРОВОЕ ПОЛЕ ===
-        # Вычисляем общую ширину и высоту холста, чтобы он вмещал все клетки.
-        self.canvas_width = self.cols * self.cell_size
-        self.canvas_height = self.rows * self.cell_size
+        # Холст вмещает все клетки, но не больше view_width x view_height пикселей:
+        # большое поле видно через окно просмотра (см. viewport.py)
+        self.canvas_width = min(self.cols * self.cell_size, view_width)
+        self.canvas_height = min(self.rows * self.cell_size, view_height)
 
         # Создаём холст — область, на которой будем рисовать клетки.
         self.canvas = tk.Canvas(
             root,
             width=self.canvas_width,
             height=self.canvas_height,
-            bg='white'  # фон белый, чтобы мёртвые клетки были незаметны
+            bg=OUTSIDE_COLOR,  # серый фон виден только за краем поля
+            highlightthickness=0  # без рамки: координаты мыши совпадают с пикселями поля
         )
         self.canvas.pack()  # Размещаем холст в окне
 
+        # Какая часть поля видна и в каком масштабе: если поле не помещается
+        # в холст, оно сразу уменьшается так, чтобы было видно целиком
+        self.viewport = Viewport(self.rows, self.cols, self.canvas_width, self.canvas_height, self.cell_size)
+        self.runner.view = self.viewport.view()
+
+        # === ЗАМЕРЫ КАДРОВ ===
+        # Включаются по желанию (см. profiling.py): отрисовщик тогда рисует
+        # через обёртку холста, которая считает вызовы, а в углу холста
+        # показываются процентили времени шага, отрисовки и простоя
+        self.profiler = None
+        self.trace_path = trace
+        render_canvas = self.canvas
+        if profile or trace:
+            self.profiler = FrameProfiler()
+            self.overlay = ProfileOverlay(self.canvas, self.profiler)
+            render_canvas = CountingCanvas(self.canvas, self.profiler)
+            self.root.bind("<F3>", lambda event: self.overlay.toggle())
+            self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+        # Отрисовщик (см. renderers.py): если видно немного клеток — прямоугольники,
+        # которые создаются один раз и дальше только перекрашиваются;
+        # иначе — одна картинка, которая обновляется из байтового буфера.
+        # В режиме "auto" отрисовщик меняется вместе с масштабом
+        self.renderer_name = renderer
+        self.image_threshold = image_threshold
+        self.render_canvas = render_canvas
+        self.renderer = create_renderer(
+            renderer, render_canvas, self.rows, self.cols, self.cell_size, image_threshold, self.viewport
+        )
+        # Последний нарисованный снимок: его перерисовываем при сдвиге во время игры
+        self.last_snapshot = None
+
+        # Время последней отрисовки (в миллисекундах)
+        self.render_ms = 0.0
+
         # === ОБРАБОТКА КЛИКОВ МЫШЬЮ ===
-        # Когда пользователь кликает левой кнопкой мыши по холсту,
-        # вызывается метод on_click.
+        # Левая кнопка правит поле выбранным инструментом: нажатие — on_click,
+        # движение с нажатой кнопкой — on_drag, отпускание — on_release.
         self.canvas.bind("<Button-1>", self.on_click)
+        self.canvas.bind("<B1-Motion>", self.on_drag)
+        self.canvas.bind("<ButtonRelease-1>", self.on_release)
+        # Начало мазка кисти или первый угол прямоугольника (None — кнопка не нажата)
+        self.stroke_from = None
+        self.stroke_alive = True
+        self.selection_to = None
+        # Запланированное наложение правок на паузе (id из root.after)
+        self.edit_job = None
+
+        # === МАСШТАБ И СДВИГ МЫШЬЮ ===
+        # Колесо мыши меняет масштаб вокруг курсора (в Linux колесо — кнопки 4 и 5),
+        # перетаскивание правой или средней кнопкой двигает поле, Home — всё поле целиком
+        self.canvas.bind("<MouseWheel>", lambda event: self.zoom(1 if event.delta > 0 else -1, event))
+        self.canvas.bind("<Button-4>", lambda event: self.zoom(1, event))
+        self.canvas.bind("<Button-5>", lambda event: self.zoom(-1, event))
+        for button in (2, 3):
+            self.canvas.bind(f"<ButtonPress-{button}>", self.start_drag)
+            self.canvas.bind(f"<B{button}-Motion>", self.drag)
+        self.root.bind("<plus>", lambda event: self.zoom(1))
+        self.root.bind("<equal>", lambda event: self.zoom(1))
+        self.root.bind("<minus>", lambda event: self.zoom(-1))
+        self.root.bind("<Home>", lambda event: self.fit_view())
+        # Где была мышь при прошлом движении во время перетаскивания
+        self.drag_from = None
+
+        # === ПРОКРУТКА ПОЛЯ СТРЕЛКАМИ ===
+        # На бесконечной плоскости окно можно двигать стрелками клавиатуры
+        self.root.bind("<Left>", lambda event: self.pan(0, -1))
+        self.root.bind("<Right>", lambda event: self.pan(0, 1))
+        self.root.bind("<Up>", lambda event: self.pan(-1, 0))
+        self.root.bind("<Down>", lambda event: self.pan(1, 0))
 
         # === ПАНЕЛЬ УПРАВЛЕНИЯ ===
         # Создаём отдельный фрейм (контейнер) под кнопки, чтобы они не мешали полю.
@@ -84,6 +213,20 @@ class GameOfLife:
         )
         self.clear_button.pack(side=tk.LEFT, padx=5)
 
+        # --- Кнопки "Открыть" и "Сохранить" (фигура в файле RLE, plaintext или Life 1.06) ---
+        self.open_button = tk.Button(
+            control_frame,
+            text="Открыть…",
+            command=self.open_pattern
+        )
+        self.open_button.pack(side=tk.LEFT, padx=5)
+        self.save_button = tk.Button(
+            control_frame,
+            text="Сохранить…",
+            command=self.save_pattern
+        )
+        self.save_button.pack(side=tk.LEFT, padx=5)
+
         # --- Поле для ввода количества случайных клеток ---
         tk.Label(control_frame, text="Случайные клетки:").pack(side=tk.LEFT, padx=(20, 5))
         # Переменная для хранения значения из спинбокса (числового поля)
@@ -97,6 +240,12 @@ class GameOfLife:
         )
         self.random_spinbox.pack(side=tk.LEFT, padx=5)
 
+        # --- Зерно случайного поля: пусто — каждый раз новое поле ---
+        tk.Label(control_frame, text="Зерно:").pack(side=tk.LEFT, padx=(10, 5))
+        self.random_seed = tk.StringVar(value="")
+        self.seed_entry = tk.Entry(control_frame, width=10, textvariable=self.random_seed)
+        self.seed_entry.pack(side=tk.LEFT, padx=5)
+
         # --- Кнопка Случайно — заполняет поле случайными живыми клетками ---
         self.random_button = tk.Button(
             control_frame,
@@ -109,7 +258,7 @@ class GameOfLife:
         tk.Label(control_frame, text="Скорость (мс):").pack(side=tk.LEFT, padx=(20, 5))
         self.speed_slider = tk.Scale(
             control_frame,
-            from_=50,     # самая высокая скорость — 50 мс
+            from_=0,      # самая высокая скорость — без пауз между поколениями
             to=1000,      # самая низкая — 1000 мс
             orient=tk.HORIZONTAL,  # горизонтальный ползунок
             length=200,   # длина в пикселях
@@ -119,173 +268,537 @@ class GameOfLife:
         self.speed_slider.set(self.speed)  # устанавливаем начальное значение
         self.speed_slider.pack(side=tk.LEFT, padx=5)
 
+        # --- Выбор движка расчёта поколений ---
+        tk.Label(control_frame, text="Движок:").pack(side=tk.LEFT, padx=(20, 5))
+        self.engine_name = tk.StringVar(value=self.sim.engine.name)
+        self.engine_menu = tk.OptionMenu(
+            control_frame,
+            self.engine_name,
+            *available_engines(),
+            command=self.change_engine  # вызывается при выборе другого движка
+        )
+        self.engine_menu.pack(side=tk.LEFT, padx=5)
+
+        # --- Выбор топологии: что находится за краем поля ---
+        tk.Label(control_frame, text="Поле:").pack(side=tk.LEFT, padx=(20, 5))
+        self.topology_name = tk.StringVar(value=TOPOLOGY_NAMES[self.sim.engine.topology])
+        self.topology_menu = tk.OptionMenu(
+            control_frame,
+            self.topology_name,
+            *TOPOLOGY_NAMES.values(),
+            command=self.change_topology
+        )
+        self.topology_menu.pack(side=tk.LEFT, padx=5)
+
+        # --- Переход сразу к поколению N ---
+        # Движок hashlife прыгает на миллионы поколений за один вызов,
+        # остальные движки просто делают нужное число шагов.
+        # Назад поле переводится через контрольные точки истории (timeline.py).
+        jump_frame = tk.Frame(root)
+        jump_frame.pack(pady=(0, 5))
+        tk.Label(jump_frame, text="Перейти к поколению:").pack(side=tk.LEFT, padx=5)
+        self.target_generation = tk.StringVar(value="1000")
+        self.target_entry = tk.Entry(jump_frame, width=12, textvariable=self.target_generation)
+        self.target_entry.pack(side=tk.LEFT, padx=5)
+        self.jump_button = tk.Button(
+            jump_frame,
+            text="Перейти",
+            command=self.go_to_generation
+        )
+        self.jump_button.pack(side=tk.LEFT, padx=5)
+        # Шаг назад: поле восстанавливается из ближайшей контрольной точки истории
+        self.back_button = tk.Button(
+            jump_frame,
+            text="◀ Назад",
+            command=self.step_back
+        )
+        self.back_button.pack(side=tk.LEFT, padx=5)
+
+        # --- Остановка при зацикливании ---
+        # Когда поле застыло или стало повторяться, считать дальше незачем
+        self.stop_on_cycle = tk.BooleanVar(value=False)
+        self.cycle_check = tk.Checkbutton(
+            jump_frame,
+            text="Стоп при зацикливании",
+            variable=self.stop_on_cycle,
+            command=self.update_stop_on_cycle
+        )
+        self.cycle_check.pack(side=tk.LEFT, padx=(20, 5))
+
+        # --- Правила игры ---
+        # Строка правила (B3/S23, B2/S/C3, R5,C0,M1,S34..58,B34..45,NM) или готовое из списка
+        tk.Label(jump_frame, text="Правила:").pack(side=tk.LEFT, padx=(20, 5))
+        self.rule_text = tk.StringVar(value=str(self.sim.engine.rule))
+        self.rule_entry = tk.Entry(jump_frame, width=28, textvariable=self.rule_text)
+        self.rule_entry.pack(side=tk.LEFT, padx=5)
+        self.rule_entry.bind("<Return>", lambda event: self.change_rule())
+        self.rule_button = tk.Button(
+            jump_frame,
+            text="Применить",
+            command=self.change_rule
+        )
+        self.rule_button.pack(side=tk.LEFT, padx=5)
+        self.preset_name = tk.StringVar(value="Готовые")
+        self.preset_menu = tk.OptionMenu(
+            jump_frame,
+            self.preset_name,
+            *PRESETS,
+            command=self.choose_preset
+        )
+        self.preset_menu.pack(side=tk.LEFT, padx=5)
+
+        # --- Инструмент для левой кнопки мыши и фигура для штампа ---
+        tool_frame = tk.Frame(root)
+        tool_frame.pack(pady=(0, 5))
+        tk.Label(tool_frame, text="Инструмент:").pack(side=tk.LEFT, padx=5)
+        self.tool = tk.StringVar(value=TOOL_BRUSH)
+        self.tool_menu = tk.OptionMenu(tool_frame, self.tool, *TOOLS)
+        self.tool_menu.pack(side=tk.LEFT, padx=5)
+        tk.Label(tool_frame, text="Штамп:").pack(side=tk.LEFT, padx=(20, 5))
+        self.stamp_name = tk.StringVar(value=next(iter(LIBRARY)))
+        self.stamp_menu = tk.OptionMenu(tool_frame, self.stamp_name, *LIBRARY)
+        self.stamp_menu.pack(side=tk.LEFT, padx=5)
+
+        # === СТРОКА СОСТОЯНИЯ ===
+        # Номер поколения и сколько клеток движок проверил на последнем шаге
+        self.status_label = tk.Label(root, anchor=tk.W)
+        self.status_label.pack(fill=tk.X, padx=10, pady=(0, 5))
+
         # === ПЕРВОНАЧАЛЬНАЯ ОТРИСОВКА ПОЛЯ ===
         # Рисуем пустое поле (все клетки мёртвые)
         self.draw_grid()
+        self.update_status()
 
     def on_click(self, event):
         """
-        Обрабатывает клик мышью по холсту.
-        Если симуляция НЕ запущена — переключает состояние клетки под курсором.
+        Обрабатывает нажатие левой кнопки мыши на холсте — начало правки
+        выбранным инструментом. Править поле можно и во время игры:
+        правки копятся в очереди и накладываются на поле сразу после шага.
         """
-        if self.running:
-            return  # нельзя редактировать поле во время игры
-
-        # Определяем, в какую клетку попал клик:
-        # делим координаты клика на размер клетки - получаем номер строки и столбца
-        col = event.x // self.cell_size
-        row = event.y // self.cell_size
-
-        # Проверяем, что клик был внутри поля (а не за его пределами)
-        if 0 <= row < self.rows and 0 <= col < self.cols:
-            # Меняем состояние клетки: если была жива — умирает, и наоборот
-            self.grid[row][col] = not self.grid[row][col]
-            # Перерисовываем только эту одну клетку (эффективнее, чем всё поле)
-            self.draw_cell(row, col)
-
-    def draw_cell(self, row, col):
+        # Определяем, в какую клетку попал клик: окно просмотра переводит
+        # пиксель холста в строку и столбец с учётом масштаба и сдвига
+        cell = self.viewport.cell_at(event.x, event.y)
+
+        # Клик за пределами поля ничего не делает
+        if cell is None:
+            return
+        row, col = cell
+        tool = self.tool.get()
+        if tool == TOOL_BRUSH:
+            # Кисть рисует тем цветом, которого не было у первой клетки мазка:
+            # по мёртвой клетке — живыми, по живой — стирает
+            self.stroke_alive = not self.sim.engine.get(row, col)
+            self.stroke_from = cell
+            self.queue_edit([row], [col], self.stroke_alive)
+        elif tool == TOOL_STAMP:
+            pattern = library_pattern(self.stamp_name.get())
+            self.queue_edit(*stamp_cells(pattern, row, col, *self.sim.edit_limits()), True)
+        else:
+            # Заливка и очистка: запоминаем первый угол, рамка тянется за мышью
+            self.stroke_from = cell
+            self.draw_selection(cell)
+
+    def on_drag(self, event):
+        """Движение мыши с нажатой левой кнопкой: мазок кисти или рамка прямоугольника."""
+        if self.stroke_from is None:
+            return
+        # Мышь могла уйти за край поля — тогда берём ближайшую клетку на краю
+        row, col = self.viewport.nearest_cell(event.x, event.y)
+        if self.tool.get() == TOOL_BRUSH:
+            if (row, col) != self.stroke_from:
+                # Все клетки между прошлым и нынешним положением мыши — без пропусков
+                self.queue_edit(*line_cells(*self.stroke_from, row, col), self.stroke_alive)
+                self.stroke_from = (row, col)
+        elif self.tool.get() in (TOOL_FILL, TOOL_ERASE):
+            self.draw_selection((row, col))
+
+    def on_release(self, event):
+        """Кнопка отпущена: прямоугольник заливается или очищается, мазок кисти заканчивается."""
+        if self.stroke_from is not None and self.tool.get() in (TOOL_FILL, TOOL_ERASE):
+            self.canvas.delete(SELECTION_TAG)
+            (top, left), (bottom, right) = self.stroke_from, self.selection_to
+            cells = rectangle_cells(top, left, bottom, right, self.rows, self.cols)
+            self.queue_edit(*cells, self.tool.get() == TOOL_FILL)
+        self.stroke_from = None
+
+    def draw_selection(self, corner):
+        """Рисует рамку прямоугольника от первого угла до клетки corner."""
+        self.selection_to = corner
+        (top, left), (bottom, right) = self.stroke_from, corner
+        top, bottom = min(top, bottom), max(top, bottom) + 1
+        left, right = min(left, right), max(left, right) + 1
+        x0, y0 = self.viewport.position(top, left)
+        x1, y1 = self.viewport.position(bottom, right)
+        self.canvas.delete(SELECTION_TAG)
+        self.canvas.create_rectangle(x0, y0, x1, y1, outline=SELECTION_COLOR, width=2, tags=SELECTION_TAG)
+
+    def queue_edit(self, rows, cols, alive):
         """
-        Рисует одну клетку на холсте по заданным координатам (row, col).
+        Ставит правку в очередь ядра. На паузе очередь разбирается раз в кадр:
+        сколько бы клеток ни закрасила мышь за кадр, поле меняется одной
+        пачкой и перерисовывается один раз. Во время игры правки забирает
+        поток симуляции после ближайшего шага.
         """
-        # Вычисляем координаты прямоугольника в пикселях
-        x1 = col * self.cell_size
-        y1 = row * self.cell_size
-        x2 = x1 + self.cell_size
-        y2 = y1 + self.cell_size
+        self.sim.edits.add(rows, cols, alive)
+        if not self.running and self.edit_job is None:
+            self.edit_job = self.root.after(FRAME_MS, self.flush_edits)
 
-        # Выбираем цвет: чёрный, если клетка жива; белый — если мертва
-        color = 'black' if self.grid[row][col] else 'white'
-
-        # Рисуем прямоугольник (клетку) на холсте
-        self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline='lightgray')
+    def flush_edits(self):
+        """Накладывает накопленные правки на поле и перерисовывает его (на паузе)."""
+        self.edit_job = None
+        if self.running:
+            return  # игру запустили: правки заберёт поток симуляции
+        if self.sim.apply_edits():
+            self.draw_grid()
+            self.update_status()
 
     def draw_grid(self):
         """
-        Перерисовывает все поле целиком.
+        Перерисовывает поле: отрисовщик перекрашивает только клетки,
+        изменившиеся с прошлого кадра. Время отрисовки запоминается.
         """
-        self.canvas.delete("all")  # Сначала удаляем всё, что было на холсте
-        # Проходим по каждой клетке и рисуем её
-        for row in range(self.rows):
-            for col in range(self.cols):
-                self.draw_cell(row, col)
+        started = time.perf_counter()
+        self.renderer.render(self.sim.engine)
+        self.render_ms = (time.perf_counter() - started) * 1000
 
-
-
-    def count_neighbors(self, row, col):
+    def next_generation(self):
         """
-        Считает, сколько живых соседей у клетки с координатами (row, col).
+        Просит ядро вычислить следующее поколение и перерисовывает поле.
         """
-        count = 0
-        # Проверяем все 8 соседних позиций: смещения -1, 0, +1 по строкам и столбцам
-        for dr in [-1, 0, 1]:
-            for dc in [-1, 0, 1]:
-                if dr == 0 and dc == 0:
-                    continue  # пропускаем саму клетку (центр)
-                # Вычисляем координаты соседа
-                r, c = row + dr, col + dc
-                # Проверяем, что сосед находится внутри поля
-                if 0 <= r < self.rows and 0 <= c < self.cols:
-                    if self.grid[r][c]:  # если сосед жив — увеличиваем счётчик
-                        count += 1
-        return count
+        self.sim.step()
+        # Обновляем изображение на экране
+        self.draw_grid()
+        self.update_status()
 
-    def next_generation(self):
+    def step_back(self):
+        """Возвращает поле на одно поколение назад."""
+        if self.sim.generation > 0:
+            self.target_generation.set(str(self.sim.generation - 1))
+            self.go_to_generation()
+
+    def go_to_generation(self):
         """
-        Создаёт новое поле, применяет правила ко всем клеткам,
-        затем заменяет старое поле на новое и перерисовывает.
+        Переводит поле сразу к поколению, введённому в поле "Перейти к поколению",
+        — вперёд или назад (назад — через контрольные точки истории, см. timeline.py).
+        Промежуточные поколения не рисуются — только итоговое.
         """
-        # Создаём новое пустое поле (все клетки мёртвые)
-        new_grid = [[False for _ in range(self.cols)] for _ in range(self.rows)]
-
-        # Проходим по каждой клетке
-        for row in range(self.rows):
-            for col in range(self.cols):
-                neighbors = self.count_neighbors(row, col)
-                is_alive = self.grid[row][col]
-
-                if is_alive:
-                    # Живая клетка выживает, только если у неё 2 или 3 соседа
-                    if neighbors == 2 or neighbors == 3:
-                        new_grid[row][col] = True
-                    # Иначе — умирает (остаётся False)
-                else:
-                    # Мёртвая клетка оживает, только если ровно 3 живых соседа
-                    if neighbors == 3:
-                        new_grid[row][col] = True
-
-        # Заменяем старое поле на новое
-        self.grid = new_grid
-        # Обновляем изображение на экране
+        try:
+            target = int(self.target_generation.get())
+        except ValueError:
+            return  # ввели не число — ничего не делаем
+        if target == self.sim.generation:
+            return
+        self.stop()
+        try:
+            self.sim.seek(target)
+        except ValueError as error:
+            # Поколение уже вытеснено из истории (или отрицательное)
+            self.status_label.config(text=str(error))
+            return
         self.draw_grid()
+        self.update_status()
 
     def run_simulation(self):
         """
-        Главный цикл симуляции.
-        Если симуляция запущена — вычисляет следующее поколение,
-        затем планирует вызов самого себя через self.speed миллисекунд.
+        Главный цикл отображения.
+        Пока симуляция запущена — забирает у фонового потока самый свежий
+        снимок поля, рисует его и планирует следующий кадр через FRAME_MS.
+        Если поток успел посчитать несколько поколений, промежуточные
+        не рисуются (пропуск кадров); если ни одного — кадр пропускается.
         """
-        if self.running:
-            self.next_generation()
-            # Через self.speed миллисекунд снова вызвать этот же метод
-            self.root.after(self.speed, self.run_simulation)
-
+        if not self.running:
+            return
+        if not self.runner.running:
+            # Поток остановился сам (поле зациклилось) — останавливаем и окно
+            self.stop()
+            return
+        if self.profiler is not None:
+            self.profiler.begin_frame()
+        snapshot = self.runner.latest()
+        if snapshot is not None:
+            self.last_snapshot = snapshot
+            with self.profile_phase(RENDER):
+                started = time.perf_counter()
+                self.renderer.render(snapshot)
+                self.render_ms = (time.perf_counter() - started) * 1000
+                self.update_status()
+            if self.profiler is not None:
+                # Шаг считается в фоновом потоке: берём его время из снимка
+                self.profiler.record("step", snapshot.step_ms)
+        if self.profiler is not None:
+            self.profiler.end_frame()
+            self.overlay.update()
+        # Через FRAME_MS миллисекунд снова вызвать этот же метод
+        self.root.after(FRAME_MS, self.run_simulation)
+
+    def profile_phase(self, name):
+        """Таймер фазы кадра для with, если замеры включены (иначе ничего не делает)."""
+        return self.profiler.phase(name) if self.profiler is not None else nullcontext()
+
+    def close(self):
+        """Закрытие окна при включённых замерах: сохраняет трассу кадров."""
+        self.stop()
+        if self.trace_path:
+            self.profiler.dump(self.trace_path)
+        self.root.destroy()
 
     def start(self):
         """Запускает симуляцию, если она ещё не запущена."""
         if not self.running:
             self.running = True
-            self.run_simulation()  # запускаем цикл
+            self.last_snapshot = None  # снимки прошлого запуска уже неактуальны
+            self.runner.start()  # поколения считает фоновый поток
+            self.run_simulation()  # запускаем цикл отображения
 
     def stop(self):
-        """Останавливает симуляцию."""
+        """Останавливает симуляцию и показывает последнее посчитанное поколение."""
+        if not self.running:
+            return
         self.running = False
+        self.runner.stop()  # ждём, пока поток закончит текущий шаг
+        # Правки, сделанные после последнего шага, накладываем сейчас
+        self.sim.apply_edits()
+        self.draw_grid()
+        self.update_status()
 
     def clear(self):
         """Очищает всё поле: все клетки становятся мёртвыми."""
         self.stop()  # на всякий случай останавливаем симуляцию
-        # Создаём новое пустое поле
-        self.grid = [[False for _ in range(self.cols)] for _ in range(self.rows)]
+        # Делаем все клетки мёртвыми
+        self.sim.clear()
         self.draw_grid()  # перерисовываем
+        self.update_status()
+
+    def open_pattern(self):
+        """
+        Загружает фигуру из файла (RLE, plaintext или Life 1.06, можно сжатый)
+        в центр пустого поля. Если в файле указано правило, поле переходит на него.
+        """
+        self.stop()
+        path = filedialog.askopenfilename(title="Открыть фигуру", filetypes=PATTERN_FILETYPES)
+        if not path:
+            return
+        try:
+            self.sim.load_pattern(read_pattern(path))
+        except (OSError, ValueError) as error:
+            self.status_label.config(text=f"Не удалось открыть {path}: {error}")
+            return
+        self.rule_text.set(str(self.sim.engine.rule))
+        self.engine_name.set(self.sim.engine.name)
+        self.draw_grid()
+        self.update_status()
+
+    def save_pattern(self):
+        """Сохраняет живые клетки поля в файл; формат выбирается по расширению."""
+        self.stop()
+        path = filedialog.asksaveasfilename(
+            title="Сохранить фигуру", defaultextension=".rle", filetypes=PATTERN_FILETYPES
+        )
+        if not path:
+            return
+        try:
+            write_pattern(path, Pattern.from_engine(self.sim.engine))
+        except (OSError, ValueError) as error:
+            self.status_label.config(text=f"Не удалось сохранить {path}: {error}")
 
     def randomize(self):
         """
         Заполняет поле случайным количеством живых клеток.
-        Количество берётся из спинбокса (random_count).
+        Количество берётся из спинбокса (random_count), зерно — из поля "Зерно":
+        с одним зерном получается одно и то же поле. Если зерно не задано,
+        оно выбирается случайно и показывается в строке состояния.
         """
         self.stop()  # сначала останавливаем симуляцию
 
         count = self.random_count.get()  # сколько клеток оживить?
-        total = self.rows * self.cols
-
-        # Защита от глупостей: нельзя выбрать больше клеток, чем есть на поле
-        if count > total:
-            count = total
-
-        # Генерируем список всех возможных координат (row, col)
-        all_positions = [(r, c) for r in range(self.rows) for c in range(self.cols)]
-        # Случайно выбираем `count` уникальных позиций без повторений
-        positions = random.sample(all_positions, count)
-
-        # Обнуляем всё поле
-        self.grid = [[False for _ in range(self.cols)] for _ in range(self.rows)]
-
-        # Оживляем выбранные клетки
-        for r, c in positions:
-            self.grid[r][c] = True
+        seed_text = self.random_seed.get().strip()
+        if seed_text and not seed_text.isdigit():
+            self.status_label.config(text=f"Зерно должно быть целым неотрицательным числом, а не {seed_text!r}")
+            return
+        self.sim.randomize(count, seed=int(seed_text) if seed_text else None)
 
         # Перерисовываем всё поле
         self.draw_grid()
+        self.update_status()
 
     def update_speed(self, value):
         """
         Вызывается при движении ползунка скорости.
-        Обновляет внутреннюю переменную self.speed.
+        Обновляет внутреннюю переменную self.speed и скорость фонового потока.
         Значение приходит как строка, поэтому преобразуем в int.
         """
         self.speed = int(value)
+        self.runner.interval_ms = self.speed
+
+    def update_stop_on_cycle(self):
+        """Вызывается при нажатии на флажок "Стоп при зацикливании"."""
+        self.runner.stop_on_cycle = self.stop_on_cycle.get()
+
+    def update_status(self):
+        """Обновляет строку состояния под панелью управления."""
+        self.status_label.config(
+            text=f"Поколение: {self.sim.generation}    "
+                 f"Правила: {self.sim.engine.rule}    "
+                 f"Проверено клеток за шаг: {self.sim.engine.last_evaluated}    "
+                 f"Шаг: {self.sim.step_ms:.1f} мс    "
+                 f"Отрисовка: {self.render_ms:.1f} мс "
+                 f"({self.renderer.last_updated} клеток)    "
+                 f"Пропущено кадров: {self.runner.dropped}    "
+                 f"Масштаб: {self.viewport.describe()}"
+                 + (f"    Цикл: {self.sim.cycle.describe()}" if self.sim.cycle else "")
+                 + (f"    Зерно: {self.sim.seed}" if self.sim.seed is not None else "")
+                 + self.history_status()
+                 + (f"    Окно: строка {self.sim.engine.top}, столбец {self.sim.engine.left}"
+                    if self.sim.engine.can_pan else "")
+        )
+
+    def history_status(self):
+        """Часть строки состояния про историю: сколько точек, памяти и время перемотки."""
+        if self.sim.timeline is None:
+            return ""
+        stats = self.sim.timeline.stats()
+        return (
+            f"    История: {stats['checkpoints']} точек с поколения {stats['oldest_generation']}, "
+            f"{stats['bytes'] / 1024:.0f} КБ ({stats['bytes_per_generation']:.0f} Б/поколение), "
+            f"перемотка {self.sim.seek_ms:.1f} мс"
+        )
+
+    def change_engine(self, name):
+        """
+        Вызывается при выборе движка в выпадающем списке.
+        Создаёт новый движок и переносит в него текущее поле.
+        """
+        self.stop()  # фоновый поток не должен считать на старом движке
+        try:
+            self.sim.change_engine(name)
+        except ValueError as error:
+            # Движок не умеет текущие правила — остаёмся на прежнем
+            self.engine_name.set(self.sim.engine.name)
+            self.status_label.config(text=str(error))
+            return
+        # Движок мог не поддерживать прежнюю топологию — показываем текущую
+        self.topology_name.set(TOPOLOGY_NAMES[self.sim.engine.topology])
+        self.draw_grid()
+        self.update_status()
+
+    def change_topology(self, label):
+        """
+        Вызывается при выборе топологии в выпадающем списке.
+        Если текущий движок её не поддерживает, выбирается подходящий.
+        """
+        topology = next(key for key, name in TOPOLOGY_NAMES.items() if name == label)
+        self.stop()
+        rule = self.sim.engine.rule
+        name = self.sim.engine.name
+        try:
+            if name not in available_engines(topology, rule):
+                name = default_engine(topology, rule)
+            self.sim.change_engine(name, topology)
+        except ValueError as error:
+            # Для таких правил на этом поле нет движка (например, B0 на бесконечной плоскости)
+            self.topology_name.set(TOPOLOGY_NAMES[self.sim.engine.topology])
+            self.status_label.config(text=str(error))
+            return
+        self.engine_name.set(self.sim.engine.name)
+        self.draw_grid()
+        self.update_status()
+
+    def change_rule(self):
+        """
+        Вызывается кнопкой "Применить" (или Enter в поле правил).
+        Разбирает строку правила и переключает на него поле; если текущий
+        движок это правило не умеет, выбирается подходящий.
+        """
+        self.stop()
+        try:
+            self.sim.change_rule(parse_rule(self.rule_text.get()))
+        except ValueError as error:
+            # Опечатка в правиле — показываем ошибку, поле не трогаем
+            self.status_label.config(text=f"Ошибка в правилах: {error}")
+            return
+        self.rule_text.set(str(self.sim.engine.rule))
+        self.engine_name.set(self.sim.engine.name)
+        self.draw_grid()
+        self.update_status()
+
+    def choose_preset(self, name):
+        """Вызывается при выборе готового правила из списка."""
+        self.rule_text.set(PRESETS[name])
+        self.preset_name.set("Готовые")
+        self.change_rule()
+
+    def zoom(self, steps, event=None):
+        """Меняет масштаб на steps ступеней вокруг курсора мыши (или центра холста)."""
+        x, y = (event.x, event.y) if event is not None else (None, None)
+        if self.viewport.zoom(steps, x, y):
+            self.view_changed()
+
+    def fit_view(self):
+        """Уменьшает поле так, чтобы оно было видно целиком."""
+        self.viewport.fit()
+        self.view_changed()
+
+    def start_drag(self, event):
+        """Нажатие правой или средней кнопки: начало перетаскивания поля."""
+        self.drag_from = (event.x, event.y)
+
+    def drag(self, event):
+        """Перетаскивание: поле едет за мышью."""
+        if self.drag_from is None:
+            return
+        dx, dy = event.x - self.drag_from[0], event.y - self.drag_from[1]
+        self.drag_from = (event.x, event.y)
+        if dx or dy:
+            self.viewport.pan(dx, dy)
+            self.view_changed()
+
+    def view_changed(self):
+        """
+        После сдвига или смены масштаба: фоновый поток начинает снимать новую
+        видимую часть, в режиме "auto" при необходимости меняется отрисовщик,
+        и кадр перерисовывается — на паузе по движку, во время игры по последнему снимку.
+        """
+        self.runner.view = self.viewport.view()
+        if self.renderer_name in (None, "auto"):
+            name = choose_renderer(self.viewport, self.rows, self.cols, self.image_threshold)
+            if name != self.renderer.name:
+                self.renderer = create_renderer(
+                    name, self.render_canvas, self.rows, self.cols, self.cell_size,
+                    self.image_threshold, self.viewport
+                )
+        if not self.running:
+            self.draw_grid()
+        elif self.last_snapshot is not None:
+            self.renderer.render(self.last_snapshot)
+        self.update_status()
+
+    def pan(self, rows, cols):
+        """
+        Сдвигает окно по бесконечной плоскости на десятую часть его размера
+        в направлении (rows, cols). На ограниченном поле и торе ничего не делает.
+        """
+        if not self.sim.engine.can_pan:
+            return
+        self.sim.pan(rows * max(1, self.rows // 10), cols * max(1, self.cols // 10))
+        if not self.running:
+            self.draw_grid()
+            self.update_status()
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Игра Жизнь")
+    parser.add_argument("--rows", type=int, default=30, help="число строк поля (по умолчанию 30)")
+    parser.add_argument("--cols", type=int, default=50, help="число столбцов поля (по умолчанию 50)")
+    parser.add_argument("--renderer", default="auto", choices=["auto", *RENDERERS],
+                        help="отрисовка: прямоугольники холста (canvas), картинка (image) "
+                             f"или auto — картинкой, если видно больше {IMAGE_THRESHOLD} клеток")
+    parser.add_argument("--profile", action="store_true",
+                        help="показывать на холсте замеры кадров: шаг, отрисовка, простой, вызовы холста")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="при закрытии окна сохранить трассу кадров (формат chrome://tracing, Perfetto)")
+    args = parser.parse_args()
     root = tk.Tk()  # создаём главное окно
-    app = GameOfLife(root)  # создаём объект игры, передавая ему окно
+    # создаём объект игры, передавая ему окно
+    app = GameOfLife(root, rows=args.rows, cols=args.cols, renderer=args.renderer,
+                     profile=args.profile, trace=args.trace)
     root.mainloop()  # запускаем цикл обработки событий (ожидание кликов, нажатий и т.д.)
@@ -0,0 +1,268 @@
+# Параллельный движок игры Жизнь: поле делится на горизонтальные полосы,
+# каждую полосу считает свой процесс-работник.
+#
+# Поле хранится в двух буферах общей памяти (multiprocessing.shared_memory)
+# в том же упакованном виде, что и у битового движка: 64 клетки в слове uint64.
+# На каждом поколении работник читает свою полосу из текущего буфера
+# вместе с соседними строками сверху и снизу (обмен "ореолом" в одну клетку
+# идёт прямо через общую память) и пишет результат в другой буфер.
+# Затем все работники встречаются на барьере, и буферы меняются ролями.
+# Так на одно поколение приходится одна встреча на барьере — без пересылки
+# самого поля между процессами.
+#
+# Запуск этого файла измеряет ускорение на 1, 2, 4, 8 и N процессах:
+#
+#     python parallel.py --size 4096 --generations 50
+
+import argparse
+import multiprocessing as mp
+import os
+import time
+from multiprocessing import shared_memory
+from queue import Empty
+from threading import BrokenBarrierError
+
+from bitpacked import WORD_BITS, BitPackedEngine, packed_next_generation
+from engine_base import BOUNDED, TORUS, np
+
+# Как часто (в секундах) проверять, живы ли работники, пока ждём конца задания
+WORKER_POLL_SECONDS = 1.0
+
+
+def strip_worker(names, shape, top, bottom, tail_mask, wrap_cols, rule, commands, barrier, done):
+    """
+    Цикл процесса-работника: считает строки top..bottom-1 поля по правилу rule.
+    wrap_cols — ширина поля, если поле — тор (иначе None).
+    Из очереди commands приходят задания (число поколений, номер текущего буфера),
+    None означает "завершить работу". О выполнении задания работник
+    сообщает в очередь done.
+    """
+    memories = [shared_memory.SharedMemory(name=name) for name in names]
+    buffers = [np.ndarray(shape, dtype=np.uint64, buffer=memory.buf) for memory in memories]
+    rows = shape[0]
+    if wrap_cols is not None:
+        # На торе у каждой полосы есть ореол: строки выше первой и ниже последней
+        # берутся с противоположного края поля
+        halo_rows = [(top - 1) % rows, *range(top, bottom), bottom % rows]
+    else:
+        # Полоса вместе с ореолом: одна строка сверху и одна снизу (если они есть)
+        halo_top, halo_bottom = max(top - 1, 0), min(bottom + 1, rows)
+    try:
+        while True:
+            command = commands.get()
+            if command is None:
+                break
+            generations, current = command
+            for _ in range(generations):
+                if wrap_cols is not None:
+                    block = buffers[current][halo_rows]
+                    new_block = packed_next_generation(block, tail_mask, wrap_cols, rule)[1:-1]
+                else:
+                    block = buffers[current][halo_top:halo_bottom]
+                    # Строки ореола посчитаны неверно (их соседей мы не видим) — отбрасываем
+                    new_block = packed_next_generation(block, tail_mask, rule=rule)[top - halo_top:bottom - halo_top]
+                buffers[1 - current][top:bottom] = new_block
+                # Ждём остальных: следующее поколение можно читать, только когда
+                # все полосы текущего дописаны
+                barrier.wait()
+                current = 1 - current
+            done.put(top)
+    except BrokenBarrierError:
+        pass  # главный процесс сломал барьер: другой работник упал, движок остановлен
+    finally:
+        del buffers
+        for memory in memories:
+            memory.close()
+
+
+class ParallelEngine(BitPackedEngine):
+    """
+    Битовый движок, который считает поколение сразу в нескольких процессах.
+    Результат совпадает с движком bitpacked бит в бит: полосы считаются той же
+    функцией packed_next_generation. workers — число процессов
+    (по умолчанию — число ядер процессора).
+    Процессы запускаются при первом шаге; close() останавливает их и освобождает память.
+    """
+
+    name = "parallel"
+
+    def __init__(self, rows, cols, topology=BOUNDED, rule=None, workers=None):
+        if np is None:
+            raise RuntimeError("Для движка 'parallel' нужна библиотека NumPy (pip install numpy)")
+        self.workers = max(1, min(workers or os.cpu_count() or 1, rows))
+        words = (cols + WORD_BITS - 1) // WORD_BITS
+        self.shape = (rows, words)
+        size = max(1, rows * words * 8)
+        # Два буфера: из одного читаем текущее поколение, в другой пишем следующее
+        self.memories = [shared_memory.SharedMemory(create=True, size=size) for _ in range(2)]
+        self.buffers = [np.ndarray(self.shape, dtype=np.uint64, buffer=m.buf) for m in self.memories]
+        self.current = 0
+        self.processes = []
+        super().__init__(rows, cols, topology, rule)
+
+    @property
+    def board(self):
+        """Текущее поколение — массив в общей памяти."""
+        return self.buffers[self.current]
+
+    @board.setter
+    def board(self, value):
+        self.buffers[self.current][...] = value
+
+    def start_workers(self):
+        """Запускает процессы-работники, каждому — свою полосу строк."""
+        context = mp.get_context()
+        self.commands = [context.Queue() for _ in range(self.workers)]
+        self.done = context.Queue()
+        self.barrier = barrier = context.Barrier(self.workers)
+        names = [memory.name for memory in self.memories]
+        # Границы полос: строки делятся между работниками почти поровну
+        bounds = [self.rows * i // self.workers for i in range(self.workers + 1)]
+        for i in range(self.workers):
+            process = context.Process(
+                target=strip_worker,
+                args=(names, self.shape, bounds[i], bounds[i + 1], self.tail_mask,
+                      self.cols if self.topology == TORUS else None, self.rule,
+                      self.commands[i], barrier, self.done),
+                daemon=True,
+            )
+            process.start()
+            self.processes.append(process)
+
+    def advance(self, generations):
+        """Продвигает поле на generations поколений: одно задание на работника."""
+        if generations <= 0:
+            return
+        if not self.memories:
+            raise RuntimeError("Движок 'parallel' уже остановлен методом close()")
+        if not self.processes:
+            self.start_workers()
+        for queue in self.commands:
+            queue.put((generations, self.current))
+        self.wait_workers()
+        # Каждое поколение меняет буферы местами
+        self.current = (self.current + generations) % 2
+        self.last_evaluated = self.rows * self.cols
+
+    def step(self):
+        """
+        Вычисляет следующее поколение. Прошлое поколение остаётся во втором
+        буфере до следующего шага — live_changes() сравнивает с ним.
+        """
+        previous = self.board
+        self.advance(1)
+        self.previous = previous if self.track_changes else None
+
+    def wait_workers(self):
+        """
+        Ждёт, пока все работники доложат о конце задания. Если работник упал
+        (нехватка памяти, kill), остальные навсегда застрянут на барьере, и
+        ждать ответа без срока значило бы зависнуть вместе с ними. Поэтому
+        очередь done опрашивается с тайм-аутом, а между опросами проверяется,
+        живы ли процессы; если нет — движок останавливается (abort) и
+        поднимается RuntimeError.
+        """
+        reported = 0
+        while reported < self.workers:
+            try:
+                self.done.get(timeout=WORKER_POLL_SECONDS)
+                reported += 1
+            except Empty:
+                dead = [process for process in self.processes if not process.is_alive()]
+                if dead:
+                    codes = ", ".join(str(process.exitcode) for process in dead)
+                    self.abort()
+                    raise RuntimeError(
+                        f"Работник движка 'parallel' завершился посреди шага (код выхода {codes}): "
+                        "движок остановлен, поле могло остаться недосчитанным"
+                    ) from None
+
+    def abort(self):
+        """
+        Аварийная остановка: барьер ломается, чтобы застрявшие на нём работники
+        вышли, не вышедшие за WORKER_POLL_SECONDS завершаются принудительно,
+        затем общая память освобождается, как в close().
+        """
+        self.barrier.abort()
+        for process in self.processes:
+            process.join(WORKER_POLL_SECONDS)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self.commands = []
+        self.processes = []
+        self.close()
+
+    def close(self):
+        """Останавливает процессы-работники и освобождает общую память."""
+        for queue in getattr(self, "commands", []):
+            queue.put(None)
+        for process in self.processes:
+            process.join()
+        self.processes = []
+        if self.memories:
+            # Поле остаётся доступным для чтения: переносим буферы в обычную память
+            self.buffers = [np.array(buffer) for buffer in self.buffers]
+            for memory in self.memories:
+                memory.close()
+                memory.unlink()
+            self.memories = []
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass  # интерпретатор уже завершается — освобождать нечего
+
+
+def scaling_benchmark(size, generations, worker_counts):
+    """
+    Измеряет скорость параллельного движка на случайном поле size x size
+    для каждого числа процессов из worker_counts и сверяет результат
+    с однопроцессным битовым движком. Возвращает список словарей с замерами.
+    """
+    rng = np.random.default_rng(0)
+    soup = rng.random((size, size)) < 0.3
+
+    reference = BitPackedEngine(size, size)
+    reference.load(soup)
+    started = time.perf_counter()
+    reference.advance(generations)
+    base_seconds = time.perf_counter() - started
+
+    results = []
+    for workers in worker_counts:
+        engine = ParallelEngine(size, size, workers=workers)
+        engine.load(soup)
+        engine.start_workers()  # запуск процессов в замер не входит
+        started = time.perf_counter()
+        engine.advance(generations)
+        seconds = time.perf_counter() - started
+        same = bool(np.array_equal(engine.board, reference.board))
+        engine.close()
+        results.append({
+            "workers": engine.workers,
+            "seconds": seconds,
+            "generations_per_second": generations / seconds,
+            "speedup": base_seconds / seconds,
+            "matches_bitpacked": same,
+        })
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ускорение параллельного движка игры Жизнь")
+    parser.add_argument("--size", type=int, default=4096, help="сторона квадратного поля")
+    parser.add_argument("--generations", type=int, default=50, help="сколько поколений считать")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    counts = sorted({n for n in (1, 2, 4, 8) if n <= cpus} | {cpus})
+    print(f"Поле {args.size} x {args.size}, {args.generations} поколений")
+    for result in scaling_benchmark(args.size, args.generations, counts):
+        print(
+            f"{result['workers']:3d} процессов: {result['seconds']:.3f} с, "
+            f"{result['generations_per_second']:.1f} поколений/с, "
+            f"ускорение x{result['speedup']:.2f}, "
+            f"совпадает с bitpacked: {'да' if result['matches_bitpacked'] else 'НЕТ'}"
+        )
@@ -0,0 +1,591 @@
+# Чтение и запись фигур (начальных полей) игры Жизнь в файлы.
+#
+# Поддерживаются три распространённых формата:
+# - plaintext (.cells): каждая строка файла — строка поля,
+#   'O' или '*' — живая клетка, '.' — мёртвая, строки с '!' — комментарии;
+# - RLE (.rle): строки поля сжаты счётчиками повторов: "3o2b$" — три живые,
+#   две мёртвые, конец строки; в заголовке "x = 3, y = 2, rule = B3/S23".
+#   У правил Generations клетки записываются буквами состояний, как в Golly:
+#   "." — мёртвая, "A" — живая, "B".."X" и "pA".."yO" — угасающие;
+# - Life 1.06 (.lif, .life): после строки "#Life 1.06" — по паре координат
+#   "x y" на каждую живую клетку.
+#
+# Файлы читаются построчно, без загрузки целиком в память, а фигура хранится
+# не списком пар, а отрезками живых клеток в компактных массивах (array):
+# у больших фигур (Gemini — почти миллион клеток) почти все клетки идут
+# отрезками по строкам. В движок фигура попадает одним вызовом set_cells —
+# сразу в массив NumPy, упакованные слова или множество клеток.
+# Файлы с расширениями .gz, .bz2 и .xz сжимаются и распаковываются на лету.
+# Угасающие клетки правил Generations хранит только RLE: в plaintext и
+# Life 1.06 такую фигуру не записать (ValueError), а не молча потерять их.
+
+import bz2
+import gzip
+import lzma
+import re
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+
+from engine_base import np
+
+ALIVE_CHARS = "O*"
+
+# Расширение сжатого файла -> функция открытия
+COMPRESSORS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+# Уровень сжатия при записи: на однообразных полях максимальные уровни gzip
+# и xz в десятки раз медленнее, а файл выходит меньше лишь на несколько процентов
+COMPRESS_OPTIONS = {".gz": {"compresslevel": 6}, ".xz": {"preset": 3}}
+
+# Расширение файла -> формат
+FORMATS = {".cells": "plaintext", ".txt": "plaintext", ".rle": "rle", ".lif": "life106", ".life": "life106"}
+# Форматы, в которых есть угасающие клетки правил Generations
+STATE_FORMATS = ("rle",)
+
+# Длина строки RLE (по стандарту — не больше 70 символов)
+RLE_LINE_LENGTH = 70
+# Сколько символов тела RLE разбирается за один раз
+RLE_BLOCK = 1 << 20
+
+# Токен RLE: необязательный счётчик и символ состояния
+# (b или . — мёртвая, o или A — живая, B..X и pA..yO — угасающие в правилах
+# Generations, $ — конец строки, ! — конец фигуры)
+RLE_TOKEN = re.compile(r"(\d*)([p-y][A-X]|[a-zA-Z.$!])")
+# Приставки состояний после X: pA..pX — 25..48, qA..qX — 49..72 и так далее
+RLE_PREFIXES = "pqrstuvwxy"
+# Сколько состояний обозначается одной буквой A..X
+STATE_LETTERS = 24
+RLE_HEADER = re.compile(r"\s*(\w+)\s*=\s*([^,]+)")
+
+
+class Pattern:
+    """
+    Фигура: живые клетки отрезками по строкам. Отрезок — (строка, первый
+    столбец, длина, состояние) в массивах run_rows, run_cols, run_lengths
+    и run_states. Состояние 1 — живые клетки, 2, 3, ... — угасающие клетки
+    правил Generations (такие отрезки бывают только у фигур из RLE и движка).
+    Координаты отсчитываются от левого верхнего угла фигуры и могут быть
+    отрицательными (в Life 1.06 начало координат — где угодно).
+    name, rule и comments — название, правило и комментарии из файла.
+    """
+
+    def __init__(self, name=None, rule=None):
+        self.name = name
+        self.rule = rule
+        self.comments = []
+        self.run_rows = array("q")
+        self.run_cols = array("q")
+        self.run_lengths = array("q")
+        self.run_states = array("B")
+
+    def add_run(self, row, col, length=1, state=1):
+        """Добавляет отрезок из length клеток в состоянии state (1 — живых), начиная с (row, col)."""
+        self.run_rows.append(row)
+        self.run_cols.append(col)
+        self.run_lengths.append(length)
+        self.run_states.append(state)
+
+    def add_runs(self, rows, cols, lengths, states=1):
+        """
+        Добавляет сразу много отрезков (массивы NumPy одинаковой длины);
+        states — массив состояний отрезков или одно состояние для всех.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        self.run_rows.frombytes(rows.tobytes())
+        self.run_cols.frombytes(np.asarray(cols, dtype=np.int64).tobytes())
+        self.run_lengths.frombytes(np.asarray(lengths, dtype=np.int64).tobytes())
+        self.run_states.frombytes(np.broadcast_to(np.asarray(states, dtype=np.uint8), rows.shape).tobytes())
+
+    @property
+    def population(self):
+        """Число живых клеток фигуры (угасающие не считаются)."""
+        if np is not None:
+            _, _, lengths, states = self.run_arrays()
+            return int(lengths[states == 1].sum())
+        return sum(n for n, state in zip(self.run_lengths, self.run_states) if state == 1)
+
+    def has_dying(self):
+        """Есть ли в фигуре угасающие клетки правил Generations."""
+        return max(self.run_states, default=0) > 1
+
+    def bounds(self):
+        """
+        Рамка фигуры: (верхняя строка, левый столбец, высота, ширина).
+        У пустой фигуры — (0, 0, 0, 0).
+        """
+        if not self.run_rows:
+            return 0, 0, 0, 0
+        if np is not None:
+            rows, cols, lengths, _ = self.run_arrays()
+            top, bottom, left = int(rows.min()), int(rows.max()), int(cols.min())
+            right = int((cols + lengths).max())
+        else:
+            top, bottom = min(self.run_rows), max(self.run_rows)
+            left = min(self.run_cols)
+            right = max(c + n for c, n in zip(self.run_cols, self.run_lengths))
+        return top, left, bottom - top + 1, right - left
+
+    def run_arrays(self):
+        """Отрезки фигуры массивами NumPy: строки, столбцы и длины int64, состояния uint8 (без копирования)."""
+        return tuple(
+            np.frombuffer(values, dtype=dtype) if values else np.zeros(0, dtype=dtype)
+            for values, dtype in (
+                (self.run_rows, np.int64), (self.run_cols, np.int64),
+                (self.run_lengths, np.int64), (self.run_states, np.uint8),
+            )
+        )
+
+    def coordinates(self):
+        """
+        Координаты всех живых клеток: (строки, столбцы). С NumPy — два массива
+        int64, отрезки разворачиваются в клетки векторно; без NumPy — два списка.
+        Угасающие клетки сюда не входят (см. cell_states).
+        """
+        if np is not None:
+            rows, cols, lengths, states = self.run_arrays()
+            alive = states == 1
+            return expand_runs(rows[alive], cols[alive], lengths[alive])
+        rows, cols = [], []
+        for r, c, n, state in zip(self.run_rows, self.run_cols, self.run_lengths, self.run_states):
+            if state == 1:
+                rows.extend([r] * n)
+                cols.extend(range(c, c + n))
+        return rows, cols
+
+    def cell_states(self):
+        """Все клетки фигуры, живые и угасающие: (строки, столбцы, номера состояний)."""
+        if np is not None:
+            rows, cols, lengths, states = self.run_arrays()
+            return (*expand_runs(rows, cols, lengths), np.repeat(states, lengths))
+        rows, cols, states = [], [], []
+        for r, c, n, state in zip(self.run_rows, self.run_cols, self.run_lengths, self.run_states):
+            rows.extend([r] * n)
+            cols.extend(range(c, c + n))
+            states.extend([state] * n)
+        return rows, cols, states
+
+    @classmethod
+    def from_cells(cls, rows, cols, name=None, rule=None, states=None):
+        """
+        Собирает фигуру из координат клеток (массивов или списков): клетки
+        сортируются по строкам и соседние в строке сливаются в отрезки.
+        states — номера состояний клеток; по умолчанию все клетки живые.
+        """
+        pattern = cls(name, rule)
+        if np is not None:
+            rows = np.asarray(rows, dtype=np.int64)
+            cols = np.asarray(cols, dtype=np.int64)
+            states = np.ones(rows.size, dtype=np.uint8) if states is None else np.asarray(states, dtype=np.uint8)
+            order = np.lexsort((cols, rows))
+            rows, cols, states = rows[order], cols[order], states[order]
+            if rows.size:
+                # Новый отрезок начинается там, где сменилась строка или состояние или прервался столбец
+                breaks = np.flatnonzero((np.diff(rows) != 0) | (np.diff(cols) != 1) | (states[1:] != states[:-1])) + 1
+                starts = np.concatenate(([0], breaks))
+                ends = np.concatenate((breaks, [rows.size]))
+                pattern.run_rows = array("q", rows[starts].tobytes())
+                pattern.run_cols = array("q", cols[starts].tobytes())
+                pattern.run_lengths = array("q", (ends - starts).astype(np.int64).tobytes())
+                pattern.run_states = array("B", states[starts].tobytes())
+            return pattern
+        if states is None:
+            states = [1] * len(rows)
+        for r, c, state in sorted(zip(rows, cols, states)):
+            if (pattern.run_rows and pattern.run_rows[-1] == r and pattern.run_states[-1] == state
+                    and pattern.run_cols[-1] + pattern.run_lengths[-1] == c):
+                pattern.run_lengths[-1] += 1
+            else:
+                pattern.add_run(r, c, 1, state)
+        return pattern
+
+    @classmethod
+    def from_engine(cls, engine, name=None):
+        """
+        Фигура из всех живых клеток движка (у бесконечной плоскости — не только
+        из окна), у правил Generations — вместе с угасающими.
+        """
+        if engine.rule.states > 2:
+            rows, cols, states = engine.cell_states()
+        else:
+            (rows, cols), states = engine.live_cells(), None
+        return cls.from_cells(rows, cols, name, str(engine.rule), states)
+
+    def sorted_runs(self):
+        """Отрезки списком четвёрок (строка, столбец, длина, состояние), упорядоченные по строкам и столбцам."""
+        if np is not None:
+            return list(zip(*(values.tolist() for values in self.sorted_run_arrays())))
+        return sorted(zip(self.run_rows, self.run_cols, self.run_lengths, self.run_states))
+
+    def sorted_run_arrays(self):
+        """То же, что sorted_runs, но четырьмя массивами NumPy (нужен NumPy)."""
+        rows, cols, lengths, states = self.run_arrays()
+        row_steps = np.diff(rows)
+        if not np.all((row_steps > 0) | ((row_steps == 0) & (np.diff(cols) > 0))):
+            order = np.lexsort((cols, rows))
+            rows, cols, lengths, states = rows[order], cols[order], lengths[order], states[order]
+        return rows, cols, lengths, states
+
+
+def expand_runs(rows, cols, lengths):
+    """Разворачивает отрезки (массивы NumPy) в координаты клеток: (строки, столбцы)."""
+    # Номер клетки внутри своего отрезка: 0, 1, ..., length - 1
+    starts = np.cumsum(lengths) - lengths
+    inside = np.arange(int(lengths.sum()), dtype=np.int64) - np.repeat(starts, lengths)
+    return np.repeat(rows, lengths), np.repeat(cols, lengths) + inside
+
+
+def rle_state(tag):
+    """Номер состояния по символу RLE: b, . и прочие — 0, o и A — 1, B..X и pA..yO — угасающие."""
+    if tag == "o":
+        return 1
+    letter = tag[-1]
+    if not "A" <= letter <= "X":
+        return 0
+    prefix = RLE_PREFIXES.index(tag[0]) + 1 if len(tag) == 2 else 0
+    return prefix * STATE_LETTERS + ord(letter) - ord("A") + 1
+
+
+def rle_state_tag(state):
+    """Символ состояния state в RLE правил Generations: 'A', 'B', ..., 'X', 'pA', ..."""
+    prefix, letter = divmod(state - 1, STATE_LETTERS)
+    return (RLE_PREFIXES[prefix - 1] if prefix else "") + chr(ord("A") + letter)
+
+
+# === ОТКРЫТИЕ ФАЙЛОВ ===
+
+def open_pattern_file(path, mode="r"):
+    """Открывает текстовый файл фигуры; .gz, .bz2 и .xz — со сжатием (уровни — COMPRESS_OPTIONS)."""
+    for extension, opener in COMPRESSORS.items():
+        if str(path).lower().endswith(extension):
+            options = COMPRESS_OPTIONS.get(extension, {}) if "w" in mode else {}
+            return opener(path, mode + "t", encoding="utf-8", **options)
+    return open(path, mode, encoding="utf-8")
+
+
+def pattern_format(path):
+    """Формат фигуры по расширению файла (без учёта .gz/.bz2/.xz)."""
+    name = str(path).lower()
+    for extension in COMPRESSORS:
+        if name.endswith(extension):
+            name = name[:-len(extension)]
+    for extension, fmt in FORMATS.items():
+        if name.endswith(extension):
+            return fmt
+    raise ValueError(f"Непонятный формат файла {path!r}: ожидается .rle, .cells или .lif")
+
+
+# === ЧТЕНИЕ ===
+
+def parse_plaintext(lines):
+    """Разбирает строки файла plaintext и возвращает фигуру."""
+    pattern = Pattern()
+    run = re.compile(f"[{re.escape(ALIVE_CHARS)}]+")
+    row = 0
+    for line in lines:
+        if line.startswith("!"):
+            # Комментарий; "!Name: ..." — название фигуры
+            text = line[1:].strip()
+            if text.startswith("Name:"):
+                pattern.name = text[5:].strip()
+            else:
+                pattern.comments.append(text)
+            continue
+        for match in run.finditer(line):
+            pattern.add_run(row, match.start(), match.end() - match.start())
+        row += 1
+    return pattern
+
+
+def parse_rle(lines):
+    """
+    Разбирает строки файла RLE и возвращает фигуру. Заголовок и комментарии
+    читаются по строке, тело — блоками примерно по RLE_BLOCK символов:
+    каждый блок разбирается целиком (с NumPy — векторно), а счётчик,
+    разорванный границей блока, переносится в следующий.
+    Угасающие клетки правил Generations (B, C, ..., pA, ...) попадают
+    в фигуру отрезками со своими состояниями.
+    """
+    pattern = Pattern()
+    lines = iter(lines)
+    body = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#"):
+            # #N — название, #C/#c — комментарий, остальное пропускаем
+            if line[:2] == "#N":
+                pattern.name = line[2:].strip()
+            elif line[:2] in ("#C", "#c"):
+                pattern.comments.append(line[2:].strip())
+            continue
+        if line.startswith("x"):
+            for key, value in RLE_HEADER.findall(line):
+                if key == "rule":
+                    # Golly дописывает к правилу размер поля после двоеточия — он не нужен
+                    pattern.rule = value.split(":")[0].strip()
+        else:
+            body.append(line)  # заголовка нет — сразу началось тело
+        break
+
+    row = col = 0
+    pending = ""  # цифры счётчика, оставшиеся с конца предыдущего блока
+    size = sum(map(len, body))
+    for line in lines:
+        body.append(line.strip())
+        size += len(line)
+        if size >= RLE_BLOCK:
+            row, col, pending, finished = decode_rle_block(pending + "".join(body), row, col, pattern)
+            if finished:
+                return pattern
+            body, size = [], 0
+    decode_rle_block(pending + "".join(body), row, col, pattern)
+    return pattern
+
+
+def decode_rle_block(text, row, col, pattern):
+    """
+    Разбирает кусок тела RLE, начиная с клетки (row, col), и добавляет
+    в фигуру отрезки живых и угасающих клеток. Возвращает (row, col, хвост,
+    конец): где остановились, недочитанные цифры (и приставка состояния)
+    в конце куска и встретился ли "!".
+    """
+    end = text.find("!")
+    finished = end >= 0
+    if finished:
+        text = text[:end]
+    if " " in text or "\t" in text:
+        text = "".join(text.split())
+    tail = ""
+    if not finished and text[-1:] in RLE_PREFIXES:
+        # Состояние вроде "pA" разорвано границей куска — приставка со счётчиком ждут букву
+        cut = len(text) - 1
+        while cut and text[cut - 1].isdigit():
+            cut -= 1
+        text, tail = text[:cut], text[cut:]
+    if np is None:
+        consumed = 0
+        for match in RLE_TOKEN.finditer(text):
+            count_text, tag = match.groups()
+            count = int(count_text) if count_text else 1
+            consumed = match.end()
+            if tag == "$":
+                row += count
+                col = 0
+                continue
+            state = rle_state(tag)
+            if state:
+                pattern.add_run(row, col, count, state)
+            col += count  # b, . и незнакомые символы — мёртвые клетки
+        return row, col, text[consumed:] + tail, finished
+
+    data = np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+    digit = (data >= ord("0")) & (data <= ord("9"))
+    tags = np.flatnonzero(~digit)
+    if tags.size == 0:
+        return row, col, text + tail, finished
+    rest = text[tags[-1] + 1:] + tail
+    # Счётчик токена: цифры перед символом состояния, каждая со своим разрядом
+    positions = np.flatnonzero(digit[:tags[-1]])
+    owner = np.searchsorted(tags, positions)
+    values = (data[positions] - ord("0")).astype(np.int64) * 10 ** (tags[owner] - positions - 1)
+    counts = np.bincount(owner, weights=values, minlength=tags.size).astype(np.int64)
+    has_digits = np.bincount(owner, minlength=tags.size) > 0
+    counts = np.where(has_digits, counts, 1)
+
+    symbols = data[tags]
+    # Состояние токена: o и A — 1, B..X — 2..24, остальные символы — мёртвые клетки
+    upper = (symbols >= ord("A")) & (symbols <= ord("X"))
+    states = np.where(upper, symbols.astype(np.int64) - ord("A") + 1, 0)
+    states[symbols == ord("o")] = 1
+    # Приставка p..y и буква сразу за ней — одно состояние ("pA" — 25): счётчик
+    # стоит перед приставкой, а к номеру буквы прибавляется 24 на каждую ступень
+    prefixes = np.flatnonzero(
+        (symbols[:-1] >= ord("p")) & (symbols[:-1] <= ord("y")) & upper[1:] & (tags[1:] == tags[:-1] + 1)
+    )
+    if prefixes.size:
+        states[prefixes + 1] += (symbols[prefixes].astype(np.int64) - ord("p") + 1) * STATE_LETTERS
+        counts[prefixes + 1] = counts[prefixes]
+        keep = np.ones(symbols.size, dtype=bool)
+        keep[prefixes] = False
+        symbols, counts, states = symbols[keep], counts[keep], states[keep]
+    new_line = symbols == ord("$")
+    alive = states > 0
+    # Строка каждого токена: сколько строк добавили "$" до него
+    row_step = np.where(new_line, counts, 0)
+    rows = row + np.cumsum(row_step) - row_step
+    # Столбец: сумма длин токенов от последнего "$" (или от начала куска)
+    col_step = np.where(new_line, 0, counts)
+    before = np.cumsum(col_step) - col_step
+    last_new_line = np.maximum.accumulate(np.where(new_line, np.arange(symbols.size), -1))
+    cols = np.where(last_new_line >= 0, before - before[np.maximum(last_new_line, 0)], col + before)
+    pattern.add_runs(rows[alive], cols[alive], counts[alive], states[alive])
+
+    total = int(col_step.sum())
+    if new_line.any():
+        col = total - int(before[last_new_line[-1]])
+    else:
+        col += total
+    return int(rows[-1] + row_step[-1]), col, rest, finished
+
+
+def parse_life106(lines):
+    """Разбирает строки файла Life 1.06 (пары "x y") и возвращает фигуру."""
+    pattern = Pattern()
+    for line in lines:
+        if line.startswith("#"):
+            if line.startswith("#D") or line.startswith("#C"):
+                pattern.comments.append(line[2:].strip())
+            continue
+        parts = line.split()
+        if len(parts) != 2:
+            continue
+        x, y = int(parts[0]), int(parts[1])
+        pattern.add_run(y, x)
+    return pattern
+
+
+PARSERS = {"plaintext": parse_plaintext, "rle": parse_rle, "life106": parse_life106}
+
+
+def read_pattern(path, fmt=None):
+    """
+    Читает фигуру из файла. Формат определяется по расширению (.rle, .cells,
+    .lif, в том числе сжатые .rle.gz и т. п.), если не задан явно.
+    """
+    fmt = fmt or pattern_format(path)
+    if fmt not in PARSERS:
+        raise ValueError(f"Неизвестный формат фигуры: {fmt!r}. Доступны: {', '.join(PARSERS)}")
+    with open_pattern_file(path) as file:
+        return PARSERS[fmt](file)
+
+
+def read_plaintext(path):
+    """Читает фигуру из файла plaintext."""
+    return read_pattern(path, "plaintext")
+
+
+# === ЗАПИСЬ ===
+
+def require_two_states(pattern, fmt):
+    """ValueError, если в фигуре есть угасающие клетки, а формат fmt их не хранит."""
+    if fmt not in STATE_FORMATS and pattern.has_dying():
+        raise ValueError(
+            f"В формате {fmt} нет угасающих клеток правил Generations, а в фигуре они есть: сохраните её в RLE"
+        )
+
+
+def dump_plaintext(pattern, file):
+    """Записывает фигуру в открытый текстовый файл в формате plaintext."""
+    require_two_states(pattern, "plaintext")
+    if pattern.name:
+        file.write(f"!Name: {pattern.name}\n")
+    for comment in pattern.comments:
+        file.write(f"!{comment}\n")
+    top, left, height, _ = pattern.bounds()
+    line, current, col = [], top, left
+    for r, c, n, _ in pattern.sorted_runs():
+        if r != current:
+            file.write("".join(line) + "\n")
+            file.write(".\n" * (r - current - 1))  # пустые строки фигуры
+            line, current, col = [], r, left
+        line.append("." * (c - col) + "O" * n)
+        col = c + n
+    if height:
+        file.write("".join(line) + "\n")
+
+
+def dump_rle(pattern, file):
+    """
+    Записывает фигуру в открытый текстовый файл в формате RLE.
+    Строки тела не длиннее 70 символов; подряд идущие пустые строки
+    фигуры сжимаются в один токен "n$". Фигура с угасающими клетками
+    пишется буквами состояний (".", "A", "B", ...).
+    """
+    if pattern.name:
+        file.write(f"#N {pattern.name}\n")
+    for comment in pattern.comments:
+        file.write(f"#C {comment}\n")
+    top, left, height, width = pattern.bounds()
+    file.write(f"x = {width}, y = {height}, rule = {pattern.rule or 'B3/S23'}\n")
+
+    # Сначала собираем все токены тела ("3o", "b", "2$"), затем режем их на строки
+    tokens = rle_tokens(pattern, top, left)
+    # Конец каждой строки — последний токен, на котором суммарная длина не больше 70
+    ends = list(accumulate(map(len, tokens)))
+    start, written = 0, 0
+    while start < len(tokens):
+        stop = max(bisect_right(ends, written + RLE_LINE_LENGTH), start + 1)
+        file.write("".join(tokens[start:stop]) + "\n")
+        written, start = ends[stop - 1], stop
+
+
+def rle_tokens(pattern, top, left):
+    """
+    Токены тела RLE по отрезкам фигуры: перед каждым отрезком — переход
+    на его строку ("n$", если строка сменилась) и пропуск мёртвых клеток ("nb").
+    С NumPy счётчики всех токенов считаются сразу, в Python остаётся только
+    превратить их в строки.
+    """
+    generations = pattern.has_dying()
+    dead = "." if generations else "b"
+    if np is None:
+        tokens = []
+        current, col = top, left
+        for r, c, n, state in pattern.sorted_runs():
+            if r != current:
+                tokens.append(f"{r - current}$" if r - current > 1 else "$")
+                current, col = r, left
+            if c > col:
+                tokens.append(f"{c - col}{dead}" if c - col > 1 else dead)
+            tag = rle_state_tag(state) if generations else "o"
+            tokens.append(f"{n}{tag}" if n > 1 else tag)
+            col = c + n
+        return tokens + ["!"]
+
+    rows, cols, lengths, states = pattern.sorted_run_arrays()
+    skips = np.diff(rows, prepend=top)
+    # Пропуск отсчитывается от конца прошлого отрезка в той же строке или от левого края
+    previous_ends = np.concatenate(([left], (cols + lengths)[:-1]))
+    gaps = np.where(skips > 0, cols - left, cols - previous_ends)
+    counts = np.stack([skips, gaps, lengths], axis=1).ravel()
+    keep = counts > 0
+    # Символ каждого токена: переход строки, пропуск, отрезок в своём состоянии
+    tags = np.empty((rows.size, 3), dtype=object)
+    tags[:, 0] = "$"
+    tags[:, 1] = dead
+    tags[:, 2] = [rle_state_tag(state) for state in states.tolist()] if generations else "o"
+    tokens = [
+        f"{n}{tag}" if n > 1 else tag
+        for n, tag in zip(counts[keep].tolist(), tags.ravel()[keep].tolist())
+    ]
+    return tokens + ["!"]
+
+
+def dump_life106(pattern, file):
+    """Записывает фигуру в открытый текстовый файл в формате Life 1.06."""
+    require_two_states(pattern, "life106")
+    file.write("#Life 1.06\n")
+    rows, cols = pattern.coordinates()
+    file.writelines(f"{int(c)} {int(r)}\n" for r, c in zip(rows, cols))
+
+
+WRITERS = {"plaintext": dump_plaintext, "rle": dump_rle, "life106": dump_life106}
+
+
+def write_pattern(path, pattern, fmt=None):
+    """
+    Записывает фигуру в файл. Формат определяется по расширению, если не задан;
+    с расширением .gz, .bz2 или .xz файл сразу сжимается.
+    """
+    fmt = fmt or pattern_format(path)
+    if fmt not in WRITERS:
+        raise ValueError(f"Неизвестный формат фигуры: {fmt!r}. Доступны: {', '.join(WRITERS)}")
+    require_two_states(pattern, fmt)  # до открытия, чтобы не оставить пустой файл
+    with open_pattern_file(path, "w") as file:
+        WRITERS[fmt](pattern, file)
+
+
+def write_plaintext(path, pattern):
+    """Записывает фигуру в файл plaintext."""
+    write_pattern(path, pattern, "plaintext")
@@ -0,0 +1,282 @@
+# Замеры кадров окна: на что уходит время, когда картинка дёргается.
+#
+# Модуль общий для двух приложений — Game_Life и Drag_n_Drop. Он один:
+# Drag_n_Drop/profiling.py ничего не определяет сам, а загружает этот файл
+# (приложения запускаются каждое из своей папки). Всё, что относится
+# к одному приложению (свои фазы и счётчики), остаётся в коде приложения.
+#
+# Кадр — это один вызов, запланированный через root.after (run_simulation
+# в Game_Life, animation_loop в Drag_n_Drop). FrameProfiler засекает внутри
+# кадра фазы, названные приложением (phase(), а record() — для времени,
+# измеренного в другом месте, например шага в фоновом потоке).
+# Промежуток между концом одного кадра и началом следующего записывается
+# как простой (idle) — это время цикла событий Tk: перерисовка окна, клики,
+# перетаскивание, ожидание таймера. Вызовы холста считаются через обёртку
+# CountingCanvas: их число и время идут в фазу render, где бы в кадре они
+# ни случились, а из фазы, внутри которой они были, это время вычитается.
+#
+# Кроме миллисекунд кадр может вести счётчики (сколько пар фигур проверено,
+# сколько шагов физики сделано): приложение заводит их функцией
+# register_counter() и прибавляет к ним через FrameProfiler.count().
+#
+# По последним HISTORY_FRAMES кадрам считаются процентили, которые
+# ProfileOverlay показывает прямо на холсте. Все фазы также пишутся в трассу
+# формата Chrome Trace Event: её можно открыть в chrome://tracing или
+# ui.perfetto.dev и посмотреть каждый кадр на шкале времени.
+
+import json
+import time
+from collections import deque
+
+# По скольким последним кадрам считаются процентили
+HISTORY_FRAMES = 300
+# Какие процентили показывать
+PERCENTILES = (50, 95, 99)
+# Сколько последних событий хранит трасса (старые выбрасываются)
+TRACE_EVENTS = 200_000
+# Раз в сколько кадров перерисовывать надпись с замерами
+OVERLAY_EVERY = 15
+
+# Фаза, в которую идёт время вызовов холста, и фаза простоя между кадрами
+RENDER = "render"
+IDLE = "idle"
+# Под этим именем в истории хранится длительность всего кадра и число вызовов холста
+FRAME = "frame"
+CANVAS_CALLS = "canvas_calls"
+# Счётчики за кадр (а не миллисекунды): имя -> подпись в надписи.
+# Вызовы холста есть всегда, остальные заводят приложения (register_counter)
+COUNTERS = {CANVAS_CALLS: "холст"}
+
+
+def register_counter(name, label):
+    """
+    Заводит счётчик за кадр name: в надписи он показывается строкой label,
+    в трассе — под своим именем. Возвращает name, чтобы имя можно было
+    сразу положить в константу: PAIRS = register_counter("pairs", "пары").
+    """
+    COUNTERS[name] = label
+    return name
+
+
+class PhaseTimer:
+    """Засекает одну фазу кадра: with profiler.phase("step"): ..."""
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self.canvas_started = self.profiler.canvas_seconds
+        return self
+
+    def __exit__(self, *exc_info):
+        ended = time.perf_counter()
+        # Время вызовов холста внутри фазы уже учтено в render
+        canvas = self.profiler.canvas_seconds - self.canvas_started
+        self.profiler.add(self.name, self.started, ended, canvas)
+        return False
+
+
+class FrameProfiler:
+    """
+    Замеры кадров: длительность фаз, простой между кадрами и число вызовов
+    холста за кадр. Кадр начинается begin_frame() и заканчивается end_frame(),
+    фазы внутри засекаются через phase(name) или передаются готовыми в record().
+    """
+
+    def __init__(self, history=HISTORY_FRAMES, trace_events=TRACE_EVENTS):
+        self.origin = time.perf_counter()  # от этого момента отсчитывается время в трассе
+        # фаза -> длительности (мс) за последние history кадров
+        self.samples = {}
+        self.history = history
+        # Фазы текущего кадра: имя -> мс
+        self.current = {}
+        # Трасса: (фаза, начало в секундах, длительность в секундах) и итоги кадров
+        self.events = deque(maxlen=trace_events)
+        self.frame_totals = deque(maxlen=trace_events)
+        # Момент конца каждого из последних кадров — для частоты кадров
+        self.frame_ends = deque(maxlen=history)
+        self.frames = 0
+        self.frame_started = None
+        self.last_frame_end = None
+        # Счётчики вызовов холста, их увеличивает CountingCanvas
+        self.canvas_calls = 0
+        self.canvas_seconds = 0.0
+        self.frame_canvas_calls = 0
+        self.frame_canvas_seconds = 0.0
+
+    def begin_frame(self):
+        """Начало кадра: промежуток с конца прошлого кадра записывается как простой."""
+        now = time.perf_counter()
+        if self.last_frame_end is not None:
+            self.add(IDLE, self.last_frame_end, now)
+        self.frame_started = now
+        self.frame_canvas_calls = self.canvas_calls
+        self.frame_canvas_seconds = self.canvas_seconds
+
+    def phase(self, name):
+        """Таймер фазы для with: время вызовов холста внутри фазы из неё вычитается."""
+        return PhaseTimer(self, name)
+
+    def add(self, name, started, ended, excluded=0.0):
+        """Записывает фазу, шедшую от started до ended (секунды perf_counter)."""
+        self.current[name] = self.current.get(name, 0.0) + (ended - started - excluded) * 1000
+        self.events.append((name, started, ended - started))
+
+    def record(self, name, ms):
+        """Записывает фазу, измеренную в другом месте (например, шаг в фоновом потоке)."""
+        self.current[name] = self.current.get(name, 0.0) + ms
+
+    def count(self, name, value):
+        """Прибавляет value к счётчику кадра name (см. register_counter)."""
+        self.current[name] = self.current.get(name, 0) + value
+
+    def end_frame(self):
+        """Конец кадра: итоги кадра уходят в историю и в трассу."""
+        now = time.perf_counter()
+        calls = self.canvas_calls - self.frame_canvas_calls
+        canvas_ms = (self.canvas_seconds - self.frame_canvas_seconds) * 1000
+        if calls:
+            self.current[RENDER] = self.current.get(RENDER, 0.0) + canvas_ms
+        self.current[FRAME] = (now - self.frame_started) * 1000
+        self.current[CANVAS_CALLS] = calls
+        self.events.append((FRAME, self.frame_started, now - self.frame_started))
+        self.frame_totals.append((now, self.current))
+        for name, value in self.current.items():
+            if name not in self.samples:
+                self.samples[name] = deque(maxlen=self.history)
+            self.samples[name].append(value)
+        self.current = {}
+        self.frames += 1
+        self.frame_ends.append(now)
+        self.last_frame_end = now
+
+    def percentiles(self, name):
+        """Процентили PERCENTILES фазы name по последним кадрам (пустой список, если замеров нет)."""
+        values = sorted(self.samples.get(name, ()))
+        if not values:
+            return []
+        # Метод ближайшего ранга: p-й процентиль — значение с номером ceil(p/100 * n)
+        return [values[max(0, -(-p * len(values) // 100) - 1)] for p in PERCENTILES]
+
+    def fps(self):
+        """Частота кадров по последним кадрам."""
+        if len(self.frame_ends) < 2:
+            return 0.0
+        return (len(self.frame_ends) - 1) / (self.frame_ends[-1] - self.frame_ends[0])
+
+    def summary(self):
+        """Строки для надписи: частота кадров и процентили каждой фазы."""
+        header = "/".join(f"p{p}" for p in PERCENTILES)
+        lines = [f"кадров: {self.frames}  {self.fps():.1f} к/с", f"{'мс ' + header:>28}"]
+        for name in self.samples:
+            if name in COUNTERS:
+                continue
+            values = "/".join(f"{value:.1f}" for value in self.percentiles(name))
+            lines.append(f"{name:<10}{values:>18}")
+        for name, label in COUNTERS.items():
+            # Вызовы холста показываются всегда, остальные счётчики - если их записывали
+            if name != CANVAS_CALLS and name not in self.samples:
+                continue
+            values = "/".join(str(int(value)) for value in self.percentiles(name))
+            lines.append(f"{label:<10}{values:>18}" + (" выз." if name == CANVAS_CALLS else ""))
+        return lines
+
+    def trace(self):
+        """Трасса в формате Chrome Trace Event (словарь для json.dump)."""
+        events = [
+            {
+                "name": name, "ph": "X", "pid": 1, "tid": 1,
+                "ts": (started - self.origin) * 1e6, "dur": duration * 1e6,
+            }
+            for name, started, duration in self.events
+        ]
+        # Итоги кадров — счётчики: на шкале времени они рисуются графиками
+        events.extend(
+            {
+                "name": "кадр", "ph": "C", "pid": 1,
+                "ts": (ended - self.origin) * 1e6, "args": totals,
+            }
+            for ended, totals in self.frame_totals
+        )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump(self, path):
+        """Сохраняет трассу в файл path (JSON)."""
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.trace(), file, ensure_ascii=False)
+
+
+class CountingCanvas:
+    """
+    Обёртка холста tkinter, которая считает вызовы его методов и время в них.
+    Ведёт себя как сам холст, поэтому её можно отдать отрисовщику или фигурам
+    вместо настоящего холста.
+    """
+
+    def __init__(self, canvas, profiler):
+        self.canvas = canvas
+        self.profiler = profiler
+
+    def __getattr__(self, name):
+        attribute = getattr(self.canvas, name)
+        if not callable(attribute):
+            return attribute
+        profiler = self.profiler
+
+        def counted(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return attribute(*args, **kwargs)
+            finally:
+                profiler.canvas_calls += 1
+                profiler.canvas_seconds += time.perf_counter() - started
+
+        return counted
+
+    def __str__(self):
+        # tkinter обращается к виджету по его имени (str), например в pack(in_=...)
+        return str(self.canvas)
+
+
+class ProfileOverlay:
+    """
+    Надпись с замерами в левом верхнем углу холста. Рисуется настоящим
+    холстом, а не обёрткой, и между кадрами — поэтому в замеры не попадает.
+    """
+
+    TAG = "profile_overlay"
+
+    def __init__(self, canvas, profiler, every=OVERLAY_EVERY):
+        self.canvas = canvas
+        self.profiler = profiler
+        self.every = every
+        self.visible = True
+
+    def toggle(self):
+        """Показывает или прячет надпись."""
+        self.visible = not self.visible
+        if self.visible:
+            self.draw()
+        else:
+            self.canvas.delete(self.TAG)
+
+    def update(self):
+        """Вызывается после каждого кадра; надпись обновляется раз в every кадров."""
+        if self.visible and self.profiler.frames % self.every == 0:
+            self.draw()
+
+    def draw(self):
+        """Перерисовывает надпись поверх всего, что есть на холсте."""
+        self.canvas.delete(self.TAG)
+        text = self.canvas.create_text(
+            8, 8, anchor="nw", text="\n".join(self.profiler.summary()),
+            font=("Courier", 9), fill="black", tags=self.TAG
+        )
+        left, top, right, bottom = self.canvas.bbox(text)
+        background = self.canvas.create_rectangle(
+            left - 4, top - 4, right + 4, bottom + 4,
+            fill="lightyellow", outline="gray", tags=self.TAG
+        )
+        self.canvas.tag_lower(background, text)
@@ -0,0 +1,274 @@
+# Способы отрисовки поля игры Жизнь на холсте tkinter.
+# Отрисовщик получает от игры состояние клеток и сам решает,
+# какие объекты холста создать или изменить.
+
+import tkinter as tk
+
+from engine_base import np
+from viewport import Viewport
+
+# Цвета клеток и сетки
+ALIVE_COLOR = 'black'
+DEAD_COLOR = 'white'
+DYING_COLOR = 'gray'  # угасающая клетка (правила Generations)
+GRID_COLOR = 'lightgray'
+OUTSIDE_COLOR = 'gainsboro'  # фон холста за краем поля
+
+
+def cell_color(state):
+    """Цвет клетки по её состоянию: True/1 — жива, False/0 — мертва, больше — угасает."""
+    if state == 1:
+        return ALIVE_COLOR
+    return DYING_COLOR if state else DEAD_COLOR
+
+
+class CanvasRenderer:
+    """
+    Отрисовщик на прямоугольниках холста. Прямоугольник создаётся один раз
+    для каждой видимой клетки (см. Viewport), его номер (id) хранится в таблице items.
+    При каждом кадре перекрашиваются только клетки, изменившие состояние
+    со времени прошлого кадра, — остальные объекты холста не трогаются.
+    После сдвига или смены масштаба прямоугольники создаются заново.
+    При уменьшении (несколько клеток на пиксель) пиксель чёрный, если
+    в его квадрате есть хоть одна живая клетка.
+    """
+
+    name = "canvas"
+
+    def __init__(self, canvas, rows, cols, cell_size, viewport=None):
+        self.canvas = canvas
+        self.rows = rows
+        self.cols = cols
+        self.cell_size = cell_size
+        # Без viewport видно всё поле в масштабе cell_size — как на холсте размером с поле
+        self.viewport = viewport or Viewport(rows, cols, cols * cell_size, rows * cell_size, cell_size)
+        # Сколько клеток перекрашено в последнем кадре
+        self.last_updated = 0
+        self.reset()
+
+    def reset(self):
+        """Удаляет всё с холста и заново создаёт по прямоугольнику на видимую клетку (или пиксель)."""
+        self.canvas.delete("all")
+        view = self.viewport
+        self.version = view.version
+        self.window = view.view()
+        top, left, height, width, block = self.window
+        size = view.scale
+        x0, y0 = view.position(top, left)
+        # Сетка видна только на крупных клетках, на мелких она закрыла бы сами клетки
+        outline = GRID_COLOR if size >= 4 else ""
+        # items[row][col] — номер прямоугольника видимой клетки на холсте
+        self.items = [
+            [
+                self.canvas.create_rectangle(
+                    x0 + col * size, y0 + row * size, x0 + (col + 1) * size, y0 + (row + 1) * size,
+                    fill=DEAD_COLOR, outline=outline
+                )
+                for col in range(-(-width // block))
+            ]
+            for row in range(-(-height // block))
+        ]
+        # Что сейчас нарисовано на холсте: с этим сравнивается каждый новый кадр
+        self.shown = [[False] * len(line) for line in self.items]
+
+    def update_cell(self, row, col, alive):
+        """Перекрашивает одну клетку, если она видна и её цвет на холсте другой."""
+        if self.version != self.viewport.version:
+            return  # видимая часть сменилась: следующий кадр всё равно нарисует её заново
+        top, left, height, width, block = self.window
+        row, col = row - top, col - left
+        if not (0 <= row < height and 0 <= col < width) or block > 1:
+            return
+        if self.shown[row][col] != alive:
+            self.shown[row][col] = alive
+            self.canvas.itemconfig(self.items[row][col], fill=cell_color(alive))
+
+    def visible_cells(self, source):
+        """Состояния видимых клеток (или пикселей при уменьшении) списком списков."""
+        top, left, height, width, block = self.window
+        if np is not None:
+            if block > 1:
+                return (source.block_counts(top, left, height, width, block) > 0).tolist()
+            return source.region(top, left, height, width).tolist()
+        # Без NumPy: при уменьшении пиксель показывает левую верхнюю клетку своего квадрата
+        cells = source.to_list()
+        return [line[left:left + width:block] for line in cells[top:top + height:block]]
+
+    def render(self, engine):
+        """
+        Рисует кадр по текущему состоянию движка (или снимка).
+        Строки, не изменившиеся с прошлого кадра, пропускаются целиком
+        (сравнение списков выполняется внутри Python и стоит дёшево),
+        в остальных перекрашиваются только переключившиеся клетки.
+        """
+        if self.version != self.viewport.version:
+            self.reset()
+        # Забираем у движка видимую часть поля одним вызовом
+        cells = self.visible_cells(engine)
+        updated = 0
+        itemconfig = self.canvas.itemconfig
+        for row, new_row in enumerate(cells):
+            shown_row = self.shown[row]
+            if new_row == shown_row:
+                continue
+            items_row = self.items[row]
+            for col, state in enumerate(new_row):
+                if state != shown_row[col]:
+                    itemconfig(items_row[col], fill=cell_color(state))
+                    updated += 1
+            self.shown[row] = list(new_row)
+        self.last_updated = updated
+        return updated
+
+
+class ImageRenderer:
+    """
+    Отрисовщик одной картинкой: видимая часть поля — это один tk.PhotoImage
+    на холсте. Каждый кадр видимые клетки превращаются в байтовый буфер
+    (1 байт на пиксель, формат PGM — серое изображение), который целиком
+    передаётся в картинку. Клетка размером в несколько пикселей получается
+    растяжением буфера, а при уменьшении пиксель показывает долю живых
+    клеток в своём квадрате. Работа зависит от размера холста, а не поля,
+    поэтому подходит для полей в десятки тысяч строк и столбцов.
+    """
+
+    name = "image"
+
+    # Яркость пикселя живой, мёртвой и угасающей клетки (0 — чёрный, 255 — белый)
+    ALIVE_PIXEL = 0
+    DEAD_PIXEL = 255
+    DYING_PIXEL = 128
+    # При уменьшении пиксель с хотя бы одной живой клеткой не светлее этого,
+    # чтобы одинокий глайдер был заметен среди пустоты
+    SPARSE_PIXEL = 220
+
+    def __init__(self, canvas, rows, cols, cell_size, viewport=None):
+        self.canvas = canvas
+        self.rows = rows
+        self.cols = cols
+        self.cell_size = max(1, int(cell_size))
+        self.viewport = viewport or Viewport(rows, cols, cols * self.cell_size, rows * self.cell_size, cell_size)
+        self.last_updated = 0
+        self.reset()
+
+    def reset(self):
+        """Удаляет всё с холста и создаёт одну картинку под видимую часть поля."""
+        self.canvas.delete("all")
+        self.size = (0, 0)
+        self.image = tk.PhotoImage(width=1, height=1)
+        self.item = self.canvas.create_image(0, 0, image=self.image, anchor=tk.NW)
+        self.version = None
+        self.place()
+
+    def place(self):
+        """Подгоняет размер и положение картинки под видимую часть поля."""
+        view = self.viewport
+        top, left, height, width, _ = view.view()
+        size = (view.pixels(width), view.pixels(height))
+        if size != self.size:
+            self.size = size
+            self.image.configure(width=size[0], height=size[1])
+            self.image.put(DEAD_COLOR, to=(0, 0, size[0], size[1]))
+        self.canvas.coords(self.item, *view.position(top, left))
+        self.version = view.version
+
+    def update_cell(self, row, col, alive):
+        """Перекрашивает одну клетку — прямоугольник пикселей картинки."""
+        view = self.viewport
+        if self.version != view.version or view.block > 1:
+            return  # следующий кадр всё равно нарисует видимую часть заново
+        top, left, height, width, _ = view.view()
+        if not (top <= row < top + height and left <= col < left + width):
+            return
+        size = view.scale
+        x, y = (col - left) * size, (row - top) * size
+        self.image.put(cell_color(alive), to=(x, y, x + size, y + size))
+
+    def pixels(self, engine):
+        """
+        Возвращает байты изображения видимой части поля (по байту на пиксель,
+        строка за строкой): каждая клетка растянута до scale x scale пикселей,
+        а при уменьшении пиксель — доля живых клеток в квадрате block x block.
+        """
+        view = self.viewport
+        top, left, height, width, block = view.view()
+        size = view.scale
+        if np is not None:
+            if block > 1:
+                # Корень из доли живых: редкие клетки видны, плотный суп не сливается в чёрное
+                counts = engine.block_counts(top, left, height, width, block)
+                share = np.sqrt(counts / float(block * block))
+                gray = (self.DEAD_PIXEL - (self.DEAD_PIXEL - self.ALIVE_PIXEL) * share).astype(np.uint8)
+                occupied = counts > 0
+                gray[occupied] = np.minimum(gray[occupied], self.SPARSE_PIXEL)
+                return gray.tobytes()
+            # Вектором: состояние -> яркость, затем повторяем строки и столбцы size раз
+            cells = engine.region(top, left, height, width)
+            gray = np.where(cells == 1, self.ALIVE_PIXEL, self.DEAD_PIXEL).astype(np.uint8)
+            dying = cells > 1
+            if dying.any():
+                gray[dying] = self.DYING_PIXEL
+            if size > 1:
+                gray = np.repeat(np.repeat(gray, size, axis=0), size, axis=1)
+            return gray.tobytes()
+        # Без NumPy: собираем каждую строку из готовых кусков по size байт;
+        # при уменьшении пиксель показывает левую верхнюю клетку своего квадрата
+        alive_px = bytes([self.ALIVE_PIXEL]) * size
+        dead_px = bytes([self.DEAD_PIXEL]) * size
+        dying_px = bytes([self.DYING_PIXEL]) * size
+        lines = []
+        for row in engine.to_list()[top:top + height:block]:
+            line = b"".join(
+                alive_px if state == 1 else dying_px if state else dead_px
+                for state in row[left:left + width:block]
+            )
+            lines.append(line * size)
+        return b"".join(lines)
+
+    def render(self, engine):
+        """Рисует кадр: пересобирает буфер видимой части и целиком загружает его в картинку."""
+        if self.version != self.viewport.version:
+            self.place()
+        width, height = self.size
+        if not width or not height:
+            self.last_updated = 0
+            return 0
+        header = f"P5 {width} {height} 255\n".encode("ascii")
+        self.image.configure(data=header + self.pixels(engine), format="PPM")
+        _, _, rows, cols, _ = self.viewport.view()
+        self.last_updated = rows * cols
+        return self.last_updated
+
+
+# Реестр отрисовщиков: имя -> класс
+RENDERERS = {
+    CanvasRenderer.name: CanvasRenderer,
+    ImageRenderer.name: ImageRenderer,
+}
+
+# Начиная с такого числа клеток режим "auto" рисует поле картинкой:
+# прямоугольники холста на таких полях уже слишком медленные
+IMAGE_THRESHOLD = 20_000
+
+
+def create_renderer(name, canvas, rows, cols, cell_size, image_threshold=IMAGE_THRESHOLD, viewport=None):
+    """
+    Создаёт отрисовщик по имени. Имя "auto" (или None) выбирает прямоугольники
+    холста, если видно не больше image_threshold клеток, и картинку иначе
+    (и всегда при уменьшении, когда на пиксель приходится несколько клеток).
+    """
+    if name in (None, "auto"):
+        name = choose_renderer(viewport, rows, cols, image_threshold)
+    if name not in RENDERERS:
+        raise ValueError(f"Неизвестный отрисовщик: {name!r}. Доступны: {', '.join(RENDERERS)}")
+    return RENDERERS[name](canvas, rows, cols, cell_size, viewport)
+
+
+def choose_renderer(viewport, rows, cols, image_threshold=IMAGE_THRESHOLD):
+    """Имя отрисовщика для режима "auto" при таком масштабе и размере видимой части."""
+    if viewport is None:
+        return ImageRenderer.name if rows * cols > image_threshold else CanvasRenderer.name
+    _, _, height, width, block = viewport.view()
+    if block > 1 or height * width > image_threshold:
+        return ImageRenderer.name
+    return CanvasRenderer.name
@@ -0,0 +1,255 @@
+# Правила игры Жизнь и родственных клеточных автоматов.
+#
+# Правило задаётся строкой (rulestring) в одной из общепринятых записей:
+#   B3/S23        — "B/S": при скольких соседях клетка рождается (B) и выживает (S);
+#   23/3          — старая запись "S/B" без букв;
+#   B2/S/C3, /2/3 — правила Generations: у клетки C состояний, погибая,
+#                   она не исчезает сразу, а угасает C - 2 поколения;
+#   R5,C0,M1,S34..58,B34..45,NM — Larger than Life: окрестность радиуса R
+#                   (NM — квадрат, NN — ромб), M1 — сама клетка тоже считается.
+#
+# При создании правило "компилируется" в таблицу переходов
+# table[состояние][число живых соседей] -> новое состояние
+# (и в отрезки чисел соседей для векторных движков).
+# Движки только смотрят в эту таблицу, поэтому разбирать правило
+# на каждой клетке не нужно: одно обращение к таблице на клетку.
+
+from engine_base import GENERATIONS, LARGER, LIFE
+
+# Виды окрестности
+MOORE = "M"          # квадрат (2R + 1) x (2R + 1) без центра
+VON_NEUMANN = "N"    # ромб: клетки на расстоянии |dr| + |dc| <= R
+
+# Наибольший радиус окрестности: при большем счётчики соседей
+# и таблица переходов становятся неразумно большими
+MAX_RADIUS = 20
+
+
+class Rule:
+    """
+    Правило клеточного автомата и его таблица переходов.
+
+    birth и survive — множества чисел живых соседей, при которых мёртвая
+    клетка рождается и живая выживает (сама клетка в число соседей не входит);
+    states — число состояний (2 — обычная Жизнь); radius и neighborhood — окрестность.
+    Соседями считаются только живые клетки (состояние 1), угасающие — нет.
+    """
+
+    def __init__(self, birth, survive, states=2, radius=1, neighborhood=MOORE):
+        if not 2 <= states <= 256:
+            raise ValueError(f"Число состояний должно быть от 2 до 256, а не {states}")
+        if not 1 <= radius <= MAX_RADIUS:
+            raise ValueError(f"Радиус окрестности должен быть от 1 до {MAX_RADIUS}, а не {radius}")
+        if neighborhood not in (MOORE, VON_NEUMANN):
+            raise ValueError(f"Неизвестная окрестность {neighborhood!r}: бывает M (квадрат) или N (ромб)")
+        self.states = states
+        self.radius = radius
+        self.neighborhood = neighborhood
+        # Смещения (dr, dc) к соседям клетки
+        self.offsets = [
+            (dr, dc)
+            for dr in range(-radius, radius + 1)
+            for dc in range(-radius, radius + 1)
+            if (dr or dc) and (neighborhood == MOORE or abs(dr) + abs(dc) <= radius)
+        ]
+        self.max_neighbors = len(self.offsets)
+        wrong = [n for n in (*birth, *survive) if not 0 <= n <= self.max_neighbors]
+        if wrong:
+            raise ValueError(
+                f"У клетки не бывает {wrong[0]} соседей: в этой окрестности их от 0 до {self.max_neighbors}"
+            )
+        self.birth = frozenset(birth)
+        self.survive = frozenset(survive)
+        self.compile()
+
+    @property
+    def kind(self):
+        """Семейство правила: LIFE, GENERATIONS или LARGER (см. engine_base.py)."""
+        if self.states > 2:
+            return GENERATIONS
+        if self.radius > 1 or self.neighborhood != MOORE:
+            return LARGER
+        return LIFE
+
+    def compile(self):
+        """
+        Строит таблицу переходов table[состояние][число соседей].
+        У правил с двумя состояниями в таблице True/False, чтобы поле
+        движков на списках оставалось списком True/False, как и раньше.
+        Для векторных движков множества соседей ещё раскладываются на отрезки
+        подряд идущих чисел: при скольких соседях клетка будет жива в любом
+        случае (always), только если была мертва (birth_only) и только если
+        была жива (survive_only). Каждый отрезок — одно-два сравнения со
+        всем полем сразу, а отрезков обычно один-три.
+        """
+        counts = range(self.max_neighbors + 1)
+        if self.states == 2:
+            self.table = [
+                [n in self.birth for n in counts],
+                [n in self.survive for n in counts],
+            ]
+        else:
+            # Живая клетка, не выжившая по правилу, переходит в состояние 2 и дальше
+            # угасает: 2 -> 3 -> ... -> states - 1 -> 0, не обращая внимания на соседей
+            dying = [(state + 1) % self.states for state in range(2, self.states)]
+            self.table = [
+                [1 if n in self.birth else 0 for n in counts],
+                [1 if n in self.survive else 2 for n in counts],
+                *[[after] * len(counts) for after in dying],
+            ]
+        self.always = to_ranges(self.birth & self.survive)
+        self.birth_only = to_ranges(self.birth - self.survive)
+        self.survive_only = to_ranges(self.survive - self.birth)
+
+    def __eq__(self, other):
+        return isinstance(other, Rule) and str(self) == str(other)
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __repr__(self):
+        return f"Rule({str(self)!r})"
+
+    def __str__(self):
+        """Правило в канонической записи: B3/S23, B2/S/C3 или R5,C0,M0,S33..57,B34..45,NM."""
+        if self.radius > 1 or self.neighborhood != MOORE:
+            return ",".join([
+                f"R{self.radius}",
+                f"C{self.states if self.states > 2 else 0}",
+                "M0",
+                f"S{format_ranges(self.survive)}",
+                f"B{format_ranges(self.birth)}",
+                f"N{self.neighborhood}",
+            ])
+        text = f"B{''.join(map(str, sorted(self.birth)))}/S{''.join(map(str, sorted(self.survive)))}"
+        return text + (f"/C{self.states}" if self.states > 2 else "")
+
+
+def to_ranges(numbers):
+    """Раскладывает множество чисел на отрезки подряд идущих: {3, 4, 5, 8} -> [(3, 5), (8, 8)]."""
+    parts = []
+    for n in sorted(numbers):
+        if parts and parts[-1][1] == n - 1:
+            parts[-1][1] = n
+        else:
+            parts.append([n, n])
+    return [(low, high) for low, high in parts]
+
+
+def format_ranges(numbers):
+    """Записывает множество чисел отрезками через точку с запятой: {3, 4, 5, 8} -> '3..5;8'."""
+    return ";".join(str(a) if a == b else f"{a}..{b}" for a, b in to_ranges(numbers))
+
+
+def parse_ranges(text):
+    """Разбирает '34..45', '2-3' или '3..5;8' в множество чисел."""
+    numbers = set()
+    for part in filter(None, text.split(";")):
+        low, sep, high = part.replace("..", "-").partition("-")
+        if not low.isdigit() or (sep and not high.isdigit()):
+            raise ValueError(f"Не получается разобрать диапазон {part!r}")
+        numbers.update(range(int(low), int(high if sep else low) + 1))
+    return numbers
+
+
+def parse_digits(text, letter):
+    """Разбирает список соседей вида '36' (каждая цифра — отдельное число)."""
+    if not text.isdigit() and text:
+        raise ValueError(f"После {letter} должны идти цифры, а не {text!r}")
+    return {int(char) for char in text}
+
+
+def parse_larger(text):
+    """Разбирает запись Larger than Life: R5,C0,M1,S34..58,B34..45,NM."""
+    fields = {}
+    for part in text.split(","):
+        part = part.strip()
+        if not part or part[0] not in "RCMSBN" or part[0] in fields:
+            raise ValueError(f"Непонятная часть правила: {part!r}")
+        fields[part[0]] = part[1:]
+    if "S" not in fields or "B" not in fields:
+        raise ValueError("В правиле Larger than Life нужны части S и B")
+    if not fields.get("R", "1").isdigit() or not fields.get("C", "0").isdigit():
+        raise ValueError("R и C должны быть числами")
+    radius = int(fields.get("R", "1"))
+    states = max(int(fields.get("C", "0")), 2)
+    neighborhood = fields.get("N", MOORE)
+    survive = parse_ranges(fields["S"])
+    birth = parse_ranges(fields["B"])
+    if fields.get("M", "0") == "1":
+        # Сама клетка входит в сумму: для живой клетки соседей на одного меньше,
+        # а мёртвой не набрать полную сумму окрестности (в записи её иногда оставляют)
+        survive = {n - 1 for n in survive if n > 0}
+        cells = (2 * radius + 1) ** 2 if neighborhood == MOORE else 2 * radius * (radius + 1) + 1
+        birth = {n for n in birth if n < cells}
+    elif fields.get("M", "0") != "0":
+        raise ValueError("M бывает только 0 или 1")
+    return Rule(birth, survive, states, radius, neighborhood)
+
+
+def parse_rule(text):
+    """
+    Разбирает строку правила и возвращает объект Rule.
+    Понимает записи B3/S23, S23/B3, 23/3 (S/B), B2/S/C3, /2/3 (S/B/C)
+    и R5,C0,M1,S34..58,B34..45,NM. При ошибке бросает ValueError.
+    """
+    text = text.strip().upper().replace(" ", "")
+    if not text:
+        raise ValueError("Пустая строка правила")
+    if text in PRESETS_UPPER:
+        text = PRESETS_UPPER[text].upper()
+    if text.startswith("R") and "," in text:
+        return parse_larger(text)
+
+    parts = text.split("/")
+    birth = survive = None
+    states = 2
+    bare = []  # части без буквы — их смысл зависит от положения
+    for part in parts:
+        if part[:1] == "B":
+            birth = parse_digits(part[1:], "B")
+        elif part[:1] == "S":
+            survive = parse_digits(part[1:], "S")
+        elif part[:1] in ("C", "G"):
+            if not part[1:].isdigit():
+                raise ValueError(f"После {part[0]} должно идти число состояний, а не {part[1:]!r}")
+            states = int(part[1:])
+        else:
+            bare.append(part)
+
+    if birth is None and survive is None:
+        # Запись без букв: S/B или S/B/C
+        if len(bare) not in (2, 3):
+            raise ValueError(f"Не получается разобрать правило {text!r}: ожидается вида B3/S23")
+        survive = parse_digits(bare[0], "S")
+        birth = parse_digits(bare[1], "B")
+        if len(bare) == 3:
+            if not bare[2].isdigit():
+                raise ValueError(f"Число состояний должно быть числом, а не {bare[2]!r}")
+            states = int(bare[2])
+    elif birth is None or survive is None or len(bare) > 1:
+        raise ValueError(f"Не получается разобрать правило {text!r}: ожидается вида B3/S23")
+    elif bare:
+        # B3/S23/8 — последним числом дано число состояний
+        if not bare[0].isdigit():
+            raise ValueError(f"Число состояний должно быть числом, а не {bare[0]!r}")
+        states = int(bare[0])
+    return Rule(birth, survive, max(states, 2))
+
+
+# Известные правила: название -> запись. Названия можно вводить вместо записи
+PRESETS = {
+    "Conway": "B3/S23",
+    "HighLife": "B36/S23",
+    "Day & Night": "B3678/S34678",
+    "Seeds": "B2/S",
+    "Life without Death": "B3/S012345678",
+    "Brian's Brain": "B2/S/C3",
+    "Star Wars": "B2/S345/C4",
+    "Bosco": "R5,C0,M1,S34..58,B34..45,NM",
+    "Majority": "R4,C0,M1,S41..81,B41..81,NM",
+}
+PRESETS_UPPER = {name.upper().replace(" ", ""): rule for name, rule in PRESETS.items()}
+
+# Классические правила Конвея — по умолчанию у всех движков
+CONWAY = parse_rule("B3/S23")
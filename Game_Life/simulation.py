@@ -0,0 +1,526 @@
+# Ядро симуляции игры Жизнь без графического интерфейса.
+# Здесь нет ни одного вызова tkinter: ядро можно запускать на сервере
+# без экрана (см. cli.py), а окно игры (main.py) только показывает его состояние.
+
+import random
+import threading
+import time
+from collections import deque
+
+from cycles import CycleDetector
+from editing import EditQueue, apply_edits, stamp_cells
+from engine_base import count_blocks, np
+from engines import ENGINES, create_engine, default_engine
+from rules import parse_rule
+from soup import soup_blocks
+from stats import CENSUS_EVERY, StatsTracker
+from timeline import Timeline
+
+# Сколько контрольных точек самое большее оставляет один прыжок advance()
+JUMP_CHECKPOINTS = 64
+
+
+class Simulation:
+    """
+    Поле игры Жизнь вместе с номером поколения и замерами времени.
+    Хранит движок и делает шаги; как и когда рисовать — решает тот, кто им пользуется.
+    """
+
+    def __init__(self, rows, cols, engine="auto", detect_cycles=True, topology=None, rule=None,
+                 checkpoint_interval=100, history_bytes=64 << 20, track_stats=False,
+                 census_every=CENSUS_EVERY):
+        self.rows = rows
+        self.cols = cols
+        # rule — объект Rule (см. rules.py), по умолчанию B3/S23
+        self.engine = create_engine(engine, rows, cols, topology, rule)
+        # Номер текущего поколения (0 — начальное поле)
+        self.generation = 0
+        # Время последнего шага (или прыжка на много поколений) в миллисекундах
+        self.step_ms = 0.0
+        # Поиск зацикливания (см. cycles.py): cycle — найденный повтор или None
+        self.detector = CycleDetector(rows, cols) if detect_cycles else None
+        self.cycle = None
+        # Окно сдвинули — статистику надо начать заново перед следующим шагом
+        self.view_moved = False
+        # Контрольные точки для перемотки назад (см. timeline.py): раз в
+        # checkpoint_interval поколений, не больше history_bytes байт; None — без истории
+        self.timeline = Timeline(checkpoint_interval, history_bytes) if checkpoint_interval else None
+        # Время последней перемотки (seek) в миллисекундах
+        self.seek_ms = 0.0
+        # Зерно последнего случайного поля: по нему его можно получить снова
+        self.seed = None
+        # Статистика по поколениям (см. stats.py): ведётся по изменениям за шаг,
+        # последняя запись — в last_stats; каждая запись уходит в stats_sink
+        # (например, StatsSink — файл CSV или JSON Lines), если он задан
+        self.stats = StatsTracker(census_every=census_every) if track_stats else None
+        self.last_stats = None
+        self.stats_sink = None
+        # Правки мышью, ждущие наложения на поле (кисть, прямоугольник, штамп)
+        self.edits = EditQueue()
+        self.edited()
+
+    def edited(self):
+        """
+        Вызывается после любой правки поля: кроме истории хэшей забываются
+        контрольные точки будущих поколений (их будущего больше не будет),
+        а текущее поле становится новой точкой.
+        """
+        self.reset_cycles()
+        self.reset_stats()
+        if self.timeline is not None:
+            self.timeline.truncate(self.generation)
+            self.timeline.record(self.engine, self.generation)
+
+    def checkpoint(self):
+        """Сохраняет контрольную точку, если с прошлой прошло достаточно поколений."""
+        if self.timeline is not None and self.timeline.due(self.generation):
+            self.timeline.record(self.engine, self.generation)
+
+    def reset_stats(self):
+        """Пересчитывает статистику по всему полю (после правки, прыжка, сдвига окна)."""
+        self.view_moved = False
+        if self.stats is not None:
+            self.record_stats(self.stats.reset(self.engine, self.generation))
+
+    def record_stats(self, stats):
+        """Запоминает запись статистики и отдаёт её в stats_sink."""
+        self.last_stats = stats
+        if self.stats_sink is not None:
+            self.stats_sink.write(stats)
+
+    def reset_cycles(self):
+        """
+        Забывает найденный повтор и историю хэшей. Вызывается после любой
+        правки поля: старые поколения больше не предсказывают будущие.
+        """
+        self.cycle = None
+        if self.detector is not None:
+            self.detector.reset_history()
+            self.detector.update(self.engine, self.generation)
+
+    def step(self):
+        """
+        Вычисляет следующее поколение и накладывает на него правки,
+        накопленные за время шага (см. apply_edits).
+        """
+        if self.view_moved:
+            self.reset_stats()
+        started = time.perf_counter()
+        self.engine.step()
+        self.step_ms = (time.perf_counter() - started) * 1000
+        self.generation += 1
+        if self.apply_edits():
+            return  # поле правили: поиск циклов, статистика и история уже начаты заново
+        if self.detector is not None:
+            found = self.detector.update(self.engine, self.generation)
+            if self.cycle is None:
+                self.cycle = found
+        if self.stats is not None:
+            self.record_stats(self.stats.update(self.engine, self.generation, stable=self.cycle is not None))
+        self.checkpoint()
+
+    def advance(self, generations):
+        """
+        Продвигает поле на generations поколений вперёд.
+        Если поле уже зациклилось с периодом P, то через generations
+        поколений оно будет таким же, как через generations % P, —
+        поэтому считается только остаток (перемотка).
+        """
+        started = time.perf_counter()
+        if self.cycle is not None:
+            self.engine.advance(generations % self.cycle.period)
+        elif self.timeline is not None:
+            # По пути оставляем контрольные точки, чтобы потом было куда вернуться;
+            # на длинном прыжке — реже, не больше JUMP_CHECKPOINTS штук. Шаг между
+            # точками — степень двойки: HashLife проходит его одним прыжком RESULT
+            stride = max(self.timeline.interval, -(-generations // JUMP_CHECKPOINTS))
+            stride = 1 << (stride - 1).bit_length()
+            done = 0
+            while done < generations:
+                chunk = min(stride, generations - done)
+                self.engine.advance(chunk)
+                done += chunk
+                if done < generations and self.timeline.due(self.generation + done):
+                    self.timeline.record(self.engine, self.generation + done)
+        else:
+            self.engine.advance(generations)
+        self.step_ms = (time.perf_counter() - started) * 1000
+        self.generation += generations
+        if self.detector is not None:
+            # Промежуточные поколения не видели — начинаем историю хэшей заново,
+            # но уже найденный повтор остаётся в силе
+            cycle = self.cycle
+            self.detector.reset_history()
+            self.detector.update(self.engine, self.generation)
+            self.cycle = cycle
+        # Промежуточных поколений статистика тоже не видела — пересчёт по полю
+        self.reset_stats()
+        self.checkpoint()
+
+    def seek(self, generation):
+        """
+        Переходит к поколению generation — вперёд или назад. Назад (и вперёд
+        через уже посчитанные поколения) поле восстанавливается из ближайшей
+        контрольной точки не позже generation, а остаток досчитывается шагами.
+        Если нужная точка уже вытеснена из истории — ValueError, поле не меняется.
+        """
+        if generation < 0:
+            raise ValueError(f"Номер поколения не может быть отрицательным: {generation}")
+        started = time.perf_counter()
+        checkpoint = self.timeline.find(generation) if self.timeline is not None else None
+        if generation < self.generation or (checkpoint is not None and checkpoint.generation > self.generation):
+            if checkpoint is None:
+                oldest = self.timeline.oldest if self.timeline is not None else None
+                raise ValueError(
+                    f"Поколения {generation} уже нет в истории"
+                    + (f": самое раннее сохранённое — {oldest}" if oldest is not None else "")
+                )
+            if checkpoint.rule != self.engine.rule:
+                # Поле тогда считалось по другим правилам — возвращаем и их
+                name = self.engine.name
+                if not ENGINES[name].supports_rule(checkpoint.rule):
+                    name = default_engine(self.engine.topology, checkpoint.rule)
+                self.replace_engine(name, self.engine.topology, checkpoint.rule)
+            self.timeline.restore(self.engine, checkpoint)
+            self.generation = checkpoint.generation
+            # Найденный повтор мог начаться позже точки — ищем заново
+            self.reset_cycles()
+        self.advance(generation - self.generation)
+        self.seek_ms = (time.perf_counter() - started) * 1000
+
+    def run(self, generations, stop_on_cycle=False):
+        """
+        Считает generations поколений подряд с максимальной скоростью
+        и возвращает словарь с замерами: сколько прошло секунд,
+        поколений в секунду и клеток в секунду.
+        С stop_on_cycle поколения считаются по одному и счёт
+        прекращается, как только поле зациклилось. Если ведётся статистика,
+        поколения тоже считаются по одному — запись нужна на каждое.
+        """
+        started = time.perf_counter()
+        if (stop_on_cycle and self.detector is not None) or self.stats is not None:
+            first = self.generation
+            while self.generation - first < generations and not (stop_on_cycle and self.cycle is not None):
+                self.step()
+            generations = self.generation - first
+        else:
+            self.advance(generations)
+        seconds = time.perf_counter() - started
+        per_second = generations / seconds if seconds > 0 else float("inf")
+        return {
+            "generations": generations,
+            "seconds": seconds,
+            "generations_per_second": per_second,
+            "cells_per_second": per_second * self.rows * self.cols,
+        }
+
+    def clear(self):
+        """Делает все клетки мёртвыми и сбрасывает счётчик поколений."""
+        self.engine.clear()
+        self.generation = 0
+        self.seed = None
+        self.edited()
+
+    def pan(self, rows, cols):
+        """
+        Сдвигает окно по бесконечной плоскости. Зацикливание ищется по всей
+        плоскости, и сдвиг его не касается, а статистика окна начнётся заново —
+        но не здесь, а перед следующим шагом: так сдвиг безопасно делать и во
+        время работы фонового потока.
+        """
+        self.engine.pan(rows, cols)
+        self.view_moved = True
+
+    def set_cell(self, row, col, alive):
+        """Меняет одну клетку поля (правка пользователем)."""
+        self.engine.set(row, col, alive)
+        self.edited()
+
+    def edit_limits(self):
+        """
+        Размер поля (rows, cols), за которым клетки правок отбрасываются, или
+        (None, None) на бесконечной плоскости, где уходить за край окна можно.
+        """
+        if self.engine.can_pan:
+            return None, None
+        return self.rows, self.cols
+
+    def apply_edits(self):
+        """
+        Накладывает на поле все накопленные правки (self.edits, см. editing.py)
+        одной пачкой. Окно на паузе вызывает это раз в кадр, а во время игры
+        это делает step() сразу после шага в потоке симуляции — правки
+        попадают в только что посчитанное поколение и не мешают шагу.
+        Возвращает True, если правки были.
+        """
+        edits = self.edits.take()
+        if not edits:
+            return False
+        apply_edits(self.engine, edits)
+        self.edited()
+        return True
+
+    def load(self, cells):
+        """Загружает начальное поле из двумерного списка True/False."""
+        self.engine.load(cells)
+        self.generation = 0
+        self.seed = None
+        self.edited()
+
+    def load_pattern(self, pattern, top=None, left=None, apply_rule=True):
+        """
+        Загружает фигуру (объект Pattern из patterns.py) на пустое поле так,
+        чтобы её левый верхний угол оказался в клетке (top, left) окна;
+        по умолчанию фигура ставится в центр окна. Клетки, не поместившиеся
+        в ограниченное поле или тор, отбрасываются, на бесконечной плоскости — остаются.
+        Если в файле указано правило и apply_rule включён, поле переходит на него.
+        """
+        if apply_rule and pattern.rule:
+            self.change_rule(parse_rule(pattern.rule))
+        _, _, height, width = pattern.bounds()
+        if top is None:
+            top = (self.rows - height) // 2
+        if left is None:
+            left = (self.cols - width) // 2
+        self.engine.clear()
+        if pattern.has_dying():
+            # Угасающие клетки правил Generations ставятся вместе с живыми
+            self.engine.set_states(*stamp_cells(pattern, top, left, *self.edit_limits(), states=True))
+        else:
+            self.engine.set_cells(*stamp_cells(pattern, top, left, *self.edit_limits()))
+        self.generation = 0
+        self.seed = None
+        self.edited()
+
+    def randomize(self, count=None, density=None, seed=None, region=None):
+        """
+        Очищает поле и заполняет его случайным супом: ровно count живых клеток
+        или каждая клетка жива с вероятностью density (см. soup.py).
+        region = (top, left, height, width) — заполнить только этот прямоугольник
+        окна (для поиска фигур в маленьком супе), по умолчанию всё окно.
+        С одним и тем же зерном seed получается одно и то же поле на любом движке;
+        без зерна оно выбирается случайно и запоминается в self.seed.
+        """
+        top, left, height, width = region or (0, 0, self.rows, self.cols)
+        if not self.engine.can_pan:
+            # Ограниченное поле и тор: прямоугольник не выходит за края окна
+            bottom, right = min(top + height, self.rows), min(left + width, self.cols)
+            top, left = max(top, 0), max(left, 0)
+            height, width = max(bottom - top, 0), max(right - left, 0)
+        self.seed = random.randrange(1 << 63) if seed is None else seed
+        self.engine.clear()
+        for row, block in soup_blocks(height, width, density, count, self.seed):
+            self.engine.set_block(top + row, left, block)
+        self.generation = 0
+        self.edited()
+
+    def change_engine(self, name, topology=None):
+        """
+        Создаёт новый движок и переносит в него поле: между движками
+        бесконечной плоскости (sparse, hashlife) — всю плоскость вместе со
+        сдвигом окна, в остальных случаях — видимое окно (см. replace_engine).
+        Если топология не задана, остаётся текущая (когда новый движок
+        её поддерживает) или берётся основная топология нового движка.
+        """
+        if topology is None and self.engine.topology in ENGINES[name].topologies:
+            topology = self.engine.topology
+        if name == self.engine.name and topology == self.engine.topology:
+            return
+        changed_topology = topology != self.engine.topology
+        self.replace_engine(name, topology, self.engine.rule)
+        if changed_topology and self.timeline is not None:
+            # На другой топологии у поля другое прошлое и будущее — история не годится
+            self.timeline.clear()
+            self.edited()
+
+    def change_rule(self, rule):
+        """
+        Переходит на другое правило (объект Rule), сохраняя видимое поле.
+        Если текущий движок это правило не умеет, выбирается подходящий
+        для той же топологии; если такого нет — ValueError, поле не меняется.
+        """
+        if rule == self.engine.rule:
+            return
+        name = self.engine.name
+        if not ENGINES[name].supports_rule(rule):
+            name = default_engine(self.engine.topology, rule)
+        self.replace_engine(name, self.engine.topology, rule)
+        self.edited()
+
+    def replace_engine(self, name, topology, rule):
+        """
+        Создаёт новый движок и переносит в него поле. С бесконечной плоскости
+        на бесконечную плоскость переносится вся плоскость и сдвиг окна,
+        в остальных случаях — видимое окно.
+        """
+        engine = create_engine(name, self.rows, self.cols, topology, rule)
+        if self.engine.can_pan and engine.can_pan:
+            # Координаты клеток отсчитываются от угла окна — он у движков общий
+            engine.top, engine.left = self.engine.top, self.engine.left
+            engine.set_states(*self.engine.cell_states())
+        else:
+            engine.load(self.engine.to_list())
+        self.engine.close()
+        self.engine = engine
+        self.reset_cycles()
+        self.reset_stats()
+
+
+class Snapshot:
+    """
+    Неизменяемый снимок поля на одном поколении. Отрисовщики принимают его
+    так же, как движок: у снимка есть rows, cols, to_list(), to_array(),
+    region() и block_counts().
+
+    view = (top, left, height, width, block) — видимая на холсте часть поля
+    (см. Viewport.view). С NumPy копируется только этот прямоугольник, а при
+    уменьшении (block > 1) — лишь число живых клеток в каждом квадрате
+    block x block, так что снимок большого поля стоит столько же, сколько
+    на холсте пикселей. Всё, что вне скопированного, снимок считает мёртвым.
+    """
+
+    def __init__(self, engine, generation, step_ms, view=None):
+        self.rows = engine.rows
+        self.cols = engine.cols
+        self.generation = generation
+        self.step_ms = step_ms
+        # С NumPy копируем массив (это быстро), без него — список списков
+        self.view = view or (0, 0, self.rows, self.cols, 1)
+        self.counts = None
+        if np is None:
+            self.view = (0, 0, self.rows, self.cols, 1)
+            self.cells = engine.to_list()
+        elif self.view[4] > 1:
+            self.cells = np.zeros((0, 0), dtype=np.uint8)
+            self.counts = np.array(engine.block_counts(*self.view), dtype=np.uint32)
+        else:
+            self.cells = np.array(engine.region(*self.view[:4]), dtype=np.uint8)
+
+    def to_list(self):
+        """Поле снимка списком списков (0 — мертва, 1 — жива, больше — угасает)."""
+        if np is not None:
+            return self.to_array().tolist()
+        return self.cells
+
+    def to_array(self):
+        """Поле снимка массивом NumPy uint8 (нужен NumPy)."""
+        return self.region(0, 0, self.rows, self.cols)
+
+    def region(self, top, left, height, width):
+        """
+        Прямоугольник поля массивом NumPy uint8 (нужен NumPy). Если он выходит
+        за скопированную часть (окно успели сдвинуть после шага), там клетки мертвы.
+        """
+        view_top, view_left, view_height, view_width = self.view[:4]
+        if self.counts is not None:
+            view_height = view_width = 0  # клеток не копировали — только суммы по квадратам
+        if (view_top <= top and view_left <= left and top + height <= view_top + view_height
+                and left + width <= view_left + view_width):
+            return self.cells[top - view_top:top - view_top + height, left - view_left:left - view_left + width]
+        out = np.zeros((height, width), dtype=np.uint8)
+        # Пересечение запрошенного прямоугольника со скопированным
+        r0, c0 = max(top, view_top), max(left, view_left)
+        r1 = min(top + height, view_top + view_height)
+        c1 = min(left + width, view_left + view_width)
+        if r0 < r1 and c0 < c1:
+            out[r0 - top:r1 - top, c0 - left:c1 - left] = self.cells[
+                r0 - view_top:r1 - view_top, c0 - view_left:c1 - view_left]
+        return out
+
+    def block_counts(self, top, left, height, width, block):
+        """Живые клетки в квадратах block x block (нужен NumPy), как у движка."""
+        if self.counts is not None and (top, left, height, width, block) == self.view:
+            return self.counts
+        if self.counts is not None:
+            # Масштаб или окно успели смениться после шага — снимок этого не видел
+            return np.zeros((-(-height // block), -(-width // block)), dtype=np.uint32)
+        return count_blocks(self.region(top, left, height, width) == 1, block, block)
+
+
+class BackgroundRunner:
+    """
+    Считает поколения в отдельном потоке, не мешая окну реагировать на клики.
+    После каждого поколения кладёт снимок поля в очередь ограниченной длины:
+    если окно не успевает рисовать, самые старые снимки выбрасываются
+    (пропуск кадров), а симуляция продолжает идти со своей скоростью.
+
+    interval_ms — желаемый промежуток между поколениями (0 — как можно быстрее),
+    не связанный с частотой кадров окна. Если stop_on_cycle включён,
+    поток сам останавливается, как только поле зациклилось.
+    """
+
+    def __init__(self, sim, interval_ms=200, queue_size=3, stop_on_cycle=False):
+        self.sim = sim
+        self.interval_ms = interval_ms
+        self.stop_on_cycle = stop_on_cycle
+        # Очередь снимков: deque с maxlen сам выбрасывает самые старые
+        self.frames = deque(maxlen=queue_size)
+        # Видимая часть поля (top, left, height, width, block), см. Snapshot:
+        # окно меняет её при сдвиге и смене масштаба, None — всё поле
+        self.view = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        # === СЧЁТЧИКИ ===
+        self.produced = 0  # сколько снимков положено в очередь
+        self.consumed = 0  # сколько снимков забрало окно
+
+    @property
+    def running(self):
+        """True, пока поток симуляции работает."""
+        return self.thread is not None and self.thread.is_alive()
+
+    @property
+    def dropped(self):
+        """Сколько кадров пропущено: посчитаны, но так и не показаны."""
+        return self.produced - self.consumed - len(self.frames)
+
+    def start(self):
+        """Запускает поток симуляции, если он ещё не запущен."""
+        if self.running:
+            return
+        # Снимки от прошлого запуска уже неактуальны (поле могли очистить или изменить)
+        self.frames.clear()
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.loop, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Останавливает поток и ждёт, пока он закончит текущий шаг."""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def loop(self):
+        """Тело потока: шаг, снимок, пауза до времени следующего поколения."""
+        next_time = time.perf_counter()
+        while not self.stop_event.is_set():
+            self.sim.step()
+            self.frames.append(Snapshot(self.sim.engine, self.sim.generation, self.sim.step_ms, self.view))
+            self.produced += 1
+            if self.stop_on_cycle and self.sim.cycle is not None:
+                break  # дальше поле будет только повторяться
+
+            next_time += self.interval_ms / 1000
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                # wait, а не sleep: остановка прерывает паузу сразу
+                self.stop_event.wait(delay)
+            else:
+                # Шаг оказался дольше интервала — не копим долг, идём дальше
+                next_time = time.perf_counter()
+
+    def latest(self):
+        """
+        Забирает из очереди самый свежий снимок (или None, если новых нет).
+        Более старые снимки выбрасываются — их уже поздно показывать.
+        """
+        snapshot = None
+        while True:
+            try:
+                snapshot = self.frames.popleft()
+            except IndexError:
+                break
+        if snapshot is not None:
+            self.consumed += 1
+        return snapshot
@@ -0,0 +1,120 @@
+# Случайные начальные поля ("суп") для игры Жизнь.
+#
+# Раньше случайное поле собиралось так: список всех координат поля,
+# random.sample из него и оживление клеток по одной. На поле 10000 x 10000
+# это 100 миллионов кортежей. Здесь поле заполняется блоками по миллиону
+# клеток прямо из генератора NumPy: каждый блок — массив True/False,
+# который движок целиком накладывает на поле (Engine.set_block).
+#
+# Суп зависит только от размера, плотности (или числа клеток) и зерна,
+# но не от движка: с одним зерном все движки получают одно и то же поле.
+# Без NumPy используется random.Random — поле тоже повторяется по зерну,
+# но не совпадает с полем, полученным с NumPy.
+#
+# Ровно count живых клеток делятся между блоками заранее, делением списка
+# блоков пополам: сколько клеток попадёт в левую половину — гипергеометрическое
+# распределение (выбор без возвращения). Генератор NumPy не принимает
+# в нём половины от миллиарда клеток, поэтому делить по блокам по очереди
+# ("этот блок против всех оставшихся") на больших полях нельзя, а половины
+# быстро становятся меньше предела.
+
+import random
+
+from engine_base import np
+
+# Сколько клеток в одном блоке супа: блок занимает несколько мегабайт памяти
+SOUP_BLOCK = 1 << 20
+# Половины выборки rng.hypergeometric должны быть меньше миллиарда клеток
+HYPERGEOMETRIC_LIMIT = 10 ** 9
+
+
+def soup_blocks(height, width, density=None, count=None, seed=None):
+    """
+    Случайно заполняет прямоугольник height x width: каждая клетка жива
+    с вероятностью density или ровно count клеток живы (задаётся одно из двух).
+    Выдаёт пары (строка, блок): блок — полоса из нескольких строк целиком,
+    массив NumPy bool (без NumPy — список списков True/False), а строка —
+    номер его первой строки в прямоугольнике.
+    """
+    if (density is None) == (count is None):
+        raise ValueError("Для случайного поля нужно задать либо плотность, либо число клеток")
+    if density is not None and not 0 <= density <= 1:
+        raise ValueError(f"Плотность должна быть от 0 до 1, а не {density}")
+    total = height * width
+    if count is not None:
+        count = max(0, min(int(count), total))  # больше, чем клеток в прямоугольнике, не оживить
+    block_rows = max(1, SOUP_BLOCK // max(width, 1))
+    if np is None:
+        yield from python_soup_blocks(height, width, density, count, seed, block_rows)
+        return
+
+    rng = np.random.default_rng(seed)
+    tops = range(0, height, block_rows)
+    if count is not None:
+        counts = split_count(rng, [min(block_rows, height - top) * width for top in tops], count)
+    for index, top in enumerate(tops):
+        rows = min(block_rows, height - top)
+        if density is not None:
+            # float32 вдвое быстрее float64, а точности для плотности хватает
+            block = rng.random((rows, width), dtype=np.float32) < density
+        else:
+            block = np.zeros(rows * width, dtype=bool)
+            block[rng.choice(rows * width, counts[index], replace=False)] = True
+            block = block.reshape(rows, width)
+        yield top, block
+
+
+def split_count(rng, sizes, count):
+    """
+    Делит count живых клеток между блоками из sizes клеток так, как если бы
+    они выбирались из всех блоков сразу без возвращения. Список блоков
+    делится пополам, пока в части не останется один блок. Возвращает список
+    чисел живых клеток в блоках.
+    """
+    starts = [0]
+    for size in sizes:
+        starts.append(starts[-1] + size)
+    counts = [0] * len(sizes)
+    parts = [(0, len(sizes), count)]
+    while parts:
+        first, last, picked = parts.pop()
+        if last - first == 1:
+            counts[first] = picked
+            continue
+        if not picked:
+            continue
+        middle = (first + last) // 2
+        left = split_hypergeometric(rng, starts[middle] - starts[first], starts[last] - starts[middle], picked)
+        parts.append((first, middle, left))
+        parts.append((middle, last, picked - left))
+    return counts
+
+
+def split_hypergeometric(rng, good, bad, picked):
+    """
+    Сколько из picked клеток, выбранных без возвращения из good + bad,
+    попадёт в первые good. Если половины не меньше HYPERGEOMETRIC_LIMIT
+    (на поле больше двух миллиардов клеток), берётся нормальное приближение
+    с теми же средним и дисперсией: на таких числах разница между ними
+    намного меньше разброса, а общее число живых клеток остаётся точным.
+    """
+    if good < HYPERGEOMETRIC_LIMIT and bad < HYPERGEOMETRIC_LIMIT:
+        return int(rng.hypergeometric(good, bad, picked))
+    total = good + bad
+    mean = picked * good / total
+    variance = mean * bad / total * (total - picked) / (total - 1)
+    value = int(round(rng.normal(mean, variance ** 0.5)))
+    return min(max(value, picked - bad, 0), picked, good)
+
+
+def python_soup_blocks(height, width, density, count, seed, block_rows):
+    """То же, что soup_blocks, но на random.Random — когда NumPy нет."""
+    rng = random.Random(seed)
+    if count is not None:
+        alive = set(rng.sample(range(height * width), count))
+    for top in range(0, height, block_rows):
+        rows = range(top, min(top + block_rows, height))
+        if density is not None:
+            yield top, [[rng.random() < density for _ in range(width)] for _ in rows]
+        else:
+            yield top, [[r * width + c in alive for c in range(width)] for r in rows]
@@ -0,0 +1,594 @@
+# Статистика поля по поколениям для исследования супов: число живых клеток,
+# рамка вокруг них, рождения и смерти за шаг и перепись объектов
+# (блоки, мигалки, глайдеры...).
+#
+# Пересчитывать всё это по полю после каждого шага — почти второй шаг.
+# Поэтому StatsTracker ведёт статистику по изменениям: движок отдаёт
+# ожившие и умершие за шаг клетки (Engine.live_changes, а движки на
+# массивах — масками Engine.live_change_masks), число живых
+# клеток поправляется на рождения минус смерти, а рамка ищется по счётчикам
+# живых клеток в каждой строке и каждом столбце — их тоже поправляют
+# только изменившиеся клетки. Рамка изменившихся клеток (dirty) показывает,
+# где на поле ещё что-то происходит.
+#
+# Перепись идёт только по успокоившимся областям. Поле поделено на плитки
+# TILE x TILE; плитка успокоилась, если уже SETTLE_STEPS шагов подряд
+# в ней меняются одни и те же клетки: у устойчивых фигур не меняется
+# ничего, у осцилляторов периода 2 клетки переключаются туда и обратно.
+# Объект узнаётся по форме с учётом поворотов и отражений, а у
+# осцилляторов — по объединению обеих фаз. Глайдеры не успокаиваются
+# никогда, поэтому их ищем ещё и в неспокойных плитках, где живых клеток мало.
+#
+# Записи уходят в CSV или JSON Lines через StatsSink: файл пишет отдельный
+# поток, а симуляция только кладёт записи в очередь и не ждёт диска.
+
+import csv
+import json
+import queue
+import threading
+from collections import Counter, deque
+
+from engine_base import np
+from patterns import open_pattern_file
+
+# Сторона плитки, по которым следим, успокоилось ли поле
+TILE = 16
+# Сколько шагов подряд плитка должна повторяться, чтобы считаться спокойной
+SETTLE_STEPS = 8
+# Раз в сколько поколений делать перепись (0 — не делать)
+CENSUS_EVERY = 100
+# Неспокойная плитка, где живых клеток не больше этого, проверяется на глайдеры
+GLIDER_TILE_CELLS = 12
+# Столько живых клеток у глайдера в любой фазе
+GLIDER_CELLS = 5
+# Объекты крупнее этого не узнаются по форме, а сразу считаются прочими
+MAX_OBJECT_CELLS = 64
+
+# Множители для хэша клетки в подписи плитки (нечётные 64-битные константы)
+ROW_MIX = 0x9E3779B97F4A7C15
+COL_MIX = 0xC2B2AE3D27D4EB4F
+MASK64 = (1 << 64) - 1
+# Ключ плитки — одно число: строка плитки * TILE_KEY + столбец плитки
+TILE_KEY = 1 << 32
+
+
+# === ИЗВЕСТНЫЕ ОБЪЕКТЫ ===
+# Форма в одной из фаз: 'O' — живая клетка, '.' — мёртвая, '/' — новая строка.
+# Остальные фазы осцилляторов и глайдера получаются шагами по B3/S23.
+OBJECTS = {
+    "block": ("OO/OO", 1),
+    "beehive": (".OO./O..O/.OO.", 1),
+    "loaf": (".OO./O..O/.O.O/..O.", 1),
+    "boat": ("OO./O.O/.O.", 1),
+    "ship": ("OO./O.O/.OO", 1),
+    "tub": (".O./O.O/.O.", 1),
+    "pond": (".OO./O..O/O..O/.OO.", 1),
+    "long boat": ("OO../O.O./.O.O/..O.", 1),
+    "barge": (".O../O.O./.O.O/..O.", 1),
+    "snake": ("OO.O/O.OO", 1),
+    "aircraft carrier": ("OO../O..O/..OO", 1),
+    "blinker": ("OOO", 2),
+    "toad": (".OOO/OOO.", 2),
+    "beacon": ("OO../O.../...O/..OO", 2),
+    "glider": (".O./..O/OOO", 4),
+}
+GLIDER = "glider"
+OTHER = "other"
+
+
+def parse_shape(text):
+    """Клетки формы из строки вида 'OO/OO'."""
+    return {(r, c) for r, line in enumerate(text.split("/")) for c, char in enumerate(line) if char == "O"}
+
+
+def conway_step(cells):
+    """Одно поколение B3/S23 для небольшого множества клеток на пустой плоскости."""
+    counts = Counter((r + dr, c + dc) for r, c in cells for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc)
+    return {cell for cell, n in counts.items() if n == 3 or (n == 2 and cell in cells)}
+
+
+def translated(cells):
+    """Форма клеток без учёта положения: клетки, сдвинутые к началу координат."""
+    top = min(r for r, _ in cells)
+    left = min(c for _, c in cells)
+    return tuple(sorted((r - top, c - left) for r, c in cells))
+
+
+def canonical(cells):
+    """
+    Форма клеток без учёта положения, поворотов и отражений: наименьший
+    из восьми вариантов, сдвинутых к началу координат.
+    """
+    best = None
+    for flip_r, flip_c, swap in ((1, 1, 0), (1, -1, 0), (-1, 1, 0), (-1, -1, 0),
+                                 (1, 1, 1), (1, -1, 1), (-1, 1, 1), (-1, -1, 1)):
+        shape = translated([(c * flip_c, r * flip_r) if swap else (r * flip_r, c * flip_c) for r, c in cells])
+        if best is None or shape < best:
+            best = shape
+    return best
+
+
+def build_object_table():
+    """
+    Таблица "форма -> название": каждая фаза объекта, а у осцилляторов
+    ещё и объединение фаз (так осциллятор выглядит в переписи спокойных плиток).
+    """
+    table = {}
+    for name, (text, period) in OBJECTS.items():
+        phases = [parse_shape(text)]
+        for _ in range(period - 1):
+            phases.append(conway_step(phases[-1]))
+        for phase in phases:
+            table.setdefault(canonical(phase), name)
+        if period == 2:
+            table.setdefault(canonical(set().union(*phases)), name)
+    return table
+
+
+OBJECT_TABLE = build_object_table()
+
+
+# === ЗАПИСЬ СТАТИСТИКИ ===
+
+class StepStats:
+    """
+    Статистика одного поколения. Рамки — (top, left, height, width)
+    в координатах окна или None, если клеток нет; births/deaths — None,
+    если движок изменений не ведёт; census — словарь "объект -> сколько"
+    или None, если перепись на этом поколении не делалась.
+    """
+
+    # Столбцы CSV в порядке записи; settled_tiles — сколько занятых плиток
+    # успокоилось (только на поколениях с переписью)
+    FIELDS = ("generation", "population", "births", "deaths", "bbox", "dirty", "settled_tiles", "census")
+
+    def __init__(self, generation, population, births=None, deaths=None, bbox=None, dirty=None,
+                 settled_tiles=None, census=None):
+        self.generation = generation
+        self.population = population
+        self.births = births
+        self.deaths = deaths
+        self.bbox = bbox                    # рамка вокруг всех живых клеток
+        self.dirty = dirty                  # рамка вокруг клеток, изменившихся за шаг
+        self.settled_tiles = settled_tiles  # сколько занятых плиток успокоилось
+        self.census = census
+
+    def as_dict(self):
+        """Запись словарём (для JSON)."""
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+    def as_row(self):
+        """Запись строкой CSV: рамки — 'top left height width', перепись — 'block=12 blinker=3'."""
+        row = self.as_dict()
+        for name in ("bbox", "dirty"):
+            row[name] = " ".join(map(str, row[name])) if row[name] else ""
+        row["census"] = " ".join(f"{name}={count}" for name, count in self.census.items()) if self.census else ""
+        return [row[name] if row[name] is not None else "" for name in self.FIELDS]
+
+
+class StatsTracker:
+    """
+    Ведёт статистику поля по изменениям за шаг. После правки поля,
+    прыжка или сдвига окна вызывается reset() (полный пересчёт),
+    после каждого обычного шага — update().
+
+    Движки на массивах NumPy отдают изменения масками (live_change_masks):
+    счётчики поправляются суммами по строкам и столбцам внутри рамки
+    изменений, без перевода клеток в координаты. Остальные движки отдают
+    координаты (live_changes). На ограниченном поле и торе счётчики и плитки
+    хранятся в массивах, на бесконечной плоскости и без NumPy — в словарях.
+    """
+
+    def __init__(self, tile=TILE, settle=SETTLE_STEPS, census_every=CENSUS_EVERY):
+        self.tile = tile
+        self.settle = settle
+        self.census_every = census_every
+        self.population = 0
+        # Число живых клеток в каждой строке и каждом столбце
+        self.row_counts = Counter()
+        self.col_counts = Counter()
+        # Плитка -> поколение, на котором она последний раз была неспокойной:
+        # массив (строка плитки, столбец плитки) или словарь по ключу плитки
+        self.restless = {}
+        # Изменения прошлого шага, с которыми сравнивается следующий:
+        # подписи плиток (словарь) или (top, left, маска) рамки изменений
+        self.signatures = {}
+        self.last_flips = None
+        # Умершие на последнем шаге клетки — вторая фаза осцилляторов для переписи
+        self.last_died = None
+        # Форма (сдвинутая к началу координат) -> название объекта
+        self.names = {}
+        # С этого поколения статистика ведётся заново: раньше все плитки неспокойны
+        self.since = 0
+        self.last_census = 0
+
+    def reset(self, engine, generation):
+        """Пересчитывает статистику по всему полю и начинает следить за плитками заново."""
+        engine.track_changes = True
+        rows, cols = engine.live_cells()
+        self.population = engine.population()
+        if np is not None and not engine.can_pan:
+            self.row_counts = np.bincount(np.asarray(rows, dtype=np.intp), minlength=engine.rows)
+            self.col_counts = np.bincount(np.asarray(cols, dtype=np.intp), minlength=engine.cols)
+            tiles = (-(-engine.rows // self.tile), -(-engine.cols // self.tile))
+            self.restless = np.full(tiles, generation, dtype=np.int64)
+        else:
+            self.row_counts = Counter(int(r) for r in rows)
+            self.col_counts = Counter(int(c) for c in cols)
+            self.restless = {}
+        self.signatures = {}
+        self.last_flips = self.last_died = None
+        self.since = self.last_census = generation
+        return StepStats(generation, self.population, bbox=self.bbox())
+
+    def update(self, engine, generation, stable=False):
+        """
+        Поправляет статистику после шага на поколение generation.
+        stable — поле целиком зациклилось (тогда перепись идёт по всему полю,
+        даже если движок изменений не ведёт).
+        """
+        masks = engine.live_change_masks() if isinstance(self.restless, np.ndarray if np else ()) else None
+        changes = engine.live_changes() if masks is None else None
+        if masks is not None:
+            stats = self.apply_masks(masks, generation)
+        elif changes is not None:
+            stats = self.apply(changes, generation)
+        else:
+            # Движок изменений не знает — пересчитываем по полю; плитки тогда
+            # не успокаиваются, и перепись находит объекты только на зациклившемся поле
+            last_census = self.last_census
+            stats = self.reset(engine, generation)
+            self.last_census = last_census
+        if self.census_every and generation - self.last_census >= self.census_every:
+            self.last_census = generation
+            stats.census, stats.settled_tiles = self.census(engine, generation, stable)
+        return stats
+
+    def apply(self, changes, generation):
+        """Поправляет счётчики по координатам ожививших и умерших клеток одного шага."""
+        rows, cols, born = changes
+        if np is not None:
+            born = np.asarray(born, dtype=bool)
+            births = int(np.count_nonzero(born))
+        else:
+            births = sum(1 for flag in born if flag)
+        deaths = len(born) - births
+        self.population += births - deaths
+        if isinstance(self.row_counts, Counter):
+            for r, c, flag in zip(rows, cols, born):
+                delta = 1 if flag else -1
+                self.row_counts[int(r)] += delta
+                self.col_counts[int(c)] += delta
+        else:
+            delta = born.astype(np.int64) * 2 - 1
+            np.add.at(self.row_counts, rows, delta)
+            np.add.at(self.col_counts, cols, delta)
+        # Сравниваем изменения в каждой плитке с изменениями на прошлом шаге
+        signatures = tile_signatures(rows, cols, self.tile)
+        previous = self.signatures
+        for key in signatures.keys() | previous.keys():
+            if signatures.get(key, 0) != previous.get(key, 0):
+                self.mark_restless(key, generation)
+        self.signatures = signatures
+        self.last_died = [(int(r), int(c)) for r, c, flag in zip(rows, cols, born) if not flag]
+        return StepStats(generation, self.population, births, deaths, self.bbox(), bounds(rows, cols))
+
+    def apply_masks(self, masks, generation):
+        """
+        Поправляет счётчики по маскам изменений: (top, left, flipped, alive) —
+        кто изменился и кто жив внутри прямоугольника с углом (top, left).
+        Дальше работа идёт только внутри рамки изменившихся клеток.
+        """
+        top, left, flipped, alive = masks
+        changed_rows = np.flatnonzero(flipped.any(axis=1))
+        box = died = dirty = None
+        births = deaths = 0
+        if changed_rows.size:
+            r0, r1 = changed_rows[0], changed_rows[-1] + 1
+            changed_cols = np.flatnonzero(flipped[r0:r1].any(axis=0))
+            c0, c1 = changed_cols[0], changed_cols[-1] + 1
+            flipped, alive = flipped[r0:r1, c0:c1], alive[r0:r1, c0:c1]
+            born = flipped & alive
+            died = flipped & ~alive
+            births, deaths = int(np.count_nonzero(born)), int(np.count_nonzero(died))
+            top, left = top + int(r0), left + int(c0)
+            bottom, right = top + flipped.shape[0], left + flipped.shape[1]
+            # +1 для ожившей клетки, -1 для умершей; суммы по uint8/int8 в 2-3 раза
+            # быстрее сумм по bool
+            delta = born.view(np.int8) - died.view(np.int8)
+            self.row_counts[top:bottom] += delta.sum(axis=1, dtype=np.int32)
+            self.col_counts[left:right] += delta.sum(axis=0, dtype=np.int32)
+            self.population += births - deaths
+            box = (top, left, flipped)
+            died = (top, left, died)
+            dirty = (top, left, bottom - top, right - left)
+        self.track_tile_masks(box, generation)
+        self.last_died = died
+        return StepStats(generation, self.population, births, deaths, self.bbox(), dirty)
+
+    def bbox(self):
+        """Рамка вокруг живых клеток по счётчикам строк и столбцов."""
+        if isinstance(self.row_counts, Counter):
+            rows = [r for r, n in self.row_counts.items() if n]
+            cols = [c for c, n in self.col_counts.items() if n]
+            if not rows:
+                return None
+            top, left = min(rows), min(cols)
+            return top, left, max(rows) - top + 1, max(cols) - left + 1
+        rows = np.flatnonzero(self.row_counts)
+        if not rows.size:
+            return None
+        cols = np.flatnonzero(self.col_counts)
+        top, left = int(rows[0]), int(cols[0])
+        return top, left, int(rows[-1]) - top + 1, int(cols[-1]) - left + 1
+
+    # === СПОКОЙНЫЕ ПЛИТКИ ===
+
+    def track_tile_masks(self, box, generation):
+        """
+        Сравнивает маску изменений с маской прошлого шага внутри общей рамки,
+        выровненной по плиткам: плитки, где они разные, неспокойны.
+        """
+        boxes = [b for b in (self.last_flips, box) if b is not None]
+        self.last_flips = box
+        if not boxes:
+            return
+        tile = self.tile
+        top = min(b[0] for b in boxes) // tile * tile
+        left = min(b[1] for b in boxes) // tile * tile
+        bottom = -(-max(b[0] + b[2].shape[0] for b in boxes) // tile) * tile
+        right = -(-max(b[1] + b[2].shape[1] for b in boxes) // tile) * tile
+        region = np.zeros((bottom - top, right - left), dtype=bool)
+        for b_top, b_left, mask in boxes:
+            region[b_top - top:b_top - top + mask.shape[0], b_left - left:b_left - left + mask.shape[1]] ^= mask
+        rows, cols = region.shape[0] // tile, region.shape[1] // tile
+        # Сначала сворачиваем строки плитки (непрерывные куски памяти), потом столбцы
+        restless = region.reshape(rows, tile, -1).any(axis=1).reshape(rows, cols, tile).any(axis=2)
+        self.restless[top // tile:top // tile + rows, left // tile:left // tile + cols][restless] = generation
+
+    def mark_restless(self, key, generation):
+        """Помечает плитку неспокойной на поколении generation."""
+        if isinstance(self.restless, dict):
+            self.restless[key] = generation
+        else:
+            self.restless[key // TILE_KEY, key % TILE_KEY] = generation
+
+    def settled(self, key, generation):
+        """True, если плитка с ключом key уже SETTLE_STEPS шагов повторяется."""
+        if isinstance(self.restless, dict):
+            last = self.restless.get(key, self.since)
+        else:
+            last = self.restless[key // TILE_KEY, key % TILE_KEY]
+        return generation - last >= self.settle
+
+    def settled_test(self, generation, stable):
+        """Функция "ключ плитки -> спокойна ли" для переписи на поколении generation."""
+        if stable:
+            return lambda key: True
+        if isinstance(self.restless, dict):
+            return lambda key: self.settled(key, generation)
+        # Таблица списками: в переписи плитки проверяются десятки тысяч раз,
+        # а обращение к элементу массива NumPy из Python медленное
+        quiet = (generation - self.restless >= self.settle).tolist()
+        return lambda key: quiet[key // TILE_KEY][key % TILE_KEY]
+
+    def census(self, engine, generation, stable):
+        """
+        Перепись объектов в спокойных плитках (и глайдеров в малолюдных
+        неспокойных). stable — всё поле уже зациклилось, спокойны все плитки.
+        Возвращает (словарь "объект -> сколько", сколько занятых плиток спокойны).
+        """
+        if isinstance(self.restless, dict):
+            # Давно успокоившиеся плитки можно забыть: без записи они спокойны и так
+            self.restless = {key: g for key, g in self.restless.items() if generation - g < self.settle}
+        rows, cols = engine.live_cells()
+        keys = tile_keys(rows, cols, self.tile)
+        if np is not None:
+            occupied, counts = np.unique(keys, return_counts=True)
+            per_tile = dict(zip(occupied.tolist(), counts.tolist()))
+        else:
+            per_tile = Counter(keys)
+
+        is_settled = self.settled_test(generation, stable)
+
+        def is_safe(key):
+            return is_settled(key) or per_tile.get(key, 0) <= GLIDER_TILE_CELLS
+
+        safe = [key for key in per_tile if is_safe(key)]
+        if np is not None:
+            inside = np.isin(keys, safe)
+            cells = set(zip(np.asarray(rows)[inside].tolist(), np.asarray(cols)[inside].tolist()))
+        else:
+            safe = set(safe)
+            cells = {(r, c) for r, c, key in zip(rows, cols, keys) if key in safe}
+        # В спокойной плитке осциллятор переписывается по объединению обеих фаз:
+        # добавляем клетки, умершие на последнем шаге
+        for r, c in self.died_cells():
+            if is_settled(tile_key(r, c, self.tile)):
+                cells.add((r, c))
+
+        limit = None if engine.can_pan else (engine.rows, engine.cols)
+        found = Counter()
+        for component in components(cells):
+            around = tiles_around(component, self.tile, limit)
+            if all(is_settled(key) for key in around):
+                found[self.classify(component)] += 1
+            # В неспокойных плитках ищем только глайдеры, и только вдали
+            # от многолюдных плиток: там объект ещё не сложился
+            elif len(component) == GLIDER_CELLS and all(is_safe(key) for key in around):
+                if self.classify(component) == GLIDER:
+                    found[GLIDER] += 1
+        settled_tiles = sum(1 for key in per_tile if is_settled(key))
+        return dict(sorted(found.items())), settled_tiles
+
+    def classify(self, cells):
+        """Название объекта из связной группы клеток (OTHER, если он не известен)."""
+        if len(cells) > MAX_OBJECT_CELLS:
+            return OTHER
+        # Восемь поворотов и отражений дороже поиска в словаре: запоминаем
+        # название для каждой встреченной формы
+        shape = translated(cells)
+        name = self.names.get(shape)
+        if name is None:
+            name = self.names[shape] = OBJECT_TABLE.get(canonical(cells), OTHER)
+        return name
+
+    def died_cells(self):
+        """Координаты клеток, умерших на последнем шаге."""
+        if self.last_died is None:
+            return []
+        if isinstance(self.last_died, list):
+            return self.last_died
+        top, left, died = self.last_died
+        rows, cols = np.nonzero(died)
+        return list(zip((rows + top).tolist(), (cols + left).tolist()))
+
+
+# === ВСПОМОГАТЕЛЬНЫЕ ФУНКЦИИ ===
+
+def bounds(rows, cols):
+    """Рамка (top, left, height, width) вокруг клеток или None, если клеток нет."""
+    if not len(rows):
+        return None
+    if np is not None:
+        rows, cols = np.asarray(rows), np.asarray(cols)
+        top, left, bottom, right = rows.min(), cols.min(), rows.max(), cols.max()
+    else:
+        top, left, bottom, right = min(rows), min(cols), max(rows), max(cols)
+    return int(top), int(left), int(bottom - top) + 1, int(right - left) + 1
+
+
+def tile_key(row, col, tile):
+    """Ключ плитки, в которой лежит клетка."""
+    return (row // tile) * TILE_KEY + col // tile
+
+
+def tile_keys(rows, cols, tile):
+    """Ключи плиток для многих клеток сразу (с NumPy — массивом)."""
+    if np is not None:
+        return (np.asarray(rows, dtype=np.int64) // tile) * TILE_KEY + np.asarray(cols, dtype=np.int64) // tile
+    return [tile_key(r, c, tile) for r, c in zip(rows, cols)]
+
+
+def tile_signatures(rows, cols, tile):
+    """
+    Подпись изменений в каждой плитке: XOR хэшей изменившихся клеток.
+    Одинаковые подписи на двух шагах подряд — в плитке переключились одни и те же клетки.
+    """
+    if np is None:
+        signatures = {}
+        for r, c in zip(rows, cols):
+            key = tile_key(r, c, tile)
+            signatures[key] = signatures.get(key, 0) ^ (((r * ROW_MIX) ^ (c * COL_MIX)) & MASK64)
+        return signatures
+    if not len(rows):
+        return {}
+    keys = tile_keys(rows, cols, tile)
+    # Переполнение при умножении — просто остаток по модулю 2^64
+    with np.errstate(over="ignore"):
+        hashes = (np.asarray(rows).astype(np.uint64) * np.uint64(ROW_MIX)) ^ (
+            np.asarray(cols).astype(np.uint64) * np.uint64(COL_MIX))
+    order = np.argsort(keys, kind="stable")
+    keys, hashes = keys[order], hashes[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return dict(zip(keys[starts].tolist(), np.bitwise_xor.reduceat(hashes, starts).tolist()))
+
+
+def tiles_around(cells, tile, limit=None):
+    """
+    Ключи плиток, которых касается рамка вокруг клеток, расширенная на одну
+    клетку. limit = (rows, cols) — рамка не выходит за края окна.
+    """
+    top = min(r for r, _ in cells) - 1
+    left = min(c for _, c in cells) - 1
+    bottom = max(r for r, _ in cells) + 1
+    right = max(c for _, c in cells) + 1
+    if limit is not None:
+        top, left = max(top, 0), max(left, 0)
+        bottom, right = min(bottom, limit[0] - 1), min(right, limit[1] - 1)
+    return {
+        tile_row * TILE_KEY + tile_col
+        for tile_row in range(top // tile, bottom // tile + 1)
+        for tile_col in range(left // tile, right // tile + 1)
+    }
+
+
+def components(cells):
+    """Разбивает множество клеток на связные группы (соседи — восемь окружающих клеток)."""
+    left = set(cells)
+    while left:
+        start = left.pop()
+        group = [start]
+        stack = [start]
+        while stack:
+            r, c = stack.pop()
+            for dr in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    cell = (r + dr, c + dc)
+                    if cell in left:
+                        left.remove(cell)
+                        group.append(cell)
+                        stack.append(cell)
+        yield group
+
+
+# === ЗАПИСЬ В ФАЙЛ ===
+
+class StatsSink:
+    """
+    Пишет записи StepStats в CSV или JSON Lines (по расширению: .csv — CSV,
+    иначе JSON Lines; .gz, .bz2, .xz — со сжатием). Файл пишет фоновый поток,
+    а write() только кладёт запись в очередь — симуляция диска не ждёт.
+    """
+
+    def __init__(self, path, fmt=None):
+        name = str(path).lower()
+        for extension in (".gz", ".bz2", ".xz"):
+            name = name.removesuffix(extension)
+        self.fmt = fmt or ("csv" if name.endswith(".csv") else "jsonl")
+        if self.fmt not in ("csv", "jsonl"):
+            raise ValueError(f"Неизвестный формат статистики: {self.fmt!r}. Доступны: csv, jsonl")
+        # Файл открываем сразу, чтобы ошибка (нет папки, нет прав) была видна здесь
+        self.file = open_pattern_file(path, "w")
+        self.queue = queue.SimpleQueue()
+        self.written = 0
+        self.thread = threading.Thread(target=self.loop, daemon=True)
+        self.thread.start()
+
+    def write(self, stats):
+        """Ставит запись в очередь на запись (не блокирует)."""
+        self.queue.put(stats)
+
+    def loop(self):
+        """Фоновый поток: забирает записи пачками и пишет их в файл."""
+        writer = csv.writer(self.file, lineterminator="\n") if self.fmt == "csv" else None
+        if writer is not None:
+            writer.writerow(StepStats.FIELDS)
+        batch = deque()
+        while True:
+            batch.append(self.queue.get())
+            # Всё, что успело накопиться, пишем одной пачкой
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            done = batch[-1] is None
+            for stats in batch:
+                if stats is None:
+                    break
+                if writer is not None:
+                    writer.writerow(stats.as_row())
+                else:
+                    self.file.write(json.dumps(stats.as_dict(), ensure_ascii=False) + "\n")
+                self.written += 1
+            batch.clear()
+            if done:
+                break
+        self.file.close()
+
+    def close(self):
+        """Дописывает всё из очереди и закрывает файл."""
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
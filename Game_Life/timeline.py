@@ -0,0 +1,256 @@
+# История поля: контрольные точки для перемотки назад.
+#
+# Движок хранит только текущее поколение, поэтому вернуться к прошлому
+# можно, только если его где-то сохранили. Раз в interval поколений поле
+# сжимается в контрольную точку и кладётся в кольцевой буфер. Чтобы перейти
+# к поколению N, берётся ближайшая точка не позже N, поле восстанавливается
+# из неё, и оставшиеся поколения досчитываются обычными шагами.
+#
+# Поле в точке — битовая карта (по биту на клетку, а у правил Generations —
+# по байту), сжатая zlib. Битовый движок отдаёт свои слова uint64 как есть —
+# без распаковки поля в байты. Каждая точка, кроме опорных (каждой keyframe_every-й),
+# хранит не само поле, а XOR с предыдущей точкой: у успокоившегося поля он
+# почти весь из нулей и сжимается в сотни байт. У бесконечной плоскости поле
+# может быть сколь угодно большим, поэтому там хранятся координаты живых клеток,
+# а у HashLife — просто корень дерева: его узлы неизменны, и точка не стоит
+# ничего, сколько бы клеток ни было живо.
+# Когда точки занимают больше max_bytes, самые старые выбрасываются.
+
+import bisect
+import time
+import zlib
+from array import array
+from collections import deque
+
+from bitpacked import BitPackedEngine, unpack_words
+from engine_base import np
+from hashlife import Node
+
+# Как закодировано поле в точке
+PACKED = "packed"  # по биту на клетку (два состояния, нужен NumPy)
+BYTES = "bytes"    # по байту на клетку — номер состояния
+CELLS = "cells"    # координаты и состояния непустых клеток (бесконечная плоскость)
+NODE = "node"      # корень дерева HashLife как есть, без сжатия
+WORDS = "words"    # слова uint64 битового движка (по биту на клетку)
+
+# Уровень сжатия zlib: 1 — быстрее всего, а битовые карты жмутся и так хорошо
+COMPRESS_LEVEL = 1
+# Во сколько байт считается точка NODE: сама она — лишь ссылка на корень,
+# а узлы дерева общие с движком и другими точками (их число ограничивает max_nodes движка)
+NODE_BYTES = 64
+
+
+class Checkpoint:
+    """Одна контрольная точка: поколение, правило, окно и сжатое поле."""
+
+    def __init__(self, generation, rule, view, kind, shape, data, delta):
+        self.generation = generation
+        self.rule = rule    # объект Rule, по которому поле считалось
+        self.view = view    # (top, left) окна на бесконечной плоскости или None
+        self.kind = kind    # PACKED, BYTES, CELLS или NODE
+        self.shape = shape  # (rows, cols) окна (у WORDS — слов), число клеток для CELLS, None для NODE
+        self.data = data    # сжатые байты поля (или XOR с предыдущей точкой), у NODE — корень
+        self.delta = delta  # True — data хранит XOR с предыдущей точкой
+
+    @property
+    def size(self):
+        """Сколько байт занимает точка."""
+        return NODE_BYTES if self.kind == NODE else len(self.data)
+
+
+class Timeline:
+    """
+    Кольцевой буфер контрольных точек поля.
+    interval — через сколько поколений делать точку; max_bytes — сколько памяти
+    могут занимать все точки вместе (самые старые вытесняются, но последняя
+    остаётся всегда); keyframe_every — как часто хранить поле целиком, а не XOR.
+    """
+
+    def __init__(self, interval=100, max_bytes=64 << 20, keyframe_every=16):
+        if interval < 1:
+            raise ValueError(f"Интервал между контрольными точками должен быть не меньше 1, а не {interval}")
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.keyframe_every = keyframe_every
+        self.checkpoints = deque()
+        self.total_bytes = 0
+        # Несжатые байты последней точки: от них считается XOR для следующей
+        self.last_raw = None
+        # Сколько точек подряд сохранено как XOR после последней опорной
+        self.deltas_in_row = 0
+        # === ЗАМЕРЫ ===
+        self.last_record_ms = 0.0  # сколько заняло сохранение последней точки
+        self.evicted = 0           # сколько точек вытеснено из-за нехватки памяти
+
+    def __len__(self):
+        return len(self.checkpoints)
+
+    @property
+    def oldest(self):
+        """Самое раннее поколение, к которому можно вернуться, или None."""
+        return self.checkpoints[0].generation if self.checkpoints else None
+
+    def due(self, generation):
+        """True, если на этом поколении пора делать следующую точку."""
+        return not self.checkpoints or generation >= self.checkpoints[-1].generation + self.interval
+
+    def record(self, engine, generation):
+        """Сохраняет поле движка как точку поколения generation."""
+        started = time.perf_counter()
+        kind, shape, raw = encode_state(engine.save_state())
+        last = self.checkpoints[-1] if self.checkpoints else None
+        delta = (
+            last is not None and kind not in (CELLS, NODE) and last.kind == kind and last.shape == shape
+            and self.deltas_in_row + 1 < self.keyframe_every
+        )
+        self.deltas_in_row = self.deltas_in_row + 1 if delta else 0
+        if kind == NODE:
+            data = raw
+        else:
+            data = zlib.compress(xor_bytes(raw, self.last_raw) if delta else raw, COMPRESS_LEVEL)
+        view = (engine.top, engine.left) if engine.can_pan else None
+        checkpoint = Checkpoint(generation, engine.rule, view, kind, shape, data, delta)
+        self.checkpoints.append(checkpoint)
+        self.total_bytes += checkpoint.size
+        self.last_raw = raw
+        self.evict()
+        self.last_record_ms = (time.perf_counter() - started) * 1000
+
+    def evict(self):
+        """Выбрасывает самые старые точки, пока все вместе не уложатся в max_bytes."""
+        while self.total_bytes > self.max_bytes and len(self.checkpoints) > 1:
+            oldest = self.checkpoints.popleft()
+            self.total_bytes -= oldest.size
+            self.evicted += 1
+            following = self.checkpoints[0]
+            if following.delta:
+                # Следующая точка хранила XOR с выброшенной — превращаем её в опорную
+                raw = xor_bytes(zlib.decompress(following.data), zlib.decompress(oldest.data))
+                self.total_bytes -= following.size
+                following.data = zlib.compress(raw, COMPRESS_LEVEL)
+                following.delta = False
+                self.total_bytes += following.size
+
+    def truncate(self, generation):
+        """
+        Забывает точки начиная с поколения generation: после правки поля
+        они описывают будущее, которого уже не будет.
+        """
+        while self.checkpoints and self.checkpoints[-1].generation >= generation:
+            self.total_bytes -= self.checkpoints.pop().size
+        self.last_raw = self.raw(len(self.checkpoints) - 1) if self.checkpoints else None
+        # Цепочка XOR продолжается от последней оставшейся точки
+        self.deltas_in_row = 0
+        for checkpoint in reversed(self.checkpoints):
+            if not checkpoint.delta:
+                break
+            self.deltas_in_row += 1
+
+    def clear(self):
+        """Забывает все точки."""
+        self.truncate(float("-inf"))
+
+    def find(self, generation):
+        """Ближайшая точка не позже поколения generation или None."""
+        generations = [checkpoint.generation for checkpoint in self.checkpoints]
+        index = bisect.bisect_right(generations, generation) - 1
+        return self.checkpoints[index] if index >= 0 else None
+
+    def raw(self, index):
+        """Несжатые байты поля точки с номером index: XOR накладываются от ближайшей опорной."""
+        start = index
+        while self.checkpoints[start].delta:
+            start -= 1
+        if self.checkpoints[start].kind == NODE:
+            return self.checkpoints[start].data
+        raw = zlib.decompress(self.checkpoints[start].data)
+        for i in range(start + 1, index + 1):
+            raw = xor_bytes(raw, zlib.decompress(self.checkpoints[i].data))
+        return raw
+
+    def restore(self, engine, checkpoint):
+        """
+        Возвращает поле движка к точке checkpoint (правило движка
+        уже должно совпадать с правилом точки). Окно плоскости остаётся,
+        где его поставил пользователь.
+        """
+        raw = self.raw(self.checkpoints.index(checkpoint))
+        state = decode_state(checkpoint.kind, checkpoint.shape, raw)
+        if checkpoint.kind == WORDS and not isinstance(engine, BitPackedEngine):
+            # Точку сохранил битовый движок, а восстанавливает другой — распаковываем слова
+            state = unpack_words(state, engine.cols)
+        if checkpoint.view is None:
+            engine.restore_state(state)
+            return
+        # Координаты в точке отсчитаны от тогдашнего окна: ставим окно туда,
+        # загружаем поле и возвращаем окно на место
+        dr, dc = checkpoint.view[0] - engine.top, checkpoint.view[1] - engine.left
+        engine.pan(dr, dc)
+        engine.restore_state(state)
+        engine.pan(-dr, -dc)
+
+    def stats(self):
+        """Словарь с расходом памяти: сколько точек, сколько байт на точку и на поколение."""
+        covered = self.checkpoints[-1].generation - self.oldest + 1 if self.checkpoints else 0
+        return {
+            "checkpoints": len(self.checkpoints),
+            "bytes": self.total_bytes,
+            "oldest_generation": self.oldest,
+            "bytes_per_checkpoint": self.total_bytes / len(self.checkpoints) if self.checkpoints else 0.0,
+            "bytes_per_generation": self.total_bytes / covered if covered else 0.0,
+            "evicted": self.evicted,
+            "record_ms": self.last_record_ms,
+        }
+
+
+# === КОДИРОВАНИЕ ПОЛЯ ===
+
+def encode_state(state):
+    """
+    Превращает снимок движка (см. Engine.save_state) в байты.
+    Возвращает (вид кодировки, форма, байты); корень HashLife остаётся как есть.
+    """
+    if isinstance(state, Node):
+        return NODE, None, state
+    if np is not None and isinstance(state, np.ndarray) and state.dtype == np.uint64:
+        return WORDS, state.shape, state.astype("<u8").tobytes()
+    if isinstance(state, tuple):
+        # Бесконечная плоскость: три столбца чисел — строки, столбцы, состояния
+        rows, cols, states = state
+        if np is not None:
+            raw = np.concatenate([np.asarray(column, dtype=np.int64) for column in state]).tobytes()
+        else:
+            raw = b"".join(array("q", column).tobytes() for column in state)
+        return CELLS, len(rows), raw
+    if np is not None:
+        grid = np.asarray(state, dtype=np.uint8)
+        if grid.max(initial=0) <= 1:
+            return PACKED, grid.shape, np.packbits(grid).tobytes()
+        return BYTES, grid.shape, grid.tobytes()
+    shape = (len(state), len(state[0]) if state else 0)
+    return BYTES, shape, bytes(int(value) for row in state for value in row)
+
+
+def decode_state(kind, shape, raw):
+    """Обратное к encode_state: восстанавливает снимок для Engine.restore_state."""
+    if kind == NODE:
+        return raw
+    if kind == WORDS:
+        return np.frombuffer(raw, dtype="<u8").astype(np.uint64, copy=False).reshape(shape)
+    if kind == CELLS:
+        if np is not None:
+            return tuple(np.frombuffer(raw, dtype=np.int64).reshape(3, shape))
+        values = array("q")
+        values.frombytes(raw)
+        return tuple(values[i * shape:(i + 1) * shape].tolist() for i in range(3))
+    rows, cols = shape
+    if kind == PACKED:
+        return np.unpackbits(np.frombuffer(raw, dtype=np.uint8), count=rows * cols).reshape(shape)
+    if np is not None:
+        return np.frombuffer(raw, dtype=np.uint8).reshape(shape)
+    return [list(raw[r * cols:(r + 1) * cols]) for r in range(rows)]
+
+
+def xor_bytes(a, b):
+    """Побитовый XOR двух строк байтов одной длины (через длинные целые Python — это быстро)."""
+    return (int.from_bytes(a, "little") ^ int.from_bytes(b, "little")).to_bytes(len(a), "little")
@@ -0,0 +1,162 @@
+# Видимая часть поля: масштаб и сдвиг холста относительно поля.
+#
+# Холст больше не растягивается на всё поле: он имеет постоянный размер,
+# а Viewport решает, какие клетки в него попадают. Масштаб — одна из
+# ступеней ZOOM_LEVELS: сколько пикселей приходится на клетку (1, 2, 4...)
+# или сколько клеток приходится на пиксель (2, 4, 8... при уменьшении).
+# При уменьшении пиксель показывает долю живых клеток в своём квадрате
+# клеток, поэтому даже поле 10000 x 10000 целиком помещается в окно.
+#
+# Положение поля хранится в пикселях холста: (x, y) — где на холсте
+# находится левый верхний угол клетки (0, 0). Сдвиг мышью просто меняет
+# x и y, а отрисовщики берут у движка только прямоугольник visible().
+
+# Ступени масштаба: (пикселей на клетку, клеток на пиксель)
+ZOOM_LEVELS = (
+    (1, 64), (1, 32), (1, 16), (1, 8), (1, 4), (1, 2),
+    (1, 1), (2, 1), (3, 1), (4, 1), (6, 1), (8, 1), (12, 1), (16, 1), (24, 1), (32, 1),
+)
+
+# Наибольший размер холста по умолчанию (пиксели)
+VIEW_WIDTH = 1200
+VIEW_HEIGHT = 800
+
+
+class Viewport:
+    """
+    Масштаб и положение поля rows x cols на холсте width x height пикселей.
+    scale — пикселей на клетку, block — клеток по каждой стороне на один пиксель
+    (одно из двух всегда равно 1).
+    """
+
+    def __init__(self, rows, cols, width, height, cell_size=1):
+        self.rows = rows
+        self.cols = cols
+        self.width = width
+        self.height = height
+        # Начальный масштаб — ровно cell_size пикселей на клетку, даже если
+        # такой ступени нет: колесо мыши дальше переводит на соседние ступени
+        self.scale = max(1, int(cell_size))
+        self.block = 1
+        self.x = 0
+        self.y = 0
+        # Растёт при каждом изменении масштаба или сдвиге — отрисовщики по нему
+        # понимают, что картинку надо собрать заново
+        self.version = 0
+        if not self.fits():
+            self.fit()
+
+    def describe(self):
+        """Масштаб для строки состояния: '4:1' — 4 пикселя на клетку, '1:8' — 8 клеток на пиксель."""
+        return f"{self.scale}:{self.block}"
+
+    def pixels(self, cells):
+        """Сколько пикселей занимают cells клеток подряд."""
+        return -(-cells * self.scale // self.block)
+
+    def fits(self):
+        """True, если всё поле помещается на холсте при текущем масштабе."""
+        return self.pixels(self.rows) <= self.height and self.pixels(self.cols) <= self.width
+
+    def fit(self):
+        """Выбирает самый крупный масштаб, при котором видно всё поле, и ставит поле в угол холста."""
+        self.scale, self.block = ZOOM_LEVELS[0]
+        for scale, block in ZOOM_LEVELS[1:]:
+            previous = self.scale, self.block
+            self.scale, self.block = scale, block
+            if not self.fits():
+                self.scale, self.block = previous
+                break
+        self.x = self.y = 0
+        self.changed()
+
+    def resize(self, width, height):
+        """Холст поменял размер."""
+        self.width, self.height = width, height
+        self.clamp()
+        self.changed()
+
+    def zoom(self, steps, x=None, y=None):
+        """
+        Меняет масштаб на steps ступеней (плюс — крупнее), не сдвигая клетку
+        под точкой (x, y) холста (по умолчанию — центр холста).
+        Возвращает True, если масштаб изменился.
+        """
+        # Ступени сравниваются по числу пикселей на клетку: scale / block
+        ratio = self.scale / self.block
+        if steps > 0:
+            larger = [level for level in ZOOM_LEVELS if level[0] / level[1] > ratio]
+            if not larger:
+                return False
+            scale, block = larger[min(steps, len(larger)) - 1]
+        else:
+            smaller = [level for level in ZOOM_LEVELS if level[0] / level[1] < ratio]
+            if not smaller or not steps:
+                return False
+            scale, block = smaller[max(steps, -len(smaller))]
+        if x is None:
+            x, y = self.width // 2, self.height // 2
+        # Клетка под точкой в старом масштабе (дробная), потом её новое место
+        row = (y - self.y) * self.block / self.scale
+        col = (x - self.x) * self.block / self.scale
+        self.scale, self.block = scale, block
+        self.y = round(y - row * self.scale / self.block)
+        self.x = round(x - col * self.scale / self.block)
+        self.clamp()
+        self.changed()
+        return True
+
+    def pan(self, dx, dy):
+        """Сдвигает поле на холсте на dx, dy пикселей (перетаскивание мышью)."""
+        self.x += dx
+        self.y += dy
+        self.clamp()
+        self.changed()
+
+    def clamp(self):
+        """
+        Не даёт увести поле с холста: поле меньше холста остаётся на нём
+        целиком, поле больше холста закрывает весь холст.
+        """
+        spare_x = self.width - self.pixels(self.cols)
+        spare_y = self.height - self.pixels(self.rows)
+        self.x = min(max(self.x, min(spare_x, 0)), max(spare_x, 0))
+        self.y = min(max(self.y, min(spare_y, 0)), max(spare_y, 0))
+
+    def changed(self):
+        """Отмечает, что видимая часть поля изменилась."""
+        self.version += 1
+
+    def visible(self):
+        """
+        Прямоугольник видимых клеток (top, left, height, width). При уменьшении
+        top и left кратны block, так что каждый пиксель собирает целый квадрат клеток.
+        """
+        scale, block = self.scale, self.block
+        top = max(0, -self.y * block // scale)
+        left = max(0, -self.x * block // scale)
+        bottom = min(self.rows, -(-(self.height - self.y) * block // scale))
+        right = min(self.cols, -(-(self.width - self.x) * block // scale))
+        return top, left, max(bottom - top, 0), max(right - left, 0)
+
+    def view(self):
+        """Видимые клетки и масштаб одним кортежем (top, left, height, width, block) — для снимков поля."""
+        return self.visible() + (self.block,)
+
+    def position(self, row, col):
+        """Пиксель холста, где начинается клетка (row, col)."""
+        return self.x + col * self.scale // self.block, self.y + row * self.scale // self.block
+
+    def nearest_cell(self, x, y):
+        """Клетка под пикселем (x, y), а если там нет поля — ближайшая клетка на краю поля."""
+        row = (y - self.y) * self.block // self.scale
+        col = (x - self.x) * self.block // self.scale
+        return min(max(row, 0), self.rows - 1), min(max(col, 0), self.cols - 1)
+
+    def cell_at(self, x, y):
+        """Клетка (row, col) под пикселем (x, y) холста или None, если там нет поля."""
+        row = (y - self.y) * self.block // self.scale
+        col = (x - self.x) * self.block // self.scale
+        if 0 <= row < self.rows and 0 <= col < self.cols:
+            return row, col
+        return None